@@ -0,0 +1,90 @@
+"""Database calls per second: a new connection per call, as bot/database.py used to open them, against the
+long-lived reader and writer connections it uses now.
+
+    python benchmarks/db_connections.py [calls]
+"""
+
+import asyncio
+import atexit
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from threading import Lock
+
+_tmp = tempfile.mkdtemp(prefix="bench-db-")
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+os.environ["DATABASE_PATH"] = os.path.join(_tmp, "bench.db")
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "bench")
+os.environ.setdefault("BOT_TOKEN", "1:bench")
+os.chdir(_tmp)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot import database  # noqa: E402
+
+CONCURRENCY = 20
+db_lock = Lock()
+
+
+def connect():
+    conn = sqlite3.connect(database.DATABASE_PATH, check_same_thread=False, timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+async def old_read(user_id):
+    with db_lock:
+        conn = connect()
+        conn.execute("SELECT * FROM users WHERE telegram_id = ?", (user_id,)).fetchone()
+        conn.close()
+
+
+async def old_write(user_id):
+    with db_lock:
+        conn = connect()
+        conn.execute("UPDATE users SET ads_today = ads_today + 1 WHERE telegram_id = ?", (user_id,))
+        conn.commit()
+        conn.close()
+
+
+async def new_read(user_id):
+    await database._fetchone("SELECT * FROM users WHERE telegram_id = ?", (user_id,))
+
+
+async def new_write(user_id):
+    await database._execute("UPDATE users SET ads_today = ads_today + 1 WHERE telegram_id = ?", (user_id,))
+
+
+async def measure(func, calls):
+    ids = [str(i % 1000) for i in range(calls)]
+
+    async def worker(part):
+        for user_id in part:
+            await func(user_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(ids[i::CONCURRENCY]) for i in range(CONCURRENCY)))
+    return calls / (time.perf_counter() - start)
+
+
+async def main(calls):
+    database.init_db()
+    for i in range(1000):
+        await database.create_user(i)
+
+    print(f"{calls} calls, {CONCURRENCY} concurrent callers")
+    print(f"{'':8}{'per call':>12}{'long-lived':>12}")
+    for name, old, new in (("read", old_read, new_read), ("write", old_write, new_write)):
+        before, after = await measure(old, calls), await measure(new, calls)
+        print(f"{name:8}{before:>9.0f}/s{after:>9.0f}/s  x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
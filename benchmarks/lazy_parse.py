@@ -0,0 +1,98 @@
+"""Parse latency and request count per update with Client.lazy_parse off and on, for replies in a group
+whose replied-to messages aren't cached yet. Requests are simulated with a fixed round trip.
+
+    python benchmarks/lazy_parse.py [updates] [round trip, ms]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyrogram import raw, types  # noqa: E402
+from pyrogram.client import Cache  # noqa: E402
+from pyrogram.methods.messages.resolve_messages import ResolveMessages  # noqa: E402
+
+REPLY_TARGETS = 200
+CHATS = {100: raw.types.Chat(id=100, title="chat", photo=raw.types.ChatPhotoEmpty(), participants_count=2, date=0,
+                             version=1)}
+
+
+class Client(ResolveMessages):
+    me = types.User(id=1, is_bot=True)
+
+    def __init__(self, lazy_parse, round_trip):
+        self.lazy_parse = lazy_parse
+        self.round_trip = round_trip
+        self.message_cache = Cache(10000)
+        self.requests = 0
+
+    async def get_messages(self, chat_id, message_ids=None, reply_to_message_ids=None, replies=1):
+        self.requests += 1
+        await asyncio.sleep(self.round_trip)
+
+        # Messages returned by the real method are parsed, and so cached, too
+        if reply_to_message_ids is not None:
+            ids = [reply_target(reply_to_message_ids)]
+        else:
+            ids = message_ids if isinstance(message_ids, list) else [message_ids]
+
+        messages = [types.Message(id=i, text=f"message {i}") for i in ids]
+
+        for message in messages:
+            self.message_cache[(chat_id, message.id)] = message
+
+        return messages if isinstance(message_ids, list) else messages[0]
+
+
+def reply_target(message_id):
+    return 1 + (message_id - 1000) % REPLY_TARGETS
+
+
+def make_updates(count):
+    return [
+        raw.types.Message(
+            id=1000 + i, peer_id=raw.types.PeerChat(chat_id=100), date=0, message="text", entities=[],
+            reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=reply_target(1000 + i))
+        )
+        for i in range(count)
+    ]
+
+
+async def measure(lazy_parse, resolve, updates, round_trip):
+    client = Client(lazy_parse, round_trip)
+
+    start = time.perf_counter()
+    messages = [await types.Message._parse(client, update, {}, CHATS) for update in updates]
+    parsed = time.perf_counter() - start
+
+    if resolve:
+        await client.resolve_messages(messages)
+
+    total = time.perf_counter() - start
+    assert all(m.reply_to_message for m in messages) or not resolve
+
+    return parsed / len(updates) * 1e6, total / len(updates) * 1e6, client.requests
+
+
+async def main(count, round_trip):
+    updates = make_updates(count)
+
+    print(f"{count} replies to {REPLY_TARGETS} messages, {round_trip * 1000:.0f} ms per request")
+    print(f"{'':26}{'parse':>11}{'total':>11}{'requests':>10}")
+    for name, lazy_parse, resolve in (
+        ("lazy_parse off", False, True),
+        ("lazy_parse on, unresolved", True, False),
+        ("lazy_parse on, resolved", True, True)
+    ):
+        parsed, total, requests = await measure(lazy_parse, resolve, updates, round_trip)
+        print(f"{name:26}{parsed:>8.1f} us{total:>8.1f} us{requests:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.005
+    ))
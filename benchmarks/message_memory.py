@@ -0,0 +1,110 @@
+"""Memory held by 10k parsed messages, with the slotted Message, Chat and User types and with the same objects
+keeping their attributes in a per-instance __dict__, as every pyrogram.types object used to.
+
+    python benchmarks/message_memory.py [messages]
+"""
+
+import asyncio
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyrogram import raw, types  # noqa: E402
+from pyrogram.client import Cache  # noqa: E402
+from pyrogram.types.object import Object  # noqa: E402
+
+CHATS = {100: raw.types.Chat(id=100, title="chat", photo=raw.types.ChatPhotoEmpty(), participants_count=2, date=0,
+                             version=1)}
+USERS = {200 + i: raw.types.User(id=200 + i, first_name=f"user {i}", username=f"user{i}", usernames=[],
+                               restriction_reason=[]) for i in range(50)}
+
+
+class Client:
+    lazy_parse = True
+    me = types.User(id=1, is_bot=True)
+
+    def __init__(self, size):
+        self.message_cache = Cache(size)
+
+
+async def parse(count):
+    client = Client(count)
+
+    return [
+        await types.Message._parse(
+            client,
+            raw.types.Message(
+                id=i, peer_id=raw.types.PeerChat(chat_id=100), from_id=raw.types.PeerUser(user_id=200 + i % 50),
+                date=i, message=f"message {i}", entities=[]
+            ),
+            USERS, CHATS
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def copy(value, make, memo):
+    """Rebuild every Object in value with make(obj, fields), sharing the leaf values and preserving identity."""
+    if isinstance(value, list):
+        return [copy(v, make, memo) for v in value]
+
+    if not isinstance(value, Object):
+        return value
+
+    if id(value) not in memo:
+        fields = {name: getattr(value, name) for name in value._slots() if hasattr(value, name)}
+        memo[id(value)] = make(value, {name: copy(v, make, memo) for name, v in fields.items()})
+
+    return memo[id(value)]
+
+
+def slotted(obj, fields):
+    new = object.__new__(type(obj))
+
+    for name, value in fields.items():
+        object.__setattr__(new, name, value)
+
+    return new
+
+
+dict_types = {}
+
+
+def with_dict(obj, fields):
+    cls = type(obj)
+
+    if cls not in dict_types:
+        dict_types[cls] = type(cls.__name__, (), {})
+
+    new = object.__new__(dict_types[cls])
+    new.__dict__.update(fields)
+
+    return new
+
+
+def measure(func):
+    tracemalloc.start()
+    result = func()  # noqa: F841, kept alive until measured
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return size
+
+
+def main(count):
+    messages = asyncio.run(parse(count))
+
+    # The objects alone, without the strings and numbers they point to, which both layouts share
+    with_slots = measure(lambda: copy(messages, slotted, {}))
+    without_slots = measure(lambda: copy(messages, with_dict, {}))
+
+    print(f"{len(messages)} parsed messages")
+    print(f"{'objects with slots':24}{with_slots / 2 ** 20:>8.2f} MiB{with_slots / count:>8.0f} B/message")
+    print(f"{'objects with __dict__':24}{without_slots / 2 ** 20:>8.2f} MiB{without_slots / count:>8.0f} B/message")
+    print(f"saved {(without_slots - with_slots) / 2 ** 20:.2f} MiB, {1 - with_slots / without_slots:.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -1,36 +1,33 @@
-import asyncio
 from pyrogram import filters
 from bot.config import app, OWNER_ID, active_downloads, MAX_CONCURRENT_DOWNLOADS
-from bot.database import set_user_role, ban_user, update_setting, get_setting, get_all_users, get_user_count
+from bot.database import set_user_role, ban_user, update_setting, get_setting, iter_users, get_user_count, create_broadcast
+from bot.broadcast import deliver, start_broadcast
 
 @app.on_message(filters.command("stats") & filters.private)
 async def stats(client, message):
     if str(message.from_user.id) != str(OWNER_ID): return
     
     total_users = await get_user_count()
+    tasks = client.supervisor.stats()
     
     await message.reply(
         f"📊 **Bot Statistics**\n\n"
         f"👥 Total Users: `{total_users}`\n"
-        f"⚡ Active Downloads: `{len(active_downloads)}/{MAX_CONCURRENT_DOWNLOADS}`"
+        f"⚡ Active Downloads: `{len(active_downloads)}/{MAX_CONCURRENT_DOWNLOADS}`\n"
+        f"🧵 Background Tasks: `{tasks['running']}` running, `{tasks['pending']}` queued, "
+        f"`{tasks['failed']}` failed, `{tasks['cancelled']}` cancelled"
     )
 
 @app.on_message(filters.command("killall") & filters.private)
 async def kill_all_processes(client, message):
     if str(message.from_user.id) != str(OWNER_ID): return
     
-    from bot.config import cancel_flags
-    
-    if not active_downloads:
+    count = client.cancel_tasks(group="downloads")
+    if not count:
         await message.reply("⚠️ No active downloads to kill.")
         return
         
-    count = len(active_downloads)
-    for uid in list(active_downloads):
-        cancel_flags.add(uid)
-    
-    active_downloads.clear()
-    await message.reply(f"✅ Killed all `{count}` active processes and sent cancellation signals.")
+    await message.reply(f"✅ Killed all `{count}` active processes.")
 
 @app.on_message(filters.command("setrole") & filters.private)
 async def setrole(client, message):
@@ -154,6 +151,7 @@ async def broadcast(client, message):
     if user_id != str(OWNER_ID):
         return
         
+    await message.resolve("reply_to_message")
     if not message.reply_to_message:
         await message.reply(
             "📣 **Broadcast Command Guide**\n\n"
@@ -171,51 +169,26 @@ async def broadcast(client, message):
         
     parts = message.text.split()
     target_ids = parts[1:] if len(parts) > 1 else []
+    source = message.reply_to_message
     
     msg = await message.reply("🚀 Starting broadcast...")
-    count = 0
-    blocked = 0
     
     if target_ids:
         # Broadcast to specific users
-        for tid in target_ids:
-            try:
-                # Convert to int if it's a numeric ID to avoid BOT_METHOD_INVALID
-                target_key = int(tid) if str(tid).strip("-").isdigit() else tid
-                await message.reply_to_message.copy(target_key)
-                count += 1
-            except Exception:
-                blocked += 1
-            await asyncio.sleep(0.05)
-    else:
-        # Broadcast to all users
-        users = await get_all_users()
-        total = len(users)
-        
-        for index, row in enumerate(users):
-            try:
-                # Get the telegram_id and ensure it's an integer
-                tid = row.get('telegram_id')
-                if tid:
-                    target_key = int(tid) if str(tid).strip("-").isdigit() else tid
-                    await message.reply_to_message.copy(target_key)
-                    count += 1
-            except Exception as e:
-                blocked += 1
-                print(f"[ERROR] Broadcast failed for {row.get('telegram_id')}: {e}")
-            
-            # Periodically update the progress message for transparency
-            if (index + 1) % 50 == 0:
-                try:
-                    await msg.edit_text(f"🚀 Broadcasting...\nProgress: {index + 1}/{total}\nSent: {count}\nFailed: {blocked}")
-                except Exception:
-                    pass
-            
-            # Rate limiting: 20 messages per second (0.05s delay) 
-            # to stay within Telegram's broad limits for bots
-            await asyncio.sleep(0.05)
+        results = [await deliver(client, source.chat.id, source.id, tid) for tid in target_ids]
+        await msg.edit_text(
+            f"✅ Broadcast complete.\nTotal: {len(target_ids)}\nSent: {results.count('sent')}\n"
+            f"Failed/Blocked: {len(results) - results.count('sent')}"
+        )
+        return
     
-    await msg.edit_text(f"✅ Broadcast complete.\nTotal: {total if not target_ids else len(target_ids)}\nSent: {count}\nFailed/Blocked: {blocked}")
+    # Broadcast to all users in the background, progress is saved so it survives restarts
+    job = await create_broadcast(source.chat.id, source.id, msg.chat.id, msg.id, await get_user_count())
+    if not job:
+        await msg.edit_text("❌ Could not start the broadcast.")
+        return
+    
+    start_broadcast(client, job)
 
 @app.on_message(filters.command("premium_users") & filters.private, group=-1)
 async def list_premium_users(client, message):
@@ -226,15 +199,10 @@ async def list_premium_users(client, message):
         return
         
     try:
-        all_users = await get_all_users()
-        premium_users = [u for u in all_users if u.get("role") == "premium"]
-        
-        if not premium_users:
-            await message.reply("No premium users found.")
-            return
-
         text = "💎 **Premium Users List**\n\n"
-        for user in premium_users:
+        found = False
+        async for user in iter_users(("telegram_id", "premium_expiry_date"), role="premium"):
+            found = True
             u_id = user.get("telegram_id")
             expiry = user.get("premium_expiry_date", "Never")
             
@@ -262,6 +230,10 @@ async def list_premium_users(client, message):
                 
             text += f"👤 Name: **{name}**{username_str}\n🆔 ID: `{u_id}`\n📅 Expiry: `{expiry}`\n\n"
         
+        if not found:
+            await message.reply("No premium users found.")
+            return
+        
         if len(text) > 4096:
             for x in range(0, len(text), 4096):
                 await message.reply(text[x:x+4096])
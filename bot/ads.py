@@ -1,33 +1,106 @@
+import time
+import asyncio
 import aiohttp
 import logging
 import html
+from collections import deque
 from typing import Optional, Dict, Any, List
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from bot.config import RICHADS_PUBLISHER_ID, RICHADS_WIDGET_ID, AD_DAILY_LIMIT, AD_FOR_PREMIUM
+from bot.config import RICHADS_PUBLISHER_ID, RICHADS_WIDGET_ID, AD_DAILY_LIMIT, AD_FOR_PREMIUM, AD_CACHE_TTL
 from bot.database import get_user, increment_ad_count, get_ad_count_today
 
 logger = logging.getLogger(__name__)
 
 RICHADS_API_URL = "http://15068.xml.adx1.com/telegram-mb"
 
+# Ads kept ready per user and language, beyond that extra ads from a response are dropped
+AD_CACHE_SIZE = 5
+# Users with ads kept ready, the ones filled longest ago are dropped first
+AD_CACHE_USERS = 1000
+
+class CircuitBreaker:
+    """Stop calling a provider after `max_failures` failed or slow calls in a row, for `reset_timeout` seconds.
+    After that one trial call is let through: success closes the breaker again, failure reopens it."""
+
+    def __init__(self, max_failures=3, reset_timeout=60, slow_call=3.0):
+        self.max_failures = max_failures
+        self.reset_timeout = reset_timeout
+        self.slow_call = slow_call
+        self.failures = 0
+        self.open_until = 0
+        self.trial = False
+
+    def allow(self) -> bool:
+        if self.failures < self.max_failures:
+            return True
+        if self.trial or time.monotonic() < self.open_until:
+            return False
+        self.trial = True
+        return True
+
+    def record(self, ok: bool, elapsed: float = 0):
+        self.trial = False
+        if ok and elapsed < self.slow_call:
+            self.failures = 0
+            return
+
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            if self.failures == self.max_failures:
+                logger.warning(f"RichAds: Provider failing or slow, skipping it for {self.reset_timeout}s")
+            self.open_until = time.monotonic() + self.reset_timeout
+
 class RichAdsManager:
-    def __init__(self):
+    def __init__(self, api_url: str = RICHADS_API_URL):
+        self.api_url = api_url
         self.publisher_id = RICHADS_PUBLISHER_ID
         self.widget_id = RICHADS_WIDGET_ID
         self.production = True
         self.for_premium = AD_FOR_PREMIUM
+        self.session = None
+        self.breaker = CircuitBreaker()
+        # (language code, telegram id) -> deque of (expires_at, ad), oldest first. Keyed by user as well because
+        # the provider targets each ad and its notification_url at the telegram_id it was fetched for
+        self.cache = {}
+        # Same keys -> task fetching ads into the cache, so concurrent misses share one request
+        self.refills = {}
+        # Same keys -> when an ad was last asked for, oldest first. Only users asking again within AD_CACHE_TTL get
+        # their next ad prefetched, for the others it would expire unused
+        self.requested = {}
 
     def is_enabled(self) -> bool:
         """Check if RichAds is configured"""
         return bool(self.publisher_id)
 
+    def _session(self):
+        # One pooled session for every ad and impression: connections and DNS lookups are reused
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=5)
+            )
+        return self.session
+
+    async def close(self):
+        for task in self.refills.values():
+            task.cancel()
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    @staticmethod
+    def _lang(language_code: str) -> str:
+        return language_code[:2].lower() if language_code else "en"
+
     async def fetch_ad(self, language_code: str = "en", telegram_id: str = None) -> Optional[List[Dict[str, Any]]]:
         """Fetch ad from RichAds API"""
         if not self.is_enabled():
             return None
 
+        if not self.breaker.allow():
+            return None
+
         payload = {
-            "language_code": language_code[:2].lower() if language_code else "en",
+            "language_code": self._lang(language_code),
             "publisher_id": self.publisher_id,
             "production": self.production
         }
@@ -37,32 +110,84 @@ class RichAdsManager:
         if telegram_id:
             payload["telegram_id"] = str(telegram_id)
 
+        started = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(RICHADS_API_URL, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        ads = await response.json()
-                        if ads and len(ads) > 0:
-                            logger.info(f"RichAds: Ad received for user {telegram_id}")
-                            return ads
-                        logger.info(f"RichAds: No ads available for user {telegram_id}")
-                        return None
-                    else:
-                        logger.warning(f"RichAds: API Error {response.status} for user {telegram_id}")
-                        return None
+            async with self._session().post(self.api_url, json=payload) as response:
+                if response.status == 200:
+                    ads = await response.json(content_type=None)
+                    self.breaker.record(True, time.monotonic() - started)
+                    if ads and len(ads) > 0:
+                        logger.info(f"RichAds: Ad received for user {telegram_id}")
+                        return ads
+                    logger.info(f"RichAds: No ads available for user {telegram_id}")
+                    return None
+                else:
+                    self.breaker.record(False)
+                    logger.warning(f"RichAds: API Error {response.status} for user {telegram_id}")
+                    return None
         except Exception as e:
-            logger.error(f"RichAds: Fetch error for user {telegram_id}: {e}")
+            self.breaker.record(False)
+            logger.error(f"RichAds: Fetch error for user {telegram_id}: {e!r}")
             return None
 
+    def _pop_cached(self, key) -> Optional[Dict[str, Any]]:
+        ads = self.cache.get(key)
+        now = time.monotonic()
+        while ads:
+            expires_at, ad = ads.popleft()
+            if expires_at > now:
+                return ad
+        self.cache.pop(key, None)
+        return None
+
+    async def _fill(self, key):
+        try:
+            ads = await self.fetch_ad(*key)
+            if ads:
+                cached = self.cache.pop(key, None) or deque(maxlen=AD_CACHE_SIZE)
+                expires_at = time.monotonic() + AD_CACHE_TTL
+                cached.extend((expires_at, ad) for ad in ads)
+                # Reinserted so the dict stays ordered by fill time
+                self.cache[key] = cached
+                while len(self.cache) > AD_CACHE_USERS:
+                    del self.cache[next(iter(self.cache))]
+        finally:
+            self.refills.pop(key, None)
+
+    def _refill(self, key) -> asyncio.Task:
+        task = self.refills.get(key)
+        if task is None:
+            task = self.refills[key] = asyncio.create_task(self._fill(key))
+        return task
+
+    async def get_ad(self, language_code: str = "en", telegram_id: str = None) -> Optional[Dict[str, Any]]:
+        """Return an ad for this user and language, from the prefetch cache when possible. For users who come back
+        within AD_CACHE_TTL, the cache is refilled in the background so their next ad doesn't wait for the provider."""
+        key = (self._lang(language_code), telegram_id)
+        now = time.monotonic()
+        returning = now - self.requested.pop(key, float("-inf")) < AD_CACHE_TTL
+        self.requested[key] = now
+        while len(self.requested) > AD_CACHE_USERS:
+            del self.requested[next(iter(self.requested))]
+
+        ad = self._pop_cached(key)
+        if ad is None:
+            # Shielded: a cancelled caller shouldn't cancel the fetch other callers are waiting on
+            await asyncio.shield(self._refill(key))
+            ad = self._pop_cached(key)
+
+        if returning and not self.cache.get(key):
+            self._refill(key)
+        return ad
+
     async def notify_impression(self, notification_url: str):
         """Notify RichAds that ad impression happened"""
         if not notification_url:
             return
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(html.unescape(notification_url), timeout=5) as response:
-                    if response.status == 200:
-                        logger.debug("RichAds: Impression tracked")
+            async with self._session().get(html.unescape(notification_url)) as response:
+                if response.status == 200:
+                    logger.debug("RichAds: Impression tracked")
         except Exception as e:
             logger.debug(f"RichAds: Impression error: {e}")
 
@@ -85,11 +210,10 @@ class RichAdsManager:
             logger.info(f"RichAds: Daily limit reached for user {user_id}")
             return
 
-        ads = await self.fetch_ad(language_code=lang_code, telegram_id=str(user_id))
-        if not ads:
+        ad = await self.get_ad(language_code=lang_code, telegram_id=str(user_id))
+        if not ad:
             return
 
-        ad = ads[0]
         try:
             click_url = html.unescape(ad.get("link", ""))
             image_url = html.unescape(ad.get("image") or ad.get("image_preload") or "")
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from pyrogram.errors import FloodWait, RPCError, InternalServerError, ServiceUnavailable
+from bot.config import BROADCAST_RATE, BROADCAST_SENDERS
+from bot.database import iter_users, save_broadcast_progress, get_unfinished_broadcasts
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200
+MAX_RETRIES = 3
+STATS_INTERVAL = 5
+
+# RPC errors that mean the user will never receive the message, anything else that isn't transient is "failed"
+BLOCKED_ERRORS = {"USER_IS_BLOCKED", "CHAT_WRITE_FORBIDDEN"}
+DEACTIVATED_ERRORS = {"INPUT_USER_DEACTIVATED", "USER_DEACTIVATED", "USER_DEACTIVATED_BAN"}
+
+class TokenBucket:
+    """Rate limiter shared by every sender, refilled at `rate` tokens per second"""
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.lock = asyncio.Lock()
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds`, e.g. after a FloodWait"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        # Refilling starts when the pause ends, the paused time doesn't count towards it
+        self.updated = self.paused_until
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                
+                self.tokens = min(self.capacity, self.tokens + max(0, now - self.updated) * self.rate)
+                self.updated = max(self.updated, now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+bucket = TokenBucket(BROADCAST_RATE)
+
+def classify_error(e):
+    """Map a send error to blocked, deactivated, transient or failed"""
+    if isinstance(e, (InternalServerError, ServiceUnavailable, asyncio.TimeoutError, OSError)):
+        return "transient"
+    if isinstance(e, RPCError):
+        if e.ID in BLOCKED_ERRORS:
+            return "blocked"
+        if e.ID in DEACTIVATED_ERRORS:
+            return "deactivated"
+    return "failed"
+
+async def deliver(client, from_chat_id, message_id, user_id):
+    """Copy a message to one user. Returns sent, blocked, deactivated or failed"""
+    chat_id = int(user_id) if str(user_id).strip("-").isdigit() else user_id
+    retries = 0
+    
+    while True:
+        await bucket.acquire()
+        try:
+            await client.copy_message(chat_id, from_chat_id, message_id)
+            return "sent"
+        except FloodWait as e:
+            # Everyone waits, not only this sender, and the user is retried afterwards
+            logger.warning(f"Broadcast hit FloodWait, pausing for {e.value}s")
+            bucket.pause(e.value)
+            continue
+        except Exception as e:
+            result = classify_error(e)
+        
+        if result != "transient":
+            return result
+        if retries >= MAX_RETRIES:
+            return "failed"
+        retries += 1
+        await asyncio.sleep(2 ** retries)
+
+class Broadcast:
+    """
+    Copies a message to every user with BROADCAST_SENDERS concurrent senders.
+    
+    Users are processed in pages ordered by telegram_id. After each page the last id and the counters
+    are saved to the broadcasts table, so an interrupted broadcast continues where it stopped.
+    """
+    def __init__(self, client, job):
+        self.client = client
+        self.job = job
+        self.last_user_id = job["last_user_id"]
+        self.stats = {key: job[key] for key in ("sent", "blocked", "deactivated", "failed")}
+        self.changed = True
+
+    def progress_text(self, done=False):
+        header = "✅ Broadcast complete." if done else "🚀 Broadcasting..."
+        return (
+            f"{header}\n"
+            f"Progress: {sum(self.stats.values())}/{self.job['total']}\n"
+            f"Sent: {self.stats['sent']}\n"
+            f"Blocked: {self.stats['blocked']}\n"
+            f"Deactivated: {self.stats['deactivated']}\n"
+            f"Failed: {self.stats['failed']}"
+        )
+
+    async def edit_status(self, done=False):
+        self.changed = False
+        try:
+            await self.client.edit_message_text(
+                self.job["status_chat_id"], self.job["status_message_id"], self.progress_text(done)
+            )
+        except Exception as e:
+            logger.debug(f"Broadcast status edit failed: {e}")
+
+    async def report_loop(self):
+        # One edit per interval at most, however many messages went out in between
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            if self.changed:
+                await self.edit_status()
+
+    async def sender(self, user_ids):
+        for user_id in user_ids:
+            result = await deliver(self.client, self.job["from_chat_id"], self.job["message_id"], user_id)
+            self.stats[result] += 1
+            self.changed = True
+
+    async def send_page(self, page):
+        # Senders share one iterator, so each user is taken by exactly one of them
+        user_ids = iter(page)
+        await asyncio.gather(*(self.sender(user_ids) for _ in range(min(BROADCAST_SENDERS, len(page)))))
+        
+        self.last_user_id = page[-1]
+        await save_broadcast_progress(self.job["id"], self.last_user_id, self.stats)
+
+    async def run(self):
+        reporter = asyncio.create_task(self.report_loop())
+        try:
+            page = []
+            async for row in iter_users(page_size=PAGE_SIZE, after=self.last_user_id):
+                page.append(row["telegram_id"])
+                if len(page) == PAGE_SIZE:
+                    await self.send_page(page)
+                    page = []
+            if page:
+                await self.send_page(page)
+            
+            await save_broadcast_progress(self.job["id"], self.last_user_id, self.stats, status="done")
+        finally:
+            reporter.cancel()
+        
+        await self.edit_status(done=True)
+
+def start_broadcast(client, job):
+    client.spawn_task(Broadcast(client, job).run(), name=f"broadcast_{job['id']}", group="broadcasts")
+
+async def resume_broadcasts(client):
+    """Continue broadcasts that were interrupted by a restart, once the client is up"""
+    while not client.is_initialized:
+        await asyncio.sleep(1)
+    
+    for job in await get_unfinished_broadcasts():
+        logger.info(f"Resuming broadcast {job['id']} after user {job['last_user_id']}")
+        start_broadcast(client, job)
@@ -1,25 +1,177 @@
 #!/usr/bin/env python3
 """
-GitHub Backup Integration for SQLite Database
-Automatically backs up database to GitHub repository
+Incremental Cloud Backups for the SQLite Database
+
+Backups form chains: a gzip-compressed full copy of the database followed by incremental
+backups that only contain the pages changed since the previous backup. A new chain starts
+every BACKUP_FULL_EVERY backups. Restoring downloads the newest full backup and replays the
+incrementals after it in order.
+
+Backups are stored on a remote (GitHub repository or a local directory), selected with
+CLOUD_BACKUP_SERVICE. All network I/O is async (aiohttp) and the snapshot, diffing and
+compression run in a worker thread, so backups never block the bot's event loop.
 """
 
 import os
+import re
+import gzip
+import json
+import base64
 import shutil
 import sqlite3
+import struct
+import asyncio
+import hashlib
 import logging
 from datetime import datetime
-import threading
+
+import aiohttp
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = os.getenv("DATABASE_PATH", "telegram_bot.db")
+# Page hashes of the last uploaded backup, used to find the pages that changed since then
+STATE_PATH = f"{DB_PATH}.backup_state.json"
+FULL_BACKUP_EVERY = int(os.getenv("BACKUP_FULL_EVERY", 24))
+KEEP_CHAINS = 2
+# Remote operations running at once (downloads while restoring, deletions while cleaning up)
+MAX_REMOTE_OPERATIONS = 3
+MAX_RETRIES = 4
+# Seconds before the first retry of a remote operation, doubled after every failed attempt
+RETRY_DELAY = 1
+# Triggered backups arriving within this many seconds of each other are coalesced into one
+TRIGGER_DELAY = 60
+# Names of the files written by backups, anything else on the remote is left alone
+BACKUP_NAME = re.compile(r"backup_\d{8}_\d{6}(?:_\d{6}_(?:full|incr)\.db\.gz|\.db)")
+
+async def _in_thread(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+class BackupRemote:
+    """Storage for backup files. Names sort in creation order"""
+
+    async def list(self):
+        raise NotImplementedError
+
+    async def upload(self, name, path):
+        raise NotImplementedError
+
+    async def download(self, name, path):
+        raise NotImplementedError
+
+    async def delete(self, name):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class LocalDirRemote(BackupRemote):
+    """Keeps backups in a local directory, e.g. a mounted volume"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    async def list(self):
+        return sorted(n for n in os.listdir(self.directory) if n.startswith("backup_"))
+
+    async def upload(self, name, path):
+        await _in_thread(shutil.copyfile, path, os.path.join(self.directory, name))
+
+    async def download(self, name, path):
+        await _in_thread(shutil.copyfile, os.path.join(self.directory, name), path)
+
+    async def delete(self, name):
+        await _in_thread(os.remove, os.path.join(self.directory, name))
+
+class GitHubRemote(BackupRemote):
+    """Keeps backups in the backups/ folder of a GitHub repository"""
+
+    def __init__(self, token, repo):
+        self.url = f"https://api.github.com/repos/{repo}/contents/backups"
+        self.headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        self.files = {}
+        self.session = None
+
+    def _session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(total=600))
+        return self.session
+
+    async def list(self):
+        async with self._session().get(self.url) as response:
+            if response.status == 404:
+                return []
+            response.raise_for_status()
+            files = await response.json()
+
+        self.files = {f["name"]: f for f in files}
+        return sorted(self.files)
+
+    async def upload(self, name, path):
+        # Only the compressed archive is encoded, which is a fraction of the database size
+        content = await _in_thread(_encode_file, path)
+        data = {"message": f"Automated backup - {name}", "content": content}
+
+        async with self._session().put(f"{self.url}/{name}", json=data) as response:
+            response.raise_for_status()
+
+    async def download(self, name, path):
+        if name not in self.files:
+            await self.list()
+
+        async with self._session().get(self.files[name]["download_url"]) as response:
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                async for chunk in response.content.iter_chunked(256 * 1024):
+                    f.write(chunk)
+
+    async def delete(self, name):
+        if name not in self.files:
+            await self.list()
+
+        data = {"message": f"Cleanup: Remove old backup {name}", "sha": self.files[name]["sha"]}
+        async with self._session().delete(f"{self.url}/{name}", json=data) as response:
+            response.raise_for_status()
+        self.files.pop(name, None)
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+def _encode_file(path):
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+def get_remote():
+    """Return the configured backup remote, or None if backups are disabled"""
+    backup_service = os.getenv("CLOUD_BACKUP_SERVICE", "").lower()
+
+    if backup_service == "github":
+        token = os.getenv("GITHUB_TOKEN")
+        repo = os.getenv("GITHUB_BACKUP_REPO")
+        if not token or not repo:
+            logger.error("GITHUB_TOKEN or GITHUB_BACKUP_REPO not set")
+            return None
+        return GitHubRemote(token, repo)
 
-_backup_lock = threading.Lock()
-_backup_in_progress = False
+    if backup_service == "local":
+        return LocalDirRemote(os.getenv("BACKUP_LOCAL_DIR", "cloud_backups"))
+
+    return None
+
+def _backup_names(names):
+    return [n for n in names if BACKUP_NAME.fullmatch(n)]
+
+def _is_full(name):
+    # Backups made before incrementals existed are plain, uncompressed database copies
+    return name.endswith("_full.db.gz") or name.endswith(".db")
 
 def _create_temp_backup():
-    """Create a temporary backup of the database for GitHub upload (internal use only)"""
+    """Create a consistent snapshot of the database (internal use only)"""
     if not os.path.exists(DB_PATH):
         logger.warning(f"Database file not found: {DB_PATH}")
         return None
@@ -42,6 +194,146 @@ def _create_temp_backup():
         logger.error(f"Failed to create temp backup: {e}")
         return None
 
+def _page_size(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+def _iter_pages(path, page_size):
+    with open(path, "rb") as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                return
+            yield page
+
+def _page_hash(page):
+    return hashlib.blake2b(page, digest_size=8).hexdigest()
+
+def _load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_state(name, page_size, hashes, since_full):
+    with open(STATE_PATH + ".tmp", "w") as f:
+        json.dump({"last": name, "page_size": page_size, "since_full": since_full, "hashes": hashes}, f)
+    os.replace(STATE_PATH + ".tmp", STATE_PATH)
+
+def _write_full(snapshot, archive, page_size):
+    hashes = []
+    with gzip.open(archive, "wb", compresslevel=6) as out:
+        for page in _iter_pages(snapshot, page_size):
+            hashes.append(_page_hash(page))
+            out.write(page)
+    return hashes
+
+def _write_incremental(snapshot, archive, page_size, state):
+    """
+    Write the pages that differ from the last backup as (4-byte page number, page) records after a
+    JSON header line. Returns the new page hashes, or None when nothing changed.
+    """
+    old_hashes = state["hashes"]
+    hashes = []
+    changed = 0
+
+    with gzip.open(archive, "wb", compresslevel=6) as out:
+        page_count = os.path.getsize(snapshot) // page_size
+        header = {"base": state["last"], "page_size": page_size, "page_count": page_count}
+        out.write(json.dumps(header).encode() + b"\n")
+
+        for index, page in enumerate(_iter_pages(snapshot, page_size)):
+            page_hash = _page_hash(page)
+            hashes.append(page_hash)
+
+            if index >= len(old_hashes) or old_hashes[index] != page_hash:
+                out.write(struct.pack(">I", index))
+                out.write(page)
+                changed += 1
+
+    if not changed and len(hashes) == len(old_hashes):
+        return None
+
+    logger.info(f"Incremental backup: {changed}/{len(hashes)} pages changed")
+    return hashes
+
+def _prepare_backup():
+    """
+    Snapshot the database and write the next archive of the chain (runs in a worker thread).
+
+    Returns (snapshot, archive, name, page_size, hashes, since_full), or None when there is nothing to upload.
+    """
+    snapshot = _create_temp_backup()
+    if not snapshot:
+        return None
+
+    archive = snapshot + ".gz"
+    try:
+        page_size = _page_size(snapshot)
+        state = _load_state()
+        full = (
+            state is None
+            or state["page_size"] != page_size
+            or state["since_full"] + 1 >= FULL_BACKUP_EVERY
+        )
+
+        if full:
+            hashes = _write_full(snapshot, archive, page_size)
+        else:
+            hashes = _write_incremental(snapshot, archive, page_size, state)
+            if hashes is None:
+                logger.info("Database unchanged since last backup, nothing to upload")
+                _remove_files(snapshot, archive)
+                return None
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        name = f"backup_{timestamp}_{'full' if full else 'incr'}.db.gz"
+        return snapshot, archive, name, page_size, hashes, 0 if full else state["since_full"] + 1
+    except Exception:
+        _remove_files(snapshot, archive)
+        raise
+
+def _unpack_chain(archives, temp_path):
+    """Rebuild the database from downloaded (name, archive) pairs of one chain (runs in a worker thread)"""
+    name, archive = archives[0]
+    if name.endswith(".gz"):
+        with gzip.open(archive, "rb") as src, open(temp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        shutil.copyfile(archive, temp_path)
+
+    applied = name
+    for name, archive in archives[1:]:
+        try:
+            _apply_incremental(archive, temp_path, applied)
+            applied = name
+        except Exception as e:
+            logger.error(f"Stopping restore at {applied}, could not apply {name}: {e}")
+            break
+
+    return applied
+
+def _apply_incremental(archive, target, expected_base):
+    with gzip.open(archive, "rb") as f:
+        header = json.loads(f.readline())
+        if header["base"] != expected_base:
+            raise ValueError(f"chain broken, expected base {expected_base}, found {header['base']}")
+
+        page_size = header["page_size"]
+        with open(target, "r+b") as db:
+            db.truncate(header["page_count"] * page_size)
+
+            while True:
+                index = f.read(4)
+                if not index:
+                    break
+                db.seek(struct.unpack(">I", index)[0] * page_size)
+                db.write(f.read(page_size))
+
 def _restore_from_temp(backup_path):
     """Restore database from a temporary backup file (internal use only)"""
     if not os.path.exists(backup_path):
@@ -55,299 +347,252 @@ def _restore_from_temp(backup_path):
             logger.info(f"Current database backed up to: {backup_current}")
 
         shutil.copy2(backup_path, DB_PATH)
+        # A WAL left behind by the replaced database must not be replayed onto the restored one
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
         logger.info(f"Database restored from: {backup_path}")
         return True
     except Exception as e:
         logger.error(f"Restore failed: {e}")
         return False
 
-def cleanup_old_github_backups(token, repo, keep_count=2):
-    """Delete old backups from GitHub, keeping only the newest ones"""
-    try:
-        import urllib.request
-        import json
+def _remove_files(*paths):
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
 
-        list_url = f"https://api.github.com/repos/{repo}/contents/backups"
-        headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+class BackupService:
+    """
+    Runs backups and restores against a remote without blocking the event loop
 
-        req = urllib.request.Request(list_url, headers=headers)
-        with urllib.request.urlopen(req) as response:
-            backups = json.loads(response.read().decode())
+    Only one backup runs at a time. Backups requested with trigger() while one is pending or
+    running are coalesced into a single run, started TRIGGER_DELAY seconds after the first request.
+    """
 
-        if not backups or len(backups) <= keep_count:
-            return
+    def __init__(self, remote):
+        self.remote = remote
+        self.lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(MAX_REMOTE_OPERATIONS)
+        self.loop = None
+        self.pending = None
+
+    async def retry(self, func, *args):
+        """Run a remote operation, retrying with exponential backoff"""
+        async with self.semaphore:
+            for attempt in range(MAX_RETRIES):
+                try:
+                    return await func(*args)
+                except Exception as e:
+                    if attempt == MAX_RETRIES - 1:
+                        raise
+                    delay = RETRY_DELAY * 2 ** attempt
+                    logger.warning(f"{func.__name__} failed ({e}), retrying in {delay}s")
+                    await asyncio.sleep(delay)
+
+    async def backup(self):
+        """Upload a full or incremental database backup. Returns True on success or when nothing changed"""
+        async with self.lock:
+            try:
+                # Counters still waiting in the user cache belong in the backup
+                from bot.database import flush_users
+                await flush_users()
+
+                prepared = await _in_thread(_prepare_backup)
+                if not prepared:
+                    return True
+
+                snapshot, archive, name, page_size, hashes, since_full = prepared
+                try:
+                    await self.retry(self.remote.upload, name, archive)
+                    await _in_thread(_save_state, name, page_size, hashes, since_full)
+                    logger.info(f"Uploaded backup: {name} ({os.path.getsize(archive)} bytes)")
+                finally:
+                    await _in_thread(_remove_files, snapshot, archive)
+
+                if since_full == 0:
+                    await self.cleanup()
+                return True
+            except Exception as e:
+                logger.error(f"Cloud backup failed: {e}")
+                return False
 
-        sorted_backups = sorted(backups, key=lambda x: x['name'], reverse=True)
-        backups_to_delete = sorted_backups[keep_count:]
+    async def cleanup(self):
+        """Delete backups older than the newest KEEP_CHAINS full backups"""
+        try:
+            names = _backup_names(await self.retry(self.remote.list))
+            fulls = [n for n in names if _is_full(n)]
+            if len(fulls) <= KEEP_CHAINS:
+                return
+
+            async def delete(name):
+                try:
+                    await self.retry(self.remote.delete, name)
+                    logger.info(f"Deleted old backup: {name}")
+                except Exception as e:
+                    logger.warning(f"Failed to delete {name}: {e}")
+
+            await asyncio.gather(*(delete(n) for n in names if n < fulls[-KEEP_CHAINS]))
+        except Exception as e:
+            logger.warning(f"Cleanup failed: {e}")
+
+    async def restore(self):
+        """
+        Download and restore the newest backup chain
+
+        The newest full backup is restored first and every incremental backup made after it is
+        replayed in order. If an incremental is missing or doesn't follow the previous one, the
+        restore stops at the last consistent backup.
+        """
+        temp_path = "temp_restore.db"
+        archives = []
 
-        for backup in backups_to_delete:
+        async with self.lock:
             try:
-                delete_url = f"https://api.github.com/repos/{repo}/contents/{backup['path']}"
-
-                req = urllib.request.Request(delete_url, headers=headers)
-                with urllib.request.urlopen(req) as resp:
-                    file_data = json.loads(resp.read().decode())
-
-                data = {
-                    "message": f"Cleanup: Remove old backup {backup['name']}",
-                    "sha": file_data['sha']
-                }
-
-                req = urllib.request.Request(
-                    delete_url,
-                    data=json.dumps(data).encode(),
-                    headers=headers,
-                    method='DELETE'
+                names = _backup_names(await self.retry(self.remote.list))
+                fulls = [n for n in names if _is_full(n)]
+                if not fulls:
+                    logger.warning("No backups found")
+                    return False
+
+                chain = names[names.index(fulls[-1]):]
+                archives = [(name, f"temp_restore_{i}.part") for i, name in enumerate(chain)]
+
+                # Downloads run concurrently (bounded by the semaphore), replaying waits for all of them
+                results = await asyncio.gather(
+                    *(self.retry(self.remote.download, name, path) for name, path in archives),
+                    return_exceptions=True
                 )
+                if isinstance(results[0], Exception):
+                    raise results[0]
+                failed = next((i for i, r in enumerate(results) if isinstance(r, Exception)), len(results))
 
-                with urllib.request.urlopen(req) as response:
-                    if response.status == 200:
-                        logger.info(f"Deleted old backup: {backup['name']}")
-            except Exception as e:
-                logger.warning(f"Failed to delete {backup['name']}: {e}")
+                applied = await _in_thread(_unpack_chain, archives[:failed], temp_path)
+                success = await _in_thread(_restore_from_temp, temp_path)
 
-    except Exception as e:
-        logger.warning(f"Cleanup failed: {e}")
+                if success:
+                    await _in_thread(self._continue_chain, temp_path, applied, chain.index(applied))
+                    logger.info(f"Restored from cloud: {applied}")
 
-def backup_to_github():
-    """Upload database backup to GitHub repository"""
-    try:
-        import base64
-        import urllib.request
-        import json
-
-        token = os.getenv("GITHUB_TOKEN")
-        repo = os.getenv("GITHUB_BACKUP_REPO")
+                return success
+            except Exception as e:
+                logger.error(f"Cloud restore failed: {e}")
+                return False
+            finally:
+                await _in_thread(_remove_files, temp_path, *(path for _, path in archives))
+
+    @staticmethod
+    def _continue_chain(path, applied, since_full):
+        # Continue the restored chain instead of starting the next backup from scratch
+        if not applied.endswith(".gz"):
+            _remove_files(STATE_PATH)
+            return
 
-        if not token or not repo:
-            logger.error("GITHUB_TOKEN or GITHUB_BACKUP_REPO not set")
-            return False
+        page_size = _page_size(path)
+        _save_state(applied, page_size, [_page_hash(page) for page in _iter_pages(path, page_size)], since_full)
 
-        temp_backup = _create_temp_backup()
-        if not temp_backup:
+    def trigger(self, reason):
+        """Request a backup soon. Safe to call from any thread; repeated requests are coalesced"""
+        if not self.loop:
             return False
 
-        try:
-            with open(temp_backup, "rb") as f:
-                content = base64.b64encode(f.read()).decode()
-        finally:
-            if os.path.exists(temp_backup):
-                os.remove(temp_backup)
+        self.loop.call_soon_threadsafe(self._schedule, reason)
+        return True
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = f"backups/backup_{timestamp}.db"
+    def _schedule(self, reason):
+        if self.pending and not self.pending.done():
+            logger.debug(f"Backup already scheduled, coalescing trigger: {reason}")
+            return
 
-        url = f"https://api.github.com/repos/{repo}/contents/{file_path}"
+        logger.info(f"{reason}, backing up in {TRIGGER_DELAY}s")
+        self.pending = self.loop.create_task(self._delayed_backup())
 
-        data = {
-            "message": f"Automated backup - {timestamp}",
-            "content": content
-        }
+    async def _delayed_backup(self):
+        await asyncio.sleep(TRIGGER_DELAY)
+        await self.backup()
 
-        headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+    async def run(self, interval_minutes):
+        self.loop = asyncio.get_running_loop()
+        logger.info(f"Starting periodic cloud backups every {interval_minutes} minutes")
 
-        req = urllib.request.Request(url, data=json.dumps(data).encode(), headers=headers, method='PUT')
+        try:
+            while True:
+                await asyncio.sleep(interval_minutes * 60)
+                await self.backup()
+        finally:
+            await self.remote.close()
 
-        with urllib.request.urlopen(req) as response:
-            if response.status == 201:
-                logger.info(f"Uploaded to GitHub: {file_path}")
-                cleanup_old_github_backups(token, repo, keep_count=2)
-                return True
-            else:
-                logger.error(f"GitHub upload failed: {response.status}")
-                return False
+_service = None
 
-    except Exception as e:
-        logger.error(f"GitHub backup failed: {e}")
-        return False
+def get_service():
+    global _service
+    if _service is None:
+        remote = get_remote()
+        if remote:
+            _service = BackupService(remote)
+    return _service
 
 def trigger_backup_on_session(user_id):
     """Trigger backup when new user session is created (non-blocking, thread-safe)"""
-    global _backup_in_progress
-
-    backup_service = os.getenv("CLOUD_BACKUP_SERVICE", "").lower()
-    if backup_service != "github":
-        return False
-
-    with _backup_lock:
-        if _backup_in_progress:
-            logger.debug(f"Backup already in progress, skipping trigger for user {user_id}")
-            return False
-
-        _backup_in_progress = True
-
-    def _backup_worker():
-        global _backup_in_progress
-        try:
-            logger.info(f"New session created for user {user_id}, triggering backup...")
-            backup_to_github()
-        except Exception as e:
-            logger.error(f"Session backup failed: {e}")
-        finally:
-            with _backup_lock:
-                _backup_in_progress = False
-
-    thread = threading.Thread(target=_backup_worker, daemon=True, name=f"SessionBackup-{user_id}")
-    thread.start()
-    return True
+    service = get_service()
+    return bool(service) and service.trigger(f"New session created for user {user_id}")
 
 def trigger_backup_on_critical_change(operation_name, user_id=None):
     """
     Trigger backup when critical database changes occur (non-blocking, thread-safe)
 
     Critical operations that trigger backup:
-    - add_ad_downloads: User earns ad download credits
     - set_premium: User gets premium subscription
     - set_user_type: User type changes
     - ban_user/unban_user: User ban status changes
-    - increment_usage: User downloads files
 
     This prevents data loss on Render/VPS restarts!
     """
-    global _backup_in_progress
-
-    backup_service = os.getenv("CLOUD_BACKUP_SERVICE", "").lower()
-    if backup_service != "github":
-        return False
-
-    with _backup_lock:
-        if _backup_in_progress:
-            logger.debug(f"Backup already in progress, skipping trigger for {operation_name}")
-            return False
-
-        _backup_in_progress = True
-
-    def _backup_worker():
-        global _backup_in_progress
-        try:
-            user_info = f" (user {user_id})" if user_id else ""
-            logger.info(f"Critical change detected: {operation_name}{user_info}, triggering backup...")
-            backup_to_github()
-        except Exception as e:
-            logger.error(f"Critical change backup failed: {e}")
-        finally:
-            with _backup_lock:
-                _backup_in_progress = False
-
-    thread = threading.Thread(target=_backup_worker, daemon=True, name=f"CriticalBackup-{operation_name}")
-    thread.start()
-    return True
-
-def restore_from_github(backup_name=None):
-    """
-    Download and restore database from GitHub
-
-    IMPORTANT: When deployed to Render or any service restart:
-    - This function ALWAYS downloads the NEWEST backup file
-    - Backups are sorted by filename (timestamp) in descending order
-    - The latest backup is automatically selected
-    - This ensures user data is preserved across service restarts
-    """
-    try:
-        import base64
-        import urllib.request
-        import json
-
-        token = os.getenv("GITHUB_TOKEN")
-        repo = os.getenv("GITHUB_BACKUP_REPO")
-
-        if not token or not repo:
-            logger.error("GITHUB_TOKEN or GITHUB_BACKUP_REPO not set")
-            return False
-
-        if not backup_name:
-            list_url = f"https://api.github.com/repos/{repo}/contents/backups"
-            headers = {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-
-            req = urllib.request.Request(list_url, headers=headers)
-
-            with urllib.request.urlopen(req) as response:
-                backups = json.loads(response.read().decode())
-
-            if not backups:
-                logger.warning("No backups found in GitHub")
-                return False
-
-            latest = sorted(backups, key=lambda x: x['name'], reverse=True)[0]
-            backup_name = latest['name']
-            download_url = latest['download_url']
-        else:
-            download_url = f"https://raw.githubusercontent.com/{repo}/main/backups/{backup_name}"
-
-        req = urllib.request.Request(download_url)
-
-        with urllib.request.urlopen(req) as response:
-            backup_content = response.read()
-
-        temp_path = "temp_restore.db"
-        try:
-            with open(temp_path, "wb") as f:
-                f.write(backup_content)
-
-            success = _restore_from_temp(temp_path)
-
-            if success:
-                logger.info(f"Restored from GitHub: {backup_name}")
-
-            return success
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-    except Exception as e:
-        logger.error(f"GitHub restore failed: {e}")
-        return False
+    service = get_service()
+    user_info = f" (user {user_id})" if user_id else ""
+    return bool(service) and service.trigger(f"Critical change detected: {operation_name}{user_info}")
 
 async def periodic_cloud_backup(interval_minutes=10):
-    """Run periodic GitHub backups in the background"""
-    import asyncio
-
-    backup_service = os.getenv("CLOUD_BACKUP_SERVICE", "").lower()
-
-    if backup_service != "github":
-        logger.debug("GitHub backup not enabled")
+    """Run periodic cloud backups in the background"""
+    service = get_service()
+    if not service:
+        logger.debug("Cloud backup not enabled")
         return
 
-    logger.info(f"Starting periodic GitHub backups every {interval_minutes} minutes")
-
-    while True:
-        try:
-            await asyncio.sleep(interval_minutes * 60)
-            backup_to_github()
-        except Exception as e:
-            logger.error(f"Error in periodic GitHub backup: {e}")
-            await asyncio.sleep(600)
+    await service.run(interval_minutes)
 
 async def restore_latest_from_cloud():
-    """Restore latest backup from GitHub"""
+    """Restore latest backup chain from the configured remote"""
     backup_service = os.getenv("CLOUD_BACKUP_SERVICE", "").lower()
+    service = get_service()
 
-    if not backup_service or backup_service != "github":
-        logger.debug(f"GitHub backup not configured (service: {backup_service})")
+    if not service:
+        logger.debug(f"Cloud backup not configured (service: {backup_service})")
         return False
 
-    logger.info("Attempting to restore from GitHub...")
-    return restore_from_github()
+    logger.info(f"Attempting to restore from {backup_service}...")
+    return await service.restore()
 
 if __name__ == "__main__":
     print("=" * 60)
-    print("GitHub Backup Utility")
+    print("Cloud Backup Utility")
     print("=" * 60)
-    print("\n1. Backup to GitHub")
-    print("2. Restore from GitHub")
+    print("\n1. Backup to cloud")
+    print("2. Restore from cloud")
 
     choice = input("\nEnter choice (1-2): ").strip()
 
+    async def main(action):
+        service = get_service()
+        if not service:
+            print("CLOUD_BACKUP_SERVICE is not configured")
+            return
+        try:
+            await action(service)
+        finally:
+            await service.remote.close()
+
     if choice == "1":
-        backup_to_github()
+        asyncio.run(main(BackupService.backup))
     elif choice == "2":
-        import asyncio
-        asyncio.run(restore_latest_from_cloud())
+        asyncio.run(main(BackupService.restore))
@@ -2,7 +2,7 @@ import os
 import asyncio
 import logging
 from bot.logger import setup_logger, cleanup_loop
-from pyrogram import Client
+from pyrogram import Client, enums
 from dotenv import load_dotenv
 
 # Initialize logging
@@ -32,6 +32,17 @@ MAX_CONCURRENT_DOWNLOADS = 10
 MAX_CONCURRENT_UPLOADS = 20
 FREE_USER_COOLDOWN = 60
 BATCH_DELAY = 5
+# Bound pending updates so floods/broadcast replies can't grow memory without limit. Beyond it the oldest
+# pending updates are dropped: blocking would only move them into pending tasks, which are not bounded
+UPDATES_QUEUE_SIZE = int(os.environ.get("UPDATES_QUEUE_SIZE", 1000))
+# Broadcast: messages per second across all senders (Telegram allows bots about 30/s) and parallel senders
+BROADCAST_RATE = float(os.environ.get("BROADCAST_RATE", 25))
+BROADCAST_SENDERS = int(os.environ.get("BROADCAST_SENDERS", 8))
+# Albums: MB of download buffers all album items may hold at once (items beyond that wait for a slot)
+ALBUM_MEMORY_BUDGET = int(os.environ.get("ALBUM_MEMORY_BUDGET", 64)) * 1024 * 1024
+# Uploads from this size (MB) up are checkpointed part by part and resumed after a failure or a restart
+RESUMABLE_UPLOAD_MIN = int(os.environ.get("RESUMABLE_UPLOAD_MIN", 100)) * 1024 * 1024
+UPLOAD_ATTEMPTS = int(os.environ.get("UPLOAD_ATTEMPTS", 3))
 
 def get_smart_download_workers(file_size):
     """
@@ -68,7 +79,6 @@ import asyncio
 #     pass
 
 active_downloads = set()
-cancel_flags = set()
 global_download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
 global_upload_semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
 login_states = {}
@@ -88,6 +98,8 @@ RICHADS_PUBLISHER_ID = os.environ.get("RICHADS_PUBLISHER_ID", "792361")
 RICHADS_WIDGET_ID = os.environ.get("RICHADS_WIDGET_ID", "351352")
 AD_DAILY_LIMIT = int(os.environ.get("AD_DAILY_LIMIT", 5))
 AD_FOR_PREMIUM = os.environ.get("AD_FOR_PREMIUM", "False").lower() == "true"
+# Seconds a prefetched ad stays usable
+AD_CACHE_TTL = int(os.environ.get("AD_CACHE_TTL", 300))
 
 # TURBO: Maximum concurrent transmissions for fastest speed
 app = Client(
@@ -96,5 +108,11 @@ app = Client(
     api_hash=API_HASH, 
     bot_token=BOT_TOKEN,
     in_memory=True,
-    max_concurrent_transmissions=100
+    max_concurrent_transmissions=100,
+    updates_queue_size=UPDATES_QUEUE_SIZE,
+    updates_overflow_policy=enums.UpdatesOverflowPolicy.DROP_OLDEST,
+    # Downloads run as supervised tasks, so keeping each user's updates in order can't stall the workers
+    ordered_updates=True,
+    # Nothing but /broadcast reads replied-to messages, and it resolves them itself
+    lazy_parse=True
 )
@@ -1,70 +1,258 @@
 import os
+import json
+import asyncio
 import sqlite3
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
-from threading import Lock
 from bot.config import OWNER_ID
+from bot.cloud_backup import trigger_backup_on_session, trigger_backup_on_critical_change
 
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 DATABASE_PATH = os.environ.get("DATABASE_PATH", "telegram_bot.db")
 
-db_lock = Lock()
+# Number of read-only connections (one per reader thread). Writes always go through a single writer connection.
+DB_READERS = int(os.environ.get("DB_READERS", 3))
+
+# Connections are long-lived and owned by the executor thread that opened them, so the PRAGMAs run once
+# per connection and sqlite3's per-connection statement cache keeps the prepared statements around.
+_local = threading.local()
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+_readers = ThreadPoolExecutor(max_workers=DB_READERS, thread_name_prefix="db-reader")
 _db_initialized = False
 
-def _get_connection():
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, timeout=30.0)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    conn.execute("PRAGMA cache_size=-64000")
-    conn.execute("PRAGMA temp_store=MEMORY")
+FREE_DAILY_LIMIT = 5
+
+# Recently used user records, most recent last. Ad counters and the last download time are applied to the
+# cached record and queued in _dirty, which flush_users() writes out in one batched transaction. The download
+# quota is not part of it: it is reserved atomically in the database, see reserve_quota().
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 5000))
+USER_FLUSH_INTERVAL = int(os.environ.get("USER_FLUSH_INTERVAL", 5))
+_COUNTER_FIELDS = ("ads_today", "last_ad_date", "last_download_time")
+_user_cache = OrderedDict()
+_dirty = {}
+# Bumped on every invalidation so a read that raced with a write doesn't cache the row it fetched before the write
+_cache_epoch = 0
+
+# Every row of the settings table, keyed by name. Settings only change through update_setting(), which updates
+# this after the write commits and then calls the subscribers registered for that key.
+_settings = None
+_setting_subscribers = {}
+
+def _get_connection(readonly=False):
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, timeout=30.0, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        _local.conn = conn
     return conn
 
+def _read(sql, params, many):
+    cursor = _get_connection(readonly=True).execute(sql, params)
+    return cursor.fetchall() if many else cursor.fetchone()
+
+def _write(func, *args):
+    conn = _get_connection()
+    with conn:
+        return func(conn, *args)
+
+def _execute_write(conn, sql, params):
+    return conn.execute(sql, params).rowcount
+
+async def _fetchone(sql, params=()):
+    """Run a SELECT on one of the reader connections and return the first row"""
+    return await asyncio.get_running_loop().run_in_executor(_readers, _read, sql, params, False)
+
+async def _fetchall(sql, params=()):
+    """Run a SELECT on one of the reader connections and return all rows"""
+    return await asyncio.get_running_loop().run_in_executor(_readers, _read, sql, params, True)
+
+async def _execute(sql, params=()):
+    """Run a single write statement on the writer connection, committed on its own. Returns the row count"""
+    return await asyncio.get_running_loop().run_in_executor(_writer, _write, _execute_write, sql, params)
+
+async def _transaction(func, *args):
+    """Run func(conn, *args) on the writer connection inside one transaction and return its result"""
+    return await asyncio.get_running_loop().run_in_executor(_writer, _write, func, *args)
+
+async def _load_user(user_id):
+    """Return the cached record of a user (not a copy), loading it from the database on a miss"""
+    key = str(user_id)
+    user = _user_cache.get(key)
+    if user is not None:
+        _user_cache.move_to_end(key)
+        return user
+    
+    epoch = _cache_epoch
+    row = await _fetchone('SELECT * FROM users WHERE telegram_id = ?', (key,))
+    
+    # Another miss for the same user may have cached a record meanwhile, which its caller may already have
+    # changed: share it instead of replacing it
+    cached = _user_cache.get(key)
+    if cached is not None:
+        _user_cache.move_to_end(key)
+        return cached
+    
+    if not row:
+        return None
+    
+    user = dict(row)
+    user['is_banned'] = bool(user['is_banned'])
+    user['is_agreed_terms'] = bool(user['is_agreed_terms'])
+    # Counters that haven't been flushed yet are newer than what the row says
+    user.update(_dirty.get(key, {}))
+    
+    if epoch == _cache_epoch:
+        _user_cache[key] = user
+        if len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    return user
+
+def _invalidate_user(user_id):
+    global _cache_epoch
+    _cache_epoch += 1
+    _user_cache.pop(str(user_id), None)
+
+def _mark_dirty(user):
+    _dirty[user["telegram_id"]] = {field: user.get(field) for field in _COUNTER_FIELDS}
+
+def _flush_counters(conn, rows):
+    conn.executemany('''
+        UPDATE users SET ads_today = ?, last_ad_date = ?, last_download_time = ?, updated_at = ?
+        WHERE telegram_id = ?
+    ''', rows)
+
+async def flush_users():
+    """Write all pending counter updates to the database in a single transaction"""
+    if not _dirty:
+        return
+    
+    # Entries stay in _dirty until the write has committed, so a cache miss in _load_user meanwhile still
+    # overlays them on the row it read, which may predate the commit
+    pending = list(_dirty.items())
+    now = datetime.utcnow().isoformat()
+    
+    try:
+        await _transaction(_flush_counters, [
+            (*(values[field] for field in _COUNTER_FIELDS), now, user_id)
+            for user_id, values in pending
+        ])
+    except Exception as e:
+        logger.error(f"Error flushing {len(pending)} user records: {e}")
+        return
+    
+    # _mark_dirty() stores a new dict on every change, so only the entries written above are removed
+    for user_id, values in pending:
+        if _dirty.get(user_id) is values:
+            del _dirty[user_id]
+
+async def flush_users_loop():
+    while True:
+        await asyncio.sleep(USER_FLUSH_INTERVAL)
+        await flush_users()
+
+def _init_schema(conn):
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            telegram_id TEXT PRIMARY KEY,
+            role TEXT DEFAULT 'free',
+            downloads_today INTEGER DEFAULT 0,
+            last_download_date TEXT,
+            is_agreed_terms INTEGER DEFAULT 0,
+            phone_session_string TEXT,
+            premium_expiry_date TEXT,
+            is_banned INTEGER DEFAULT 0,
+            ads_today INTEGER DEFAULT 0,
+            last_ad_date TEXT,
+            last_download_time REAL DEFAULT 0,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            json_value TEXT,
+            updated_at TEXT
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            from_chat_id INTEGER,
+            message_id INTEGER,
+            status_chat_id INTEGER,
+            status_message_id INTEGER,
+            status TEXT DEFAULT 'running',
+            last_user_id TEXT,
+            total INTEGER DEFAULT 0,
+            sent INTEGER DEFAULT 0,
+            blocked INTEGER DEFAULT 0,
+            deactivated INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    
+    # Files the bot already uploaded, by source post and media, so a repeat request is a single send_cached_media
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sent_files (
+            chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            unique_id TEXT NOT NULL,
+            file_id TEXT NOT NULL,
+            created_at TEXT,
+            PRIMARY KEY (chat_id, message_id, unique_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Large uploads in progress. The part bitmap is checkpointed while uploading, so a failed or interrupted
+    # upload (restart included) only sends the parts Telegram hasn't confirmed yet
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            path TEXT NOT NULL UNIQUE,
+            options TEXT,
+            status_chat_id INTEGER,
+            status_message_id INTEGER,
+            file_id INTEGER,
+            total_parts INTEGER DEFAULT 0,
+            parts BLOB,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_banned ON users(is_banned)')
+
 def init_db():
-    global _db_initialized
+    global _db_initialized, _settings
     if _db_initialized:
         return
     
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    telegram_id TEXT PRIMARY KEY,
-                    role TEXT DEFAULT 'free',
-                    downloads_today INTEGER DEFAULT 0,
-                    last_download_date TEXT,
-                    is_agreed_terms INTEGER DEFAULT 0,
-                    phone_session_string TEXT,
-                    premium_expiry_date TEXT,
-                    is_banned INTEGER DEFAULT 0,
-                    ads_today INTEGER DEFAULT 0,
-                    last_ad_date TEXT,
-                    last_download_time REAL DEFAULT 0,
-                    created_at TEXT,
-                    updated_at TEXT
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    json_value TEXT,
-                    updated_at TEXT
-                )
-            ''')
-            
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_banned ON users(is_banned)')
-            
-            conn.commit()
-            conn.close()
+        # Runs on the writer thread so the schema is created by the connection that will own all writes
+        _writer.submit(_write, _init_schema).result()
+        _settings = _writer.submit(_write, _load_settings).result()
             
         _db_initialized = True
         logger.info(f"SQLite database initialized: {DATABASE_PATH}")
@@ -74,17 +262,10 @@ def init_db():
 
 async def get_user(user_id) -> Optional[Dict]:
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE telegram_id = ?', (str(user_id),))
-            row = cursor.fetchone()
-            conn.close()
+        user = await _load_user(user_id)
         
-        if row:
-            user = dict(row)
-            user['is_banned'] = bool(user['is_banned'])
-            user['is_agreed_terms'] = bool(user['is_agreed_terms'])
+        if user:
+            user = dict(user)
             
             if OWNER_ID and str(user_id) == str(OWNER_ID):
                 if user.get("role") != "owner":
@@ -109,22 +290,16 @@ async def create_user(user_id) -> Optional[Dict]:
         now = datetime.utcnow().isoformat()
         today = datetime.utcnow().date().isoformat()
         
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT 1 FROM users WHERE telegram_id = ?', (str(user_id),))
-            if cursor.fetchone():
-                conn.close()
-                return await get_user(user_id)
-            
-            cursor.execute('''
-                INSERT INTO users (telegram_id, role, downloads_today, last_download_date, 
-                                   is_agreed_terms, is_banned, ads_today, created_at, updated_at)
-                VALUES (?, 'free', 0, ?, 0, 0, 0, ?, ?)
-            ''', (str(user_id), today, now, now))
-            conn.commit()
-            conn.close()
+        inserted = await _execute('''
+            INSERT OR IGNORE INTO users (telegram_id, role, downloads_today, last_download_date, 
+                                         is_agreed_terms, is_banned, ads_today, created_at, updated_at)
+            VALUES (?, 'free', 0, ?, 0, 0, 0, ?, ?)
+        ''', (str(user_id), today, now, now))
+        
+        if not inserted:
+            return await get_user(user_id)
+        
+        _invalidate_user(user_id)
         
         return {
             "telegram_id": str(user_id),
@@ -143,38 +318,27 @@ async def create_user(user_id) -> Optional[Dict]:
 
 async def update_user_terms(user_id, agreed=True):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET is_agreed_terms = ?, updated_at = ? WHERE telegram_id = ?',
-                           (1 if agreed else 0, datetime.utcnow().isoformat(), str(user_id)))
-            conn.commit()
-            conn.close()
+        await _execute('UPDATE users SET is_agreed_terms = ?, updated_at = ? WHERE telegram_id = ?',
+                       (1 if agreed else 0, datetime.utcnow().isoformat(), str(user_id)))
+        _invalidate_user(user_id)
     except Exception as e:
         logger.error(f"Error updating terms for {user_id}: {e}")
 
 async def save_session_string(user_id, session_string):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET phone_session_string = ?, updated_at = ? WHERE telegram_id = ?',
-                           (session_string, datetime.utcnow().isoformat(), str(user_id)))
-            conn.commit()
-            conn.close()
+        await _execute('UPDATE users SET phone_session_string = ?, updated_at = ? WHERE telegram_id = ?',
+                       (session_string, datetime.utcnow().isoformat(), str(user_id)))
+        _invalidate_user(user_id)
         logger.info(f"Saved session for user {user_id}")
+        trigger_backup_on_session(user_id)
     except Exception as e:
         logger.error(f"Error saving session for {user_id}: {e}")
 
 async def logout_user(user_id):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET phone_session_string = NULL, updated_at = ? WHERE telegram_id = ?',
-                           (datetime.utcnow().isoformat(), str(user_id)))
-            conn.commit()
-            conn.close()
+        await _execute('UPDATE users SET phone_session_string = NULL, updated_at = ? WHERE telegram_id = ?',
+                       (datetime.utcnow().isoformat(), str(user_id)))
+        _invalidate_user(user_id)
         logger.info(f"User {user_id} logged out")
     except Exception as e:
         logger.error(f"Error logging out user {user_id}: {e}")
@@ -185,28 +349,109 @@ async def set_user_role(user_id, role, duration_days=None):
         if role == 'premium' and duration_days:
             expiry_date = (datetime.utcnow() + timedelta(days=int(duration_days))).isoformat()
         
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET role = ?, premium_expiry_date = ?, updated_at = ? WHERE telegram_id = ?',
-                           (role, expiry_date, datetime.utcnow().isoformat(), str(user_id)))
-            conn.commit()
-            conn.close()
+        await _execute('UPDATE users SET role = ?, premium_expiry_date = ?, updated_at = ? WHERE telegram_id = ?',
+                       (role, expiry_date, datetime.utcnow().isoformat(), str(user_id)))
+        _invalidate_user(user_id)
+        trigger_backup_on_critical_change("set_user_type", user_id)
     except Exception as e:
         logger.error(f"Error setting role for {user_id}: {e}")
 
 async def ban_user(user_id, is_banned=True):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET is_banned = ?, updated_at = ? WHERE telegram_id = ?',
-                           (1 if is_banned else 0, datetime.utcnow().isoformat(), str(user_id)))
-            conn.commit()
-            conn.close()
+        await _execute('UPDATE users SET is_banned = ?, updated_at = ? WHERE telegram_id = ?',
+                       (1 if is_banned else 0, datetime.utcnow().isoformat(), str(user_id)))
+        _invalidate_user(user_id)
+        trigger_backup_on_critical_change("ban_user" if is_banned else "unban_user", user_id)
     except Exception as e:
         logger.error(f"Error banning user {user_id}: {e}")
 
+# Resets the day, checks the limit and counts the reservation in a single statement. Returns no row when the
+# user is banned, unknown or doesn't have enough downloads left.
+_RESERVE_QUOTA_SQL = '''
+    UPDATE users SET
+        downloads_today = (CASE WHEN last_download_date = :today THEN downloads_today ELSE 0 END) + :count,
+        last_download_date = :today
+    WHERE telegram_id = :user_id AND is_banned = 0
+      AND (CASE WHEN last_download_date = :today THEN downloads_today ELSE 0 END) + :count <= :limit
+    RETURNING downloads_today
+'''
+
+def _reserve_quota(conn, user_id, count, today):
+    params = {"user_id": user_id, "today": today, "limit": FREE_DAILY_LIMIT}
+    row = conn.execute(_RESERVE_QUOTA_SQL, {**params, "count": count}).fetchone()
+    
+    if row is None and count > 1:
+        # Not enough left for all of them, reserve whatever remains instead
+        used = conn.execute('''
+            SELECT CASE WHEN last_download_date = :today THEN downloads_today ELSE 0 END
+            FROM users WHERE telegram_id = :user_id AND is_banned = 0
+        ''', params).fetchone()
+        count = FREE_DAILY_LIMIT - used[0] if used else 0
+        if count > 0:
+            row = conn.execute(_RESERVE_QUOTA_SQL, {**params, "count": count}).fetchone()
+    
+    return (count, row[0]) if row else (0, None)
+
+def _refund_quota(conn, user_id, count, today):
+    row = conn.execute('''
+        UPDATE users SET downloads_today = MAX(downloads_today - ?, 0)
+        WHERE telegram_id = ? AND last_download_date = ?
+        RETURNING downloads_today
+    ''', (count, user_id, today)).fetchone()
+    return row[0] if row else None
+
+def _update_cached_quota(user_id, downloads_today, today):
+    user = _user_cache.get(str(user_id))
+    if user is not None:
+        user["downloads_today"] = downloads_today
+        user["last_download_date"] = today
+
+async def _is_unlimited(user_id, user, today):
+    if user.get("role") == 'premium' and user.get("premium_expiry_date"):
+        if user["premium_expiry_date"] < today:
+            await set_user_role(user_id, "free")
+            user["role"] = "free"
+    
+    return user.get("role") in ['premium', 'admin', 'owner']
+
+async def reserve_quota(user_id, count=1):
+    """
+    Reserve up to `count` downloads from today's quota, atomically.
+    
+    Returns (reserved, is_unlimited). Reserved downloads are already counted: keep them once delivered
+    and give back the ones that weren't with refund_quota(). Unlimited users reserve nothing.
+    """
+    try:
+        user = await get_user(user_id)
+        if not user or user.get("is_banned"):
+            return 0, False
+        
+        today = datetime.utcnow().date().isoformat()
+        
+        if await _is_unlimited(user_id, user, today):
+            return count, True
+        
+        reserved, downloads_today = await _transaction(_reserve_quota, str(user_id), count, today)
+        if reserved:
+            _update_cached_quota(user_id, downloads_today, today)
+        return reserved, False
+    except Exception as e:
+        logger.error(f"Error reserving quota for {user_id}: {e}")
+        return 0, False
+
+async def refund_quota(user_id, count):
+    """Give back downloads reserved with reserve_quota() that weren't delivered"""
+    if count <= 0:
+        return
+    
+    try:
+        today = datetime.utcnow().date().isoformat()
+        downloads_today = await _transaction(_refund_quota, str(user_id), count, today)
+        if downloads_today is not None:
+            _update_cached_quota(user_id, downloads_today, today)
+    except Exception as e:
+        logger.error(f"Error refunding quota for {user_id}: {e}")
+
 async def check_and_update_quota(user_id):
     try:
         user = await get_user(user_id)
@@ -218,25 +463,14 @@ async def check_and_update_quota(user_id):
         
         today = datetime.utcnow().date().isoformat()
         
-        if user.get("role") == 'premium' and user.get("premium_expiry_date"):
-            if user["premium_expiry_date"] < today:
-                await set_user_role(user_id, "free")
-                user["role"] = "free"
-        
-        if user.get("role") in ['premium', 'admin', 'owner']:
+        if await _is_unlimited(user_id, user, today):
             return True, "Unlimited"
         
+        # A new day starts from zero, the stored counter is reset by the next reservation
         if user.get("last_download_date") != today:
-            with db_lock:
-                conn = _get_connection()
-                cursor = conn.cursor()
-                cursor.execute('UPDATE users SET downloads_today = 0, last_download_date = ? WHERE telegram_id = ?',
-                               (today, str(user_id)))
-                conn.commit()
-                conn.close()
             user["downloads_today"] = 0
         
-        if user.get("downloads_today", 0) >= 5:
+        if user.get("downloads_today", 0) >= FREE_DAILY_LIMIT:
             return False, "Daily limit reached (5/5). Upgrade to Premium for unlimited downloads."
         
         return True, f"{user.get('downloads_today', 0)}/5"
@@ -244,146 +478,279 @@ async def check_and_update_quota(user_id):
         logger.error(f"Error checking quota for {user_id}: {e}")
         return False, "Database error."
 
-async def increment_quota(user_id, count=1):
-    try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET downloads_today = downloads_today + ? WHERE telegram_id = ?',
-                           (count, str(user_id)))
-            conn.commit()
-            conn.close()
-    except Exception as e:
-        logger.error(f"Error incrementing quota for {user_id}: {e}")
-
 async def increment_ad_count(user_id):
     try:
         today = datetime.utcnow().date().isoformat()
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET ads_today = ads_today + 1, last_ad_date = ? WHERE telegram_id = ?',
-                           (today, str(user_id)))
-            conn.commit()
-            conn.close()
+        user = await _load_user(user_id)
+        if user:
+            if user.get("last_ad_date") != today:
+                user["ads_today"] = 0
+            user["ads_today"] = (user.get("ads_today") or 0) + 1
+            user["last_ad_date"] = today
+            _mark_dirty(user)
     except Exception as e:
         logger.error(f"Error incrementing ad count for {user_id}: {e}")
 
 async def get_ad_count_today(user_id):
     try:
-        user = await get_user(user_id)
+        user = await _load_user(user_id)
         if not user:
             return 0
         
         today = datetime.utcnow().date().isoformat()
         if user.get("last_ad_date") != today:
-            with db_lock:
-                conn = _get_connection()
-                cursor = conn.cursor()
-                cursor.execute('UPDATE users SET ads_today = 0, last_ad_date = ? WHERE telegram_id = ?',
-                               (today, str(user_id)))
-                conn.commit()
-                conn.close()
+            user["ads_today"] = 0
+            user["last_ad_date"] = today
+            _mark_dirty(user)
             return 0
         return user.get("ads_today", 0)
     except Exception as e:
         logger.error(f"Error getting ad count for {user_id}: {e}")
         return 0
 
-async def get_remaining_quota(user_id):
-    try:
-        user = await get_user(user_id)
-        if not user:
-            return 0, False
-        
-        if user.get("role") in ['premium', 'admin', 'owner']:
-            return 999999, True
-        
-        today = datetime.utcnow().date().isoformat()
-        downloads_today = user.get("downloads_today", 0)
-        
-        if user.get("last_download_date") != today:
-            downloads_today = 0
-        
-        remaining = max(0, 5 - downloads_today)
-        return remaining, False
-    except Exception as e:
-        logger.error(f"Error getting remaining quota for {user_id}: {e}")
-        return 0, False
+def _load_settings(conn):
+    return {row["key"]: dict(row) for row in conn.execute('SELECT * FROM settings')}
+
+def _run_read(func):
+    return func(_get_connection(readonly=True))
+
+async def load_settings():
+    """(Re)load every setting into memory. Called by init_db(), and on first use if the database was set up elsewhere"""
+    global _settings
+    _settings = await asyncio.get_running_loop().run_in_executor(_readers, _run_read, _load_settings)
+
+def subscribe_setting(key, callback):
+    """Call callback(setting) whenever update_setting() changes key. setting is the new row as a dict;
+    callback may be a plain function or a coroutine function"""
+    _setting_subscribers.setdefault(key, []).append(callback)
+
+async def _notify_setting(key, setting):
+    for callback in _setting_subscribers.get(key, ()):
+        try:
+            result = callback(dict(setting))
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error in setting subscriber for {key}: {e}")
 
 async def get_setting(key):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM settings WHERE key = ?', (key,))
-            row = cursor.fetchone()
-            conn.close()
-        
-        if row:
-            return dict(row)
-        return None
+        if _settings is None:
+            await load_settings()
+
+        setting = _settings.get(key)
+        return dict(setting) if setting else None
     except Exception as e:
         logger.error(f"Error getting setting {key}: {e}")
         return None
 
+def _update_setting(conn, key, value, json_value, updated_at):
+    row = conn.execute('''
+        INSERT INTO settings (key, value, json_value, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, json_value = excluded.json_value,
+            updated_at = excluded.updated_at
+        RETURNING *
+    ''', (key, value, json_value, updated_at)).fetchone()
+    return dict(row)
+
 async def update_setting(key, value, json_value=None):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO settings (key, value, json_value, updated_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(key) DO UPDATE SET value = ?, json_value = ?, updated_at = ?
-            ''', (key, value, json_value, datetime.utcnow().isoformat(),
-                  value, json_value, datetime.utcnow().isoformat()))
-            conn.commit()
-            conn.close()
+        setting = await _transaction(_update_setting, key, value, json_value, datetime.utcnow().isoformat())
     except Exception as e:
         logger.error(f"Error updating setting {key}: {e}")
+        return
+
+    # Only changed once the write has committed; readers see either the old or the new row, never a mix
+    if _settings is not None:
+        _settings[key] = setting
+    await _notify_setting(key, setting)
 
 async def update_user_last_download(user_id, timestamp):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE users SET last_download_time = ?, updated_at = ? WHERE telegram_id = ?',
-                           (timestamp, datetime.utcnow().isoformat(), str(user_id)))
-            conn.commit()
-            conn.close()
+        user = await _load_user(user_id)
+        if user:
+            user["last_download_time"] = timestamp
+            _mark_dirty(user)
     except Exception as e:
         logger.error(f"Error updating last download time for {user_id}: {e}")
 
-async def get_all_users() -> List[Dict]:
-    try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users')
-            rows = cursor.fetchall()
-            conn.close()
+_USER_COLUMNS = (
+    "telegram_id", "role", "downloads_today", "last_download_date", "is_agreed_terms", "phone_session_string",
+    "premium_expiry_date", "is_banned", "ads_today", "last_ad_date", "last_download_time", "created_at", "updated_at"
+)
+
+def _user_filters(role=None, is_banned=None):
+    clauses, params = [], []
+    if role is not None:
+        clauses.append("role = ?")
+        params.append(role)
+    if is_banned is not None:
+        clauses.append("is_banned = ?")
+        params.append(1 if is_banned else 0)
+    return clauses, params
+
+async def iter_users(columns=("telegram_id",), role=None, is_banned=None, page_size=500, after=None):
+    """
+    Stream users page by page, selecting only the given columns.
+    
+    role and is_banned are matched in SQL, so the role/ban indexes do the filtering. Pages are fetched
+    by telegram_id (keyset pagination), so each one is a short indexed query on a reader connection
+    and only one page is held in memory at a time. Pass after to resume past a given telegram_id.
+    """
+    unknown = set(columns) - set(_USER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown user columns: {', '.join(sorted(unknown))}")
+    
+    columns = ["telegram_id", *(c for c in columns if c != "telegram_id")]
+    clauses, params = _user_filters(role, is_banned)
+    last_id = after
+    
+    while True:
+        page_clauses = clauses + (["telegram_id > ?"] if last_id is not None else [])
+        page_params = params + ([last_id] if last_id is not None else [])
+        where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+        
+        rows = await _fetchall(
+            f"SELECT {', '.join(columns)} FROM users {where} ORDER BY telegram_id LIMIT ?",
+            (*page_params, page_size)
+        )
         
-        users = []
         for row in rows:
-            user = dict(row)
-            user['is_banned'] = bool(user['is_banned'])
-            user['is_agreed_terms'] = bool(user['is_agreed_terms'])
-            users.append(user)
-        return users
-    except Exception as e:
-        logger.error(f"Error getting all users: {e}")
-        return []
+            yield dict(row)
+        
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["telegram_id"]
 
-async def get_user_count():
+async def get_user_count(role=None, is_banned=None):
     try:
-        with db_lock:
-            conn = _get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM users')
-            count = cursor.fetchone()[0]
-            conn.close()
-        return count
+        clauses, params = _user_filters(role, is_banned)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        row = await _fetchone(f'SELECT COUNT(*) FROM users {where}', params)
+        return row[0]
     except Exception as e:
         logger.error(f"Error getting user count: {e}")
         return 0
+
+def _create_broadcast(conn, params):
+    return conn.execute('''
+        INSERT INTO broadcasts (from_chat_id, message_id, status_chat_id, status_message_id, total, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', params).lastrowid
+
+async def create_broadcast(from_chat_id, message_id, status_chat_id, status_message_id, total) -> Optional[Dict]:
+    try:
+        now = datetime.utcnow().isoformat()
+        broadcast_id = await _transaction(_create_broadcast, (from_chat_id, message_id, status_chat_id,
+                                                              status_message_id, total, now, now))
+        row = await _fetchone('SELECT * FROM broadcasts WHERE id = ?', (broadcast_id,))
+        return dict(row)
+    except Exception as e:
+        logger.error(f"Error creating broadcast: {e}")
+        return None
+
+async def save_broadcast_progress(broadcast_id, last_user_id, stats, status="running"):
+    try:
+        await _execute('''
+            UPDATE broadcasts SET last_user_id = ?, sent = ?, blocked = ?, deactivated = ?, failed = ?,
+                                  status = ?, updated_at = ?
+            WHERE id = ?
+        ''', (last_user_id, stats["sent"], stats["blocked"], stats["deactivated"], stats["failed"],
+              status, datetime.utcnow().isoformat(), broadcast_id))
+    except Exception as e:
+        logger.error(f"Error saving broadcast {broadcast_id} progress: {e}")
+
+async def get_unfinished_broadcasts() -> List[Dict]:
+    try:
+        rows = await _fetchall("SELECT * FROM broadcasts WHERE status = 'running' ORDER BY id")
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting unfinished broadcasts: {e}")
+        return []
+
+async def get_sent_file(chat_id, message_id, unique_id) -> Optional[str]:
+    """file_id of the bot's earlier upload of this media, or None"""
+    try:
+        row = await _fetchone(
+            'SELECT file_id FROM sent_files WHERE chat_id = ? AND message_id = ? AND unique_id = ?',
+            (chat_id, message_id, unique_id)
+        )
+        return row["file_id"] if row else None
+    except Exception as e:
+        logger.error(f"Error getting sent file {chat_id}/{message_id}: {e}")
+        return None
+
+async def save_sent_file(chat_id, message_id, unique_id, file_id):
+    try:
+        await _execute('''
+            INSERT INTO sent_files (chat_id, message_id, unique_id, file_id, created_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(chat_id, message_id, unique_id) DO UPDATE SET file_id = excluded.file_id,
+                created_at = excluded.created_at
+        ''', (chat_id, message_id, unique_id, file_id, datetime.utcnow().isoformat()))
+    except Exception as e:
+        logger.error(f"Error saving sent file {chat_id}/{message_id}: {e}")
+
+async def delete_sent_file(chat_id, message_id, unique_id):
+    try:
+        await _execute(
+            'DELETE FROM sent_files WHERE chat_id = ? AND message_id = ? AND unique_id = ?',
+            (chat_id, message_id, unique_id)
+        )
+    except Exception as e:
+        logger.error(f"Error deleting sent file {chat_id}/{message_id}: {e}")
+
+def _upload_job(row):
+    job = dict(row)
+    job["options"] = json.loads(job["options"] or "{}")
+    return job
+
+def _create_upload_job(conn, params):
+    # A job left for the same path by an earlier attempt is replaced, its parts belong to a different file
+    conn.execute('DELETE FROM upload_jobs WHERE path = ?', (params[1],))
+    return conn.execute('''
+        INSERT INTO upload_jobs (user_id, path, options, status_chat_id, status_message_id, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', params).lastrowid
+
+async def create_upload_job(user_id, path, options, status_chat_id, status_message_id) -> Optional[Dict]:
+    try:
+        now = datetime.utcnow().isoformat()
+        job_id = await _transaction(_create_upload_job, (str(user_id), path, json.dumps(options),
+                                                         status_chat_id, status_message_id, now, now))
+        row = await _fetchone('SELECT * FROM upload_jobs WHERE id = ?', (job_id,))
+        return _upload_job(row)
+    except Exception as e:
+        logger.error(f"Error creating upload job for {path}: {e}")
+        return None
+
+async def save_upload_checkpoint(job_id, file_id, total_parts, parts):
+    try:
+        await _execute(
+            'UPDATE upload_jobs SET file_id = ?, total_parts = ?, parts = ?, updated_at = ? WHERE id = ?',
+            (file_id, total_parts, parts, datetime.utcnow().isoformat(), job_id)
+        )
+    except Exception as e:
+        logger.error(f"Error saving upload job {job_id} checkpoint: {e}")
+
+async def get_upload_job(path) -> Optional[Dict]:
+    try:
+        row = await _fetchone('SELECT * FROM upload_jobs WHERE path = ?', (path,))
+        return _upload_job(row) if row else None
+    except Exception as e:
+        logger.error(f"Error getting upload job for {path}: {e}")
+        return None
+
+async def get_unfinished_uploads() -> List[Dict]:
+    try:
+        rows = await _fetchall('SELECT * FROM upload_jobs ORDER BY id')
+        return [_upload_job(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting unfinished uploads: {e}")
+        return []
+
+async def delete_upload_job(job_id):
+    try:
+        await _execute('DELETE FROM upload_jobs WHERE id = ?', (job_id,))
+    except Exception as e:
+        logger.error(f"Error deleting upload job {job_id}: {e}")
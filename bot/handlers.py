@@ -3,10 +3,14 @@ import os
 import time
 import io
 import aiofiles
-from pyrogram import filters, Client
+from pyrogram import filters, Client, enums
+from pyrogram.errors import UserNotParticipant
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message
 from bot.config import app, API_ID, API_HASH, active_downloads, global_download_semaphore
-from bot.database import get_user, check_and_update_quota, increment_quota, get_setting, get_remaining_quota
+from bot.database import (
+    get_user, check_and_update_quota, get_setting, subscribe_setting, reserve_quota, refund_quota,
+    get_sent_file, save_sent_file, delete_sent_file, create_upload_job, get_upload_job
+)
 
 async def progress_bar(current, total, message, type_msg):
     if total == 0:
@@ -59,29 +63,189 @@ async def progress_bar(current, total, message, type_msg):
         except Exception:
             pass
 
-async def verify_force_sub(client, user_id):
-    from bot.config import OWNER_ID
-    
-    # Check database setting for force sub channel
+# Membership results per user: (is_member, expires_at). Positive results live longer than negative ones so a
+# user who just joined isn't kept waiting, and ChatMemberUpdated updates drop entries as soon as they change.
+FORCE_SUB_TTL = 600
+FORCE_SUB_NEGATIVE_TTL = 60
+FORCE_SUB_CACHE_SIZE = 10000
+force_sub_cache = {}
+
+async def get_force_sub_channel():
     setting = await get_setting("force_sub_channel")
-    if not setting or not setting.get('value'):
-        return True, None
-        
-    channel = setting['value']
-    # Ensure channel starts with @ for compatibility
-    if not channel.startswith("@") and not channel.startswith("-100"):
+    channel = setting.get('value') if setting else None
+    if channel and not channel.startswith("@") and not channel.startswith("-100"):
+        # Ensure channel starts with @ for compatibility
         channel = f"@{channel}"
-        
+    return channel or None
+
+def force_sub_channel_changed(setting):
+    # Memberships were checked against the old channel
+    force_sub_cache.clear()
+
+subscribe_setting("force_sub_channel", force_sub_channel_changed)
+
+async def get_dump_channel_id():
+    # The /set_dump setting wins over the DUMP_CHANNEL_ID env var
+    setting = await get_setting("dump_channel_id")
+    if setting and setting.get('value'):
+        return setting['value']
+    return os.environ.get("DUMP_CHANNEL_ID")
+
+# A stored file_id failing with one of these can't be reused, the file has to be uploaded again
+STALE_FILE_ERRORS = ("FILE_REFERENCE_EMPTY", "FILE_REFERENCE_EXPIRED", "FILE_REFERENCE_INVALID", "MEDIA_EMPTY")
+
+def get_media(msg):
+    # The Video/Document/Photo/... object of a message
+    return getattr(msg, msg.media.value, None) if msg and msg.media else None
+
+async def send_cached_file(client, user_id, media_msg, caption):
+    """Send the bot's earlier upload of this post's media, if there is one. Returns the sent message or None"""
+    media = get_media(media_msg)
+    if not media or not media_msg.chat:
+        return None
+
+    key = (media_msg.chat.id, media_msg.id, media.file_unique_id)
+    file_id = await get_sent_file(*key)
+    if not file_id:
+        return None
+
     try:
-        member = await client.get_chat_member(channel, user_id)
-        if member.status in ["left", "kicked"]:
-             return False, channel
+        return await client.send_cached_media(user_id, file_id, caption=caption)
+    except Exception as e:
+        if getattr(e, "ID", None) in STALE_FILE_ERRORS:
+            await delete_sent_file(*key)
+        else:
+            print(f"[DEBUG] send_cached_media failed: {e}, falling back to download")
+        return None
+
+async def remember_sent_file(media_msg, sent_msg):
+    media, sent_media = get_media(media_msg), get_media(sent_msg)
+    if media and sent_media and media_msg.chat:
+        await save_sent_file(media_msg.chat.id, media_msg.id, media.file_unique_id, sent_media.file_id)
+
+async def upload_file(client, user_id, path, media_msg, status_msg, link, caption=None, **kwargs):
+    """upload_media_fast, checkpointed into an upload job when it is a video or document big enough to be worth resuming"""
+    from bot.transfer import upload_media_fast, upload_resumable, is_resumable
+    from bot.config import RESUMABLE_UPLOAD_MIN
+
+    job = None
+    if is_resumable(path, **kwargs) and os.path.getsize(path) >= RESUMABLE_UPLOAD_MIN:
+        media = get_media(media_msg)
+        options = {
+            "caption": caption,
+            "link": link,
+            "chat_id": media_msg.chat.id if media_msg.chat else None,
+            "message_id": media_msg.id,
+            "unique_id": media.file_unique_id if media else None
+        }
+        if "duration" in kwargs:
+            options.update(duration=kwargs["duration"], width=kwargs.get("width", 0), height=kwargs.get("height", 0))
+        job = await create_upload_job(user_id, path, options, status_msg.chat.id, status_msg.id)
+
+    if not job:
+        return await upload_media_fast(client, user_id, path, caption=caption, **kwargs)
+    return await upload_resumable(client, job, caption=caption, **kwargs)
+
+async def relay_album(client, user_client, user_id, chat_id, album, status_msg, link, copy=False):
+    """Deliver an album to the user as one album. Returns the sent messages, or None if it has to go item by item"""
+    try:
+        if copy:
+            # Direct copy is fastest for public links (channels)
+            sent = await client.copy_media_group(user_id, chat_id, album[0].id)
+        else:
+            from bot.transfer import relay_media_group
+            from bot.config import global_upload_semaphore
+            file_ids = []
+            for m in album:
+                media = get_media(m)
+                file_ids.append(await get_sent_file(m.chat.id, m.id, media.file_unique_id) if media and m.chat else None)
+
+            try:
+                await status_msg.edit_text(f"📥 Downloading album ({len(album)} files)...")
+            except:
+                pass
+
+            async with global_upload_semaphore:
+                sent = await asyncio.wait_for(
+                    relay_media_group(
+                        client, user_client, user_id, album, file_ids,
+                        progress_callback=progress_bar,
+                        download_args=(status_msg, f"📥 Downloading album ({len(album)} files)"),
+                        upload_args=(status_msg, f"📤 Uploading album ({len(album)} files)")
+                    ),
+                    timeout=1200
+                )
+    except Exception as e:
+        print(f"[DEBUG] Album relay failed: {e}, sending items one by one")
+        return None
+
+    try:
+        from bot.database import update_user_last_download
+        await update_user_last_download(user_id, time.time())
+    except:
+        pass
+
+    for media_msg, sent_msg in zip(album, sent):
+        await remember_sent_file(media_msg, sent_msg)
+
+    dump_id = await get_dump_channel_id()
+    if dump_id and sent:
+        try:
+            captions = [f"From User: `{user_id}`\nLink: {link}\n\n{m.caption or ''}".strip() for m in album]
+            await client.copy_media_group(int(dump_id), user_id, sent[0].id, captions=captions)
+        except Exception as e:
+            print(f"Dump failed: {e}")
+
+    return sent
+
+def cache_force_sub(user_id, is_member):
+    now = time.time()
+    if len(force_sub_cache) >= FORCE_SUB_CACHE_SIZE:
+        for uid in [uid for uid, (_, expires_at) in force_sub_cache.items() if expires_at <= now]:
+            del force_sub_cache[uid]
+        if len(force_sub_cache) >= FORCE_SUB_CACHE_SIZE:
+            force_sub_cache.pop(next(iter(force_sub_cache)))
+
+    force_sub_cache[user_id] = (is_member, now + (FORCE_SUB_TTL if is_member else FORCE_SUB_NEGATIVE_TTL))
+
+async def verify_force_sub(client, user_id):
+    channel = await get_force_sub_channel()
+    if not channel:
         return True, None
+
+    cached = force_sub_cache.get(user_id)
+    if cached and cached[1] > time.time():
+        return (True, None) if cached[0] else (False, channel)
+
+    try:
+        member = await client.get_chat_member(channel, user_id)
+        is_member = member.status not in (enums.ChatMemberStatus.LEFT, enums.ChatMemberStatus.BANNED)
+    except UserNotParticipant:
+        is_member = False
     except Exception as e:
-        # If user is not in the channel, pyrogram raises an error
-        # We catch it and return False to trigger the join prompt
+        # Not cached: the check itself failed (e.g. FloodWait), retry it on the next message
+        print(f"Force sub check failed for {user_id}: {e}")
         return False, channel
 
+    cache_force_sub(user_id, is_member)
+    return (True, None) if is_member else (False, channel)
+
+def is_force_sub_chat(chat, channel):
+    if str(chat.id) == channel:
+        return True
+    return bool(chat.username) and chat.username.lower() == channel.lstrip("@").lower()
+
+@app.on_chat_member_updated()
+async def force_sub_member_updated(client, update):
+    # Only seen for channels where the bot is an admin, which it has to be for get_chat_member anyway
+    channel = await get_force_sub_channel()
+    if not channel or not is_force_sub_chat(update.chat, channel):
+        return
+
+    member = update.new_chat_member or update.old_chat_member
+    if member and member.user:
+        force_sub_cache.pop(member.user.id, None)
+
 @app.on_message(filters.command("help") & filters.private)
 async def help_command(client, message):
     help_text = (
@@ -100,65 +264,12 @@ async def help_command(client, message):
     )
     await message.reply(help_text)
 
-@app.on_message(filters.command("batch") & filters.private)
-async def batch_command(client, message):
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-    
-    if not user or user.get('role') == 'free':
-        await message.reply("⛔ Batch download is for **Premium** users only. Use /upgrade to level up!")
-        return
-        
-    try:
-        parts = message.text.split()
-        if len(parts) < 3:
-             await message.reply("Usage: `/batch <start_link> <end_link>`")
-             return
-             
-        start_link = parts[1]
-        end_link = parts[2]
-        
-        import re
-        start_match = re.search(r"t\.me/([^/]+)/(\d+)", start_link) or re.search(r"t\.me/c/(\d+)/(\d+)", start_link)
-        end_match = re.search(r"t\.me/([^/]+)/(\d+)", end_link) or re.search(r"t\.me/c/(\d+)/(\d+)", end_link)
-        
-        if not start_match or not end_match:
-            await message.reply("❌ Invalid links provided.")
-            return
-            
-        chat_id = start_match.group(1)
-        if "t.me/c/" in start_link:
-            chat_id = int("-100" + chat_id)
-            
-        start_id = int(start_match.group(2))
-        end_id = int(end_match.group(2))
-        
-        if start_id > end_id:
-            start_id, end_id = end_id, start_id
-            
-        count = end_id - start_id + 1
-        if count > 50:
-            await message.reply("⚠️ You can only batch up to 50 messages at a time.")
-            return
-            
-        await message.reply(f"🚀 Starting batch download of {count} messages...")
-        
-        for msg_id in range(start_id, end_id + 1):
-            # Create a mock message to reuse download_handler logic
-            mock_message = message
-            mock_message.text = f"https://t.me/{start_match.group(1)}/{msg_id}"
-            if "t.me/c/" in start_link:
-                 mock_message.text = f"https://t.me/c/{start_match.group(1)}/{msg_id}"
-            
-            await download_handler(client, mock_message)
-            # 5 second delay for batch as requested
-            from bot.config import BATCH_DELAY
-            await asyncio.sleep(BATCH_DELAY) 
-            
-    except Exception as e:
-        await message.reply(f"❌ Batch error: {str(e)}")
-
 @app.on_message(filters.regex(r"https://t\.me/") & filters.private)
+async def download_link(client, message):
+    # Transfers can take many minutes: run them as a supervised task so the update workers stay free
+    # for /start, /cancel and callback queries. /cancel and /killall cancel the task itself.
+    client.spawn_task(download_handler(client, message), name=f"download_{message.from_user.id}", group="downloads")
+
 async def download_handler(client, message):
     user_id = message.from_user.id
     
@@ -203,18 +314,25 @@ async def download_handler(client, message):
         await message.reply("⚠️ You already have a download in progress. Please wait.")
         return
 
-    active_downloads.add(user_id)
-    status_msg = await message.reply("🔍 Checking link...")
-    
+    status_msg = None
     user_client = None
     path = None
-    
-    if global_download_semaphore.locked():
-         await status_msg.edit_text("⚠️ Server busy. You are in the queue, please wait...")
-
-    await global_download_semaphore.acquire()
+    thumb_task = None
+    reserved_quota = 0
+    downloaded_count = 0
+    # Released in finally only if taken, a download cancelled while queued never got a slot
+    acquired = False
     
     try:
+        active_downloads.add(user_id)
+        status_msg = await message.reply("🔍 Checking link...")
+        
+        if global_download_semaphore.locked():
+             await status_msg.edit_text("⚠️ Server busy. You are in the queue, please wait...")
+
+        await global_download_semaphore.acquire()
+        acquired = True
+        
         link = message.text.strip()
         
         import re
@@ -305,8 +423,6 @@ async def download_handler(client, message):
             if is_group:
                 msg_text = "❌ Login is mandatory for public group links to download media. Use /login to connect your account."
             await status_msg.edit_text(msg_text)
-            active_downloads.discard(user_id)
-            global_download_semaphore.release()
             return
 
         # Handle user client session correctly with retry logic
@@ -322,7 +438,8 @@ async def download_handler(client, message):
                             in_memory=True, 
                             api_id=API_ID, 
                             api_hash=API_HASH,
-                            no_updates=True
+                            no_updates=True,
+                            lazy_parse=True
                         )
                         await user_client.start()
                         break
@@ -339,8 +456,6 @@ async def download_handler(client, message):
             
             if not user_client:
                 await status_msg.edit_text("❌ User session failed or not found. Please /login again.")
-                active_downloads.discard(user_id)
-                global_download_semaphore.release()
                 return
         else:
             user_client = client
@@ -354,8 +469,6 @@ async def download_handler(client, message):
                     # We must use the user_client (logged in user session) to fetch stories
                     if not user_client or user_client == client:
                          await status_msg.edit_text("❌ Login is mandatory for downloading stories. Use /login to connect your account.")
-                         active_downloads.discard(user_id)
-                         global_download_semaphore.release()
                          return
                     msg = await user_client.get_stories(chat_id, message_id)
                 else:
@@ -364,8 +477,6 @@ async def download_handler(client, message):
                 if not msg:
                     print(f"[DEBUG] get_messages returned None for chat_id={chat_id}, message_id={message_id}")
                     await status_msg.edit_text("❌ Could not find message. Link might be invalid or expired.")
-                    active_downloads.discard(user_id)
-                    global_download_semaphore.release()
                     return
                 
                 messages_to_process = [msg]
@@ -382,9 +493,12 @@ async def download_handler(client, message):
                         print(f"[DEBUG] get_media_group failed: {e}, processing single message")
                         messages_to_process = [msg]
                 
-                remaining_quota, is_unlimited = await get_remaining_quota(user_id)
+                # Reserved up front so parallel requests can't overshoot the daily limit,
+                # whatever isn't delivered is refunded when the handler finishes
                 total_files = len(messages_to_process)
-                files_to_download = min(total_files, remaining_quota) if not is_unlimited else total_files
+                files_to_download, is_unlimited = await reserve_quota(user_id, total_files)
+                if not is_unlimited:
+                    reserved_quota = files_to_download
                 quota_limited = files_to_download < total_files and not is_unlimited
                 
                 if files_to_download == 0:
@@ -392,20 +506,21 @@ async def download_handler(client, message):
                         "⛔ Daily limit reached (5/5). Upgrade to Premium for unlimited downloads.",
                         reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("💎 Upgrade to Premium", callback_data="upgrade_prompt")]])
                     )
-                    active_downloads.discard(user_id)
-                    global_download_semaphore.release()
                     return
                 
                 downloaded_count = 0
-                for idx, media_msg in enumerate(messages_to_process[:files_to_download]):
-                    from bot.config import cancel_flags
-                    if user_id in cancel_flags:
-                        await status_msg.edit_text("❌ Download cancelled by user.")
-                        cancel_flags.discard(user_id)
-                        active_downloads.discard(user_id)
-                        global_download_semaphore.release()
-                        return
+                album = messages_to_process[:files_to_download]
+                if is_media_group and len(album) > 1 and all(m.media for m in album):
+                    # Whole album in one go: items transfer side by side and arrive as one album again
+                    sent_album = await relay_album(
+                        client, user_client, user_id, chat_id, album, status_msg, link,
+                        copy=not is_group and user_client == client and files_to_download == total_files
+                    )
+                    if sent_album:
+                        downloaded_count += len(sent_album)
+                        album = []
 
+                for idx, media_msg in enumerate(album):
                     if not media_msg.media:
                         if media_msg.text:
                             # Handle text-only messages
@@ -422,10 +537,7 @@ async def download_handler(client, message):
                                     pass
                                 downloaded_count += 1
                                 # Handle dumping for text messages
-                                dump_id = os.environ.get("DUMP_CHANNEL_ID")
-                                db_dump = await get_setting("dump_channel_id")
-                                if db_dump and db_dump.get('value'):
-                                    dump_id = db_dump['value']
+                                dump_id = await get_dump_channel_id()
                                 if dump_id and sent_msg:
                                     try:
                                         dump_id_int = int(dump_id)
@@ -446,6 +558,7 @@ async def download_handler(client, message):
                     
                     path = None
                     sent_msg = None
+                    thumb_task = None
                     file_size = 0
                     
                     if is_story:
@@ -481,12 +594,25 @@ async def download_handler(client, message):
                         except Exception as e:
                             print(f"[DEBUG] copy_message failed: {e}, falling back to download")
                     
+                    if not path and not is_story:
+                        # Someone already requested this post: resend the bot's own upload instead of transferring it again
+                        sent = await send_cached_file(client, user_id, media_msg, media_msg.caption)
+                        if sent:
+                            path = "COPIED"
+                            sent_msg = sent
+                            try:
+                                from bot.database import update_user_last_download
+                                await update_user_last_download(user_id, time.time())
+                            except:
+                                pass
+                            downloaded_count += 1
+                    
                     if not path:
                         if use_memory:
                             # Use default Pyrogram download for small files
                             path = await user_client.download_media(media_msg, in_memory=True)
                         else:
-                            from bot.transfer import download_media_fast, upload_media_fast
+                            from bot.transfer import download_media_fast, start_thumb
                             # Get proper file extension from document or other media
                             ext = ""
                             if not is_story:
@@ -511,6 +637,9 @@ async def download_handler(client, message):
                             # Fallback to default if no extension found
                             file_suffix = f"_{media_msg.id}{ext}"
                             
+                            # Video thumbnail is fetched into memory while the video downloads
+                            thumb_task = start_thumb(user_client, media_msg.video) if media_msg.video else None
+                            
                             # Optimized fast transfer for larger files
                             path = await asyncio.wait_for(
                                 download_media_fast(
@@ -542,12 +671,6 @@ async def download_handler(client, message):
                                         caption=caption
                                     )
                                 elif msg.video:
-                                    thumb_path = None
-                                    try:
-                                        if msg.video.thumbs:
-                                            thumb_path = await user_client.download_media(msg.video.thumbs[0].file_id)
-                                    except: pass
-                                    
                                     sent_msg = await client.send_video(
                                         user_id,
                                         path,
@@ -555,12 +678,9 @@ async def download_handler(client, message):
                                         duration=msg.video.duration or 0,
                                         width=msg.video.width or 0,
                                         height=msg.video.height or 0,
-                                        thumb=thumb_path,
+                                        thumb=await thumb_task if thumb_task else None,
                                         supports_streaming=True
                                     )
-                                    if thumb_path and os.path.exists(thumb_path):
-                                        try: os.remove(thumb_path)
-                                        except: pass
                             elif media_msg.photo:
                                 if use_memory:
                                     sent_msg = await client.send_photo(user_id, path, caption=caption)
@@ -580,41 +700,30 @@ async def download_handler(client, message):
                                     sent_msg = await client.send_audio(user_id, path, caption=caption)
                                 else:
                                     loop = asyncio.get_event_loop()
-                                    sent_msg = await upload_media_fast(
-                                        client, user_id, path, caption=caption, 
+                                    sent_msg = await upload_file(
+                                        client, user_id, path, media_msg, status_msg, link, caption=caption,
                                         progress_callback=lambda c, t: loop.create_task(progress_bar(c, t, status_msg, f"📤 Uploading {idx + 1}/{files_to_download}"))
                                     )
                             elif media_msg.video:
-                                thumb_path = None
-                                try:
-                                    if media_msg.video.thumbs:
-                                        thumb_path = await user_client.download_media(media_msg.video.thumbs[0].file_id)
-                                except Exception as e:
-                                    print(f"[DEBUG] Thumbnail download failed: {e}")
-                                
                                 # Use fast upload even for videos, passing video-specific metadata
                                 loop = asyncio.get_event_loop()
-                                sent_msg = await upload_media_fast(
-                                    client, user_id, path, 
+                                sent_msg = await upload_file(
+                                    client, user_id, path, media_msg, status_msg, link,
                                     caption=caption,
                                     duration=media_msg.video.duration or 0,
                                     width=media_msg.video.width or 0,
                                     height=media_msg.video.height or 0,
-                                    thumb=thumb_path,
+                                    thumb=await thumb_task if thumb_task else None,
                                     supports_streaming=True,
                                     progress_callback=lambda c, t: loop.create_task(progress_bar(c, t, status_msg, f"📤 Uploading {idx + 1}/{files_to_download}"))
                                 )
-                                
-                                if thumb_path and isinstance(thumb_path, str) and os.path.exists(thumb_path):
-                                    try: os.remove(thumb_path)
-                                    except: pass
                             else:
                                 if use_memory:
                                     sent_msg = await client.send_document(user_id, path, caption=caption)
                                 else:
                                     loop = asyncio.get_event_loop()
-                                    sent_msg = await upload_media_fast(
-                                        client, user_id, path, caption=caption,
+                                    sent_msg = await upload_file(
+                                        client, user_id, path, media_msg, status_msg, link, caption=caption,
                                         progress_callback=lambda c, t: loop.create_task(progress_bar(c, t, status_msg, f"📤 Uploading {idx + 1}/{files_to_download}"))
                                     )
                         finally:
@@ -628,6 +737,9 @@ async def download_handler(client, message):
                             pass
                         downloaded_count += 1
                         
+                        if sent_msg and not is_story:
+                            await remember_sent_file(media_msg, sent_msg)
+                        
                         # Clean up file only if it's a file path, not BytesIO
                         if not use_memory and path and isinstance(path, str) and os.path.exists(path):
                             try:
@@ -635,10 +747,7 @@ async def download_handler(client, message):
                             except:
                                 pass
                     
-                    dump_id = os.environ.get("DUMP_CHANNEL_ID")
-                    db_dump = await get_setting("dump_channel_id")
-                    if db_dump and db_dump.get('value'):
-                        dump_id = db_dump['value']
+                    dump_id = await get_dump_channel_id()
                     
                     if dump_id and sent_msg:
                         try:
@@ -649,8 +758,6 @@ async def download_handler(client, message):
                         except Exception as e:
                             print(f"Dump failed: {e}")
                 
-                await increment_quota(user_id, downloaded_count)
-                
                 if quota_limited:
                     skipped = total_files - files_to_download
                     await status_msg.edit_text(
@@ -671,16 +778,39 @@ async def download_handler(client, message):
         else:
             await status_msg.edit_text("❌ Invalid link format. Could not extract chat ID or message ID.")
             
+    except asyncio.CancelledError:
+        try:
+            if status_msg:
+                await status_msg.edit_text("❌ Download cancelled by user.")
+        except:
+            pass
+        raise
     except Exception as e:
         print(f"Global download handler error: {e}")
         try:
-            if "Error:" not in status_msg.text:
+            if status_msg and "Error:" not in status_msg.text:
                 await status_msg.edit_text(f"❌ Error: {str(e)}")
         except:
             pass
     finally:
         active_downloads.discard(user_id)
-        global_download_semaphore.release()
+        if acquired:
+            global_download_semaphore.release()
+        if thumb_task:
+            thumb_task.cancel()
+        # An upload cut short by a shutdown keeps its file and quota, resume_uploads finishes it on the next start
+        resuming = bool(path and isinstance(path, str) and path != "COPIED" and client.supervisor.stopping
+                        and await get_upload_job(path))
+        if resuming:
+            downloaded_count += 1
+        if reserved_quota > downloaded_count:
+            await refund_quota(user_id, reserved_quota - downloaded_count)
+        # A cancelled transfer can leave the downloaded file behind
+        if not resuming and path and isinstance(path, str) and path != "COPIED" and os.path.exists(path):
+            try:
+                os.remove(path)
+            except:
+                pass
         if user_client and user_client != client:
             try:
                 await user_client.stop()
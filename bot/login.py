@@ -135,6 +135,10 @@ async def help_command(client, message):
 
 @app.on_message(filters.command("batch") & filters.private)
 async def batch_command(client, message):
+    # Same task name as single downloads so /cancel stops the whole batch
+    client.spawn_task(batch_download(client, message), name=f"download_{message.from_user.id}", group="downloads")
+
+async def batch_download(client, message):
     user_id = message.from_user.id
     user = await get_user(user_id)
     
@@ -212,7 +216,8 @@ async def batch_command(client, message):
                         in_memory=True,
                         api_id=API_ID,
                         api_hash=API_HASH,
-                        no_updates=True
+                        no_updates=True,
+                        lazy_parse=True
                     )
                     await temp_client.start()
                     m = await temp_client.get_messages(chat_id, msg_id)
@@ -319,16 +324,10 @@ async def handle_login_steps(client, message: Message):
 @app.on_message(filters.command("cancel") & filters.private)
 async def cancel_downloads(client, message):
     user_id = message.from_user.id
-    from bot.config import active_downloads, cancel_flags
     
-    if user_id in active_downloads:
-        cancel_flags.add(user_id)
-        active_downloads.discard(user_id) # Force discard immediately as well
-        await message.reply("🛑 Download cancellation request sent. Your process has been removed from active list.")
+    if client.cancel_tasks(name=f"download_{user_id}"):
+        await message.reply("🛑 Your download has been cancelled.")
     else:
-        # Just in case the flag was set but not in active_downloads
-        if user_id in cancel_flags:
-            cancel_flags.discard(user_id)
         await message.reply("No active downloads to cancel.")
 
 @app.on_message(filters.command("cancel_login") & filters.private)
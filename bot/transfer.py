@@ -3,20 +3,24 @@ import os
 import time
 import asyncio
 import logging
-from pyrogram import Client, utils
+from pyrogram import Client, UploadCheckpoint, utils
+from pyrogram import types as pyro_types
 from pyrogram.raw import types, functions
-from bot.config import get_smart_download_workers, get_smart_upload_workers, get_smart_chunk_size
+from bot.config import (
+    get_smart_download_workers, get_smart_upload_workers, get_smart_chunk_size, ALBUM_MEMORY_BUDGET, UPLOAD_ATTEMPTS
+)
+from bot.database import save_upload_checkpoint, delete_upload_job, get_unfinished_uploads
+
+def get_media_size(m):
+    if hasattr(m, "video") and m.video: return getattr(m.video, "file_size", 0)
+    if hasattr(m, "document") and m.document: return getattr(m.document, "file_size", 0)
+    if hasattr(m, "audio") and m.audio: return getattr(m.audio, "file_size", 0)
+    if hasattr(m, "photo") and m.photo: return getattr(m.photo, "file_size", 0)
+    return 0
 
 async def download_media_fast(client: Client, message, file_name, progress_callback=None, progress_args=()):
     """TURBO: Fast media downloader using maximum parallel workers"""
-    def get_file_size(m):
-        if hasattr(m, "video") and m.video: return getattr(m.video, "file_size", 0)
-        if hasattr(m, "document") and m.document: return getattr(m.document, "file_size", 0)
-        if hasattr(m, "audio") and m.audio: return getattr(m.audio, "file_size", 0)
-        if hasattr(m, "photo") and m.photo: return getattr(m.photo, "file_size", 0)
-        return 0
-
-    file_size = get_file_size(message)
+    file_size = get_media_size(message)
     workers = get_smart_download_workers(file_size)
     chunk_size = get_smart_chunk_size(file_size)
     
@@ -38,10 +42,45 @@ async def download_media_fast(client: Client, message, file_name, progress_callb
             progress_args=progress_args
         )
 
+def pick_thumb(thumbs):
+    # Telegram only accepts thumbnails up to 320px a side, take the biggest one that fits
+    fitting = [t for t in thumbs if max(t.width or 0, t.height or 0) <= 320] or thumbs
+    return max(fitting, key=lambda t: (t.width or 0) * (t.height or 0))
+
+async def fetch_thumb(client: Client, media):
+    """Thumbnail of a video/audio/document fetched into memory, ready to pass as thumb=. None if there is none"""
+    thumbs = getattr(media, "thumbs", None)
+    if not thumbs:
+        return None
+
+    try:
+        thumb = await client.download_media(pick_thumb(thumbs).file_id, in_memory=True)
+    except Exception as e:
+        logging.warning(f"Thumbnail download failed: {e}")
+        return None
+
+    if thumb:
+        thumb.name = "thumb.jpg"
+    return thumb
+
+def start_thumb(client: Client, media):
+    """Fetch the thumbnail in the background so it is ready by the time the main download finishes"""
+    if not getattr(media, "thumbs", None):
+        return None
+    return asyncio.create_task(fetch_thumb(client, media))
+
 import gc
 
-async def upload_media_fast(client: Client, chat_id, file_path, caption="", progress_callback=None, **kwargs):
-    """TURBO: Fast media uploader using maximum parallel workers"""
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi")
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+def is_resumable(file_path, **kwargs):
+    """Whether upload_media_fast sends file_path as a video or a document, the only uploads that take a checkpoint"""
+    name = file_path.lower()
+    return "duration" in kwargs or name.endswith(VIDEO_EXTENSIONS) or not name.endswith(PHOTO_EXTENSIONS + (".ogg",))
+
+async def upload_media_fast(client: Client, chat_id, file_path, caption="", progress_callback=None, checkpoint=None, **kwargs):
+    """TURBO: Fast media uploader using maximum parallel workers. Pass an UploadCheckpoint to make a video/document upload resumable"""
     file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
     workers = get_smart_upload_workers(file_size)
     chunk_size = get_smart_chunk_size(file_size)
@@ -54,18 +93,19 @@ async def upload_media_fast(client: Client, chat_id, file_path, caption="", prog
     
     try:
         # Check if this is a video upload by checking for 'duration' or other video-specific kwargs
-        if "duration" in kwargs or file_path.lower().endswith((".mp4", ".mkv", ".mov", ".avi")):
+        if "duration" in kwargs or file_path.lower().endswith(VIDEO_EXTENSIONS):
             return await client.send_video(
                 chat_id, 
                 file_path, 
                 caption=caption, 
                 progress=progress_callback,
                 workers=workers, # Now explicitly supported in our modded send_video
+                checkpoint=checkpoint,
                 **kwargs
             )
         
         # If it's a photo, send it as a photo instead of a document to avoid PHOTO_EXT_INVALID
-        if file_path.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+        if file_path.lower().endswith(PHOTO_EXTENSIONS):
             # Ensure we have the right extension for Telegram
             if not file_path.lower().endswith((".jpg", ".jpeg")):
                  # Telegram is picky about photo extensions in SendMedia
@@ -104,8 +144,229 @@ async def upload_media_fast(client: Client, chat_id, file_path, caption="", prog
             caption=caption, 
             progress=progress_callback,
             workers=workers, # modded
+            checkpoint=checkpoint,
             **kwargs
         )
     finally:
         gc.enable() # Re-enable after transfer
         gc.collect() # Post-transfer cleanup
+
+class MemoryBudget:
+    """Lets transfers run side by side while their buffers fit in `limit` bytes, a transfer bigger than the whole
+    budget still gets to run on its own"""
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.cond = asyncio.Condition()
+
+    async def acquire(self, amount):
+        amount = min(amount, self.limit)
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.used + amount <= self.limit)
+            self.used += amount
+        return amount
+
+    async def release(self, amount):
+        async with self.cond:
+            self.used -= amount
+            self.cond.notify_all()
+
+album_budget = MemoryBudget(ALBUM_MEMORY_BUDGET)
+
+async def relay_media_group(client: Client, user_client: Client, chat_id, messages, file_ids=None,
+                            progress_callback=None, download_args=(), upload_args=()):
+    """Download every item of an album at once and send them back as one album.
+
+    `file_ids` lines up with `messages`, items that have one are sent from it instead of being downloaded.
+    Progress of each phase is reported summed over the album as progress_callback(current, total, *args).
+    Returns the sent messages, in album order.
+    """
+    file_ids = file_ids or [None] * len(messages)
+    transferred = {}
+    paths = []
+    folders = []
+
+    async def report(current, total, index):
+        transferred[index] = (current, total)
+        if progress_callback:
+            await progress_callback(
+                sum(c for c, _ in transferred.values()),
+                sum(t for _, t in transferred.values()),
+                *download_args
+            )
+
+    async def fetch(index, m):
+        file_size = get_media_size(m)
+        # Buffers a download holds in memory at once
+        reserved = await album_budget.acquire(get_smart_download_workers(file_size) * get_smart_chunk_size(file_size))
+        thumb_task = start_thumb(user_client, m.video)
+        try:
+            # A folder per item, album items often share a file name
+            path = await download_media_fast(
+                user_client, m, f"downloads/{chat_id}_{m.id}/",
+                progress_callback=report, progress_args=(index,)
+            )
+            if path is None:
+                # Raising cancels the other items, the files fetched so far are removed on the way out
+                raise RuntimeError(f"Album item {index + 1} of {len(messages)} (message {m.id}) could not be downloaded")
+            paths.append(path)
+            folders.append(os.path.dirname(path))
+            thumb = await thumb_task if thumb_task else None
+            return path, thumb
+        finally:
+            await album_budget.release(reserved)
+            if thumb_task:
+                thumb_task.cancel()
+
+    async def build(index, m):
+        caption = m.caption or ""
+        if file_ids[index]:
+            path, thumb = file_ids[index], None
+        else:
+            path, thumb = await fetch(index, m)
+
+        if m.photo:
+            return pyro_types.InputMediaPhoto(path, caption=caption, caption_entities=m.caption_entities)
+        if m.video:
+            return pyro_types.InputMediaVideo(
+                path, thumb=thumb, caption=caption, caption_entities=m.caption_entities,
+                width=m.video.width or 0, height=m.video.height or 0,
+                duration=m.video.duration or 0, supports_streaming=True
+            )
+        if m.audio:
+            return pyro_types.InputMediaAudio(
+                path, caption=caption, caption_entities=m.caption_entities,
+                duration=m.audio.duration or 0, performer=m.audio.performer, title=m.audio.title
+            )
+        return pyro_types.InputMediaDocument(path, caption=caption, caption_entities=m.caption_entities)
+
+    tasks = [asyncio.create_task(build(index, m)) for index, m in enumerate(messages)]
+    try:
+        try:
+            media = await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave the other items downloading
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        progress = None
+        if progress_callback:
+            async def progress(current, total):
+                await progress_callback(current, total, *upload_args)
+
+        return await client.send_media_group(chat_id, list(media), progress=progress)
+    finally:
+        for path in paths:
+            if path and isinstance(path, str) and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except:
+                    pass
+        for folder in folders:
+            try:
+                os.rmdir(folder)
+            except:
+                pass
+
+async def upload_resumable(client: Client, job, caption="", progress_callback=None, **kwargs):
+    """upload_media_fast for a file with an upload job: confirmed parts are checkpointed into the job, so a failed
+    attempt is retried with only the missing parts and an interrupted one can be resumed after a restart.
+    The job is deleted once the upload is done or can't be finished, it is kept when the bot is shutting down."""
+    async def save(checkpoint):
+        await save_upload_checkpoint(job["id"], checkpoint.file_id, checkpoint.total_parts, bytes(checkpoint.parts))
+
+    checkpoint = UploadCheckpoint(job.get("file_id"), job.get("total_parts") or 0, job.get("parts"), callback=save)
+    finished = False
+
+    try:
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            try:
+                sent = await upload_media_fast(
+                    client, int(job["user_id"]), job["path"], caption=caption,
+                    progress_callback=progress_callback, checkpoint=checkpoint, **kwargs
+                )
+                finished = True
+                return sent
+            except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                if attempt == UPLOAD_ATTEMPTS:
+                    finished = True
+                    raise
+                logging.warning(f"Upload of {job['path']} failed ({e}), resuming with {len(checkpoint.missing)} parts left")
+                await asyncio.sleep(5 * attempt)
+    except asyncio.CancelledError:
+        # Killed by the user: nothing to resume. Stopped by a shutdown: resume_uploads picks it up on the next start
+        finished = not client.supervisor.stopping
+        raise
+    except Exception:
+        finished = True
+        raise
+    finally:
+        if finished:
+            await delete_upload_job(job["id"])
+
+async def resume_uploads(client: Client):
+    """Finish the uploads a restart interrupted, once the client is up"""
+    while not client.is_initialized:
+        await asyncio.sleep(1)
+
+    for job in await get_unfinished_uploads():
+        if not os.path.exists(job["path"]):
+            await delete_upload_job(job["id"])
+            continue
+
+        logging.info(f"Resuming upload of {job['path']} for {job['user_id']}")
+        client.spawn_task(resume_upload(client, job), name=f"download_{job['user_id']}", group="downloads")
+
+async def resume_upload(client: Client, job):
+    from bot.handlers import get_dump_channel_id
+    from bot.database import save_sent_file
+
+    options = job["options"]
+    status = (job["status_chat_id"], job["status_message_id"])
+
+    try:
+        await client.edit_message_text(*status, "📤 Resuming upload after a restart...")
+    except:
+        pass
+
+    try:
+        kwargs = {}
+        if options.get("duration") is not None:
+            kwargs = dict(duration=options["duration"], width=options["width"], height=options["height"],
+                          supports_streaming=True)
+
+        sent = await upload_resumable(client, job, caption=options.get("caption") or "", **kwargs)
+
+        media = getattr(sent, sent.media.value, None) if sent and sent.media else None
+        if media and options.get("unique_id"):
+            await save_sent_file(options["chat_id"], options["message_id"], options["unique_id"], media.file_id)
+
+        dump_id = await get_dump_channel_id()
+        if dump_id and sent:
+            try:
+                dump_caption = f"From User: `{job['user_id']}`\nLink: {options.get('link')}\n\n{options.get('caption') or ''}".strip()
+                await sent.copy(int(dump_id), caption=dump_caption)
+            except Exception as e:
+                logging.warning(f"Dump failed: {e}")
+
+        try:
+            await client.delete_messages(*status)
+        except:
+            pass
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logging.error(f"Resumed upload of {job['path']} failed: {e}")
+        try:
+            await client.edit_message_text(*status, f"❌ Error: {e}")
+        except:
+            pass
+    finally:
+        # The job is gone unless the bot is stopping again, then the file is still needed to resume
+        if os.path.exists(job["path"]) and not client.supervisor.stopping:
+            try:
+                os.remove(job["path"])
+            except:
+                pass
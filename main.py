@@ -19,7 +19,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from bot.config import app
-from bot.database import init_db
+from bot.database import init_db, flush_users, flush_users_loop
 from bot.cloud_backup import restore_latest_from_cloud, periodic_cloud_backup
 import bot.transfer # Ensure transfer is available
 
@@ -73,8 +73,17 @@ if __name__ == "__main__":
     from bot.logger import cleanup_loop
     asyncio.get_event_loop().create_task(cleanup_loop())
     asyncio.get_event_loop().create_task(periodic_cloud_backup(interval_minutes=10))
+    asyncio.get_event_loop().create_task(flush_users_loop())
+    from bot.broadcast import resume_broadcasts
+    asyncio.get_event_loop().create_task(resume_broadcasts(app))
+    from bot.transfer import resume_uploads
+    asyncio.get_event_loop().create_task(resume_uploads(app))
     print("Starting bot...")
     if app:
         app.run()
+        # Write out counters still waiting in the user cache
+        asyncio.get_event_loop().run_until_complete(flush_users())
+        from bot.ads import richads_manager
+        asyncio.get_event_loop().run_until_complete(richads_manager.close())
     else:
         print("Bot app not initialized due to missing config. Exiting.")
@@ -37,6 +37,7 @@ class ContinuePropagation(StopAsyncIteration):
 
 from . import raw, types, filters, handlers, emoji, enums
 from .client import Client
+from .upload_checkpoint import UploadCheckpoint
 from .sync import idle, compose
 
 crypto_executor = ThreadPoolExecutor(1, thread_name_prefix="CryptoWorker")
@@ -25,6 +25,7 @@ import platform
 import re
 import shutil
 import sys
+from collections import OrderedDict
 from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from hashlib import sha256
@@ -61,6 +62,7 @@ from .file_id import FileId, FileType, ThumbnailSource
 from .mime_types import mime_types
 from .parser import Parser
 from .session.internals import MsgId
+from .supervisor import Supervisor
 
 log = logging.getLogger(__name__)
 
@@ -149,6 +151,24 @@ class Client(Methods):
             Number of maximum concurrent workers for handling incoming updates.
             Defaults to ``min(32, os.cpu_count() + 4)``.
 
+        updates_queue_size (``int``, *optional*):
+            Maximum number of incoming updates waiting to be handled. When the limit is reached, the
+            *updates_overflow_policy* is applied. With *ordered_updates* the limit is split evenly across the
+            per-worker queues. Only the DROP policies make this a bound on memory: with BLOCK, updates that
+            don't fit wait in pending tasks instead, since receiving can't stop without also holding back the
+            responses the handlers are waiting for.
+            Defaults to 0 (unbounded).
+
+        updates_overflow_policy (:obj:`~pyrogram.enums.UpdatesOverflowPolicy`, *optional*):
+            What to do with incoming updates while a bounded updates queue is full.
+            Defaults to :obj:`~pyrogram.enums.UpdatesOverflowPolicy.BLOCK`.
+
+        ordered_updates (``bool``, *optional*):
+            Pass True to shard incoming updates by chat across the handler workers, so that updates coming from the
+            same chat are handled one after the other in the order they arrived, while different chats are still
+            handled in parallel.
+            Defaults to False.
+
         workdir (``str``, *optional*):
             Define a custom working directory.
             The working directory is the location in the filesystem where Pyrogram will store the session files.
@@ -198,6 +218,22 @@ class Client(Methods):
             Set the maximum size of the message cache.
             Defaults to 10000.
 
+        max_message_cache_memory (``int``, *optional*):
+            Set the approximate maximum memory, in bytes, used by the message cache. Least recently used messages
+            are evicted first. Pass 0 to only limit the number of messages.
+            Defaults to 0.
+
+        max_concurrent_tasks (``int``, *optional*):
+            Set the maximum amount of background tasks spawned with :meth:`~pyrogram.Client.spawn_task` that can run
+            at the same time. Pass 0 for no limit.
+            Defaults to 100.
+
+        lazy_parse (``bool``, *optional*):
+            Pass True to skip the extra requests made while parsing messages: the replied-to and pinned messages,
+            stories and forum topics are left empty until :meth:`~pyrogram.Client.resolve_messages` is called.
+            Replied-to messages already in the message cache are still filled in.
+            Defaults to False.
+
         storage_engine (:obj:`~pyrogram.storage.Storage`, *optional*):
             Pass an instance of your own implementation of session storage engine.
             Useful when you want to store your session in databases like Mongo, Redis, etc.
@@ -230,6 +266,7 @@ class Client(Methods):
 
     MAX_CONCURRENT_TRANSMISSIONS = 200
     MAX_MESSAGE_CACHE_SIZE = 10000
+    MAX_CONCURRENT_TASKS = 100
 
     mimetypes = MimeTypes()
     mimetypes.readfp(StringIO(mime_types))
@@ -255,6 +292,9 @@ class Client(Methods):
         phone_code: Optional[str] = None,
         password: Optional[str] = None,
         workers: int = WORKERS,
+        updates_queue_size: int = 0,
+        updates_overflow_policy: "enums.UpdatesOverflowPolicy" = enums.UpdatesOverflowPolicy.BLOCK,
+        ordered_updates: Optional[bool] = False,
         workdir: Union[str, Path] = WORKDIR,
         plugins: Optional[dict] = None,
         parse_mode: "enums.ParseMode" = enums.ParseMode.DEFAULT,
@@ -265,6 +305,9 @@ class Client(Methods):
         hide_password: Optional[bool] = False,
         max_concurrent_transmissions: int = MAX_CONCURRENT_TRANSMISSIONS,
         max_message_cache_size: int = MAX_MESSAGE_CACHE_SIZE,
+        max_message_cache_memory: int = 0,
+        max_concurrent_tasks: int = MAX_CONCURRENT_TASKS,
+        lazy_parse: Optional[bool] = False,
         storage_engine: Optional[Storage] = None,
         client_platform: "enums.ClientPlatform" = enums.ClientPlatform.OTHER,
         init_connection_params: Optional["raw.base.JSONValue"] = None,
@@ -292,6 +335,9 @@ class Client(Methods):
         self.phone_code = phone_code
         self.password = password
         self.workers = workers
+        self.updates_queue_size = updates_queue_size
+        self.updates_overflow_policy = updates_overflow_policy
+        self.ordered_updates = ordered_updates
         self.workdir = Path(workdir)
         self.plugins = plugins
         self.parse_mode = parse_mode
@@ -302,6 +348,9 @@ class Client(Methods):
         self.hide_password = hide_password
         self.max_concurrent_transmissions = max_concurrent_transmissions
         self.max_message_cache_size = max_message_cache_size
+        self.max_message_cache_memory = max_message_cache_memory
+        self.max_concurrent_tasks = max_concurrent_tasks
+        self.lazy_parse = lazy_parse
         self.client_platform = client_platform
         self.init_connection_params = init_connection_params
         self.connection_factory = connection_factory
@@ -322,6 +371,8 @@ class Client(Methods):
 
         self.dispatcher: Dispatcher = Dispatcher(self)
 
+        self.supervisor: Supervisor = Supervisor(self)
+
         self.rnd_id = MsgId
 
         self.parser: Parser = Parser(self)
@@ -348,7 +399,7 @@ class Client(Methods):
 
         self.me: Optional[User] = None
 
-        self.message_cache = Cache(self.max_message_cache_size)
+        self.message_cache = Cache(self.max_message_cache_size, self.max_message_cache_memory)
 
         # Sometimes, for some reason, the server will stop sending updates and will only respond to pings.
         # This watchdog will invoke updates.GetState in order to wake up the server and enable it sending updates again
@@ -660,7 +711,7 @@ class Client(Methods):
                                 users.update({u.id: u for u in diff.users})
                                 chats.update({c.id: c for c in diff.chats})
 
-                self.dispatcher.updates_queue.put_nowait((update, users, chats))
+                await self.dispatcher.put_update((update, users, chats))
         elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
             if not self.skip_updates:
                 await self.storage.update_state(
@@ -682,7 +733,7 @@ class Client(Methods):
             )
 
             if diff.new_messages:
-                self.dispatcher.updates_queue.put_nowait((
+                await self.dispatcher.put_update((
                     raw.types.UpdateNewMessage(
                         message=diff.new_messages[0],
                         pts=updates.pts,
@@ -693,9 +744,9 @@ class Client(Methods):
                 ))
             else:
                 if diff.other_updates:  # The other_updates list can be empty
-                    self.dispatcher.updates_queue.put_nowait((diff.other_updates[0], {}, {}))
+                    await self.dispatcher.put_update((diff.other_updates[0], {}, {}))
         elif isinstance(updates, raw.types.UpdateShort):
-            self.dispatcher.updates_queue.put_nowait((updates.update, {}, {}))
+            await self.dispatcher.put_update((updates.update, {}, {}))
         elif isinstance(updates, raw.types.UpdatesTooLong):
             log.info(updates)
 
@@ -759,7 +810,7 @@ class Client(Methods):
 
                 for message in diff.new_messages:
                     message_updates_counter += 1
-                    self.dispatcher.updates_queue.put_nowait(
+                    await self.dispatcher.put_update(
                         (
                             raw.types.UpdateNewMessage(
                                 message=message,
@@ -773,7 +824,7 @@ class Client(Methods):
 
                 for update in diff.other_updates:
                     other_updates_counter += 1
-                    self.dispatcher.updates_queue.put_nowait(
+                    await self.dispatcher.put_update(
                         (update, users, chats)
                     )
 
@@ -955,7 +1006,7 @@ class Client(Methods):
 
         os.makedirs(directory, exist_ok=True) if not in_memory else None
         temp_file_path = os.path.abspath(re.sub("\\\\", "/", os.path.join(directory, file_name))) + ".temp"
-        file = BytesIO() if in_memory else open(temp_file_path, "wb")
+        file = BytesIO() if in_memory else DownloadSink(temp_file_path, file_size)
 
         # TURBO: Use smart workers for downloads
         if workers is None:
@@ -969,12 +1020,25 @@ class Client(Methods):
                 workers = 32
         
         try:
-            async for chunk in self.get_file(file_id, file_size, 0, 0, progress, progress_args, workers):
-                file.write(chunk)
+            if in_memory:
+                async for chunk in self.get_file(file_id, file_size, 0, 0, progress, progress_args, workers):
+                    file.write(chunk)
+            else:
+                # Chunks go straight to their place in the file, no need to wait for the ones before them
+                await file.open()
+
+                async for offset, chunk in self.get_file_parts(file_id, file_size, progress, progress_args, workers):
+                    await file.write(offset, chunk)
         except BaseException as e:
             if not in_memory:
-                file.close()
-                os.remove(temp_file_path)
+                # A failing cleanup must not replace the error, least of all a cancellation
+                try:
+                    await file.close()
+
+                    if os.path.exists(temp_file_path):
+                        os.remove(temp_file_path)
+                except Exception as cleanup_error:
+                    log.warning("Could not clean up %s: %s", temp_file_path, cleanup_error)
 
             if isinstance(e, asyncio.CancelledError):
                 raise e
@@ -982,17 +1046,113 @@ class Client(Methods):
             if isinstance(e, (FloodWait, FloodPremiumWait)):
                 raise e
 
+            if isinstance(e, pyrogram.StopTransmission):
+                # Stopped from the progress callback on purpose, not an error
+                log.debug("Download of %s stopped", file_name)
+            else:
+                log.exception(e)
+
             return None
         else:
             if in_memory:
                 file.name = file_name
                 return file
             else:
-                file.close()
+                await file.close()
                 file_path = os.path.splitext(temp_file_path)[0]
                 shutil.move(temp_file_path, file_path)
                 return file_path
 
+    def _get_file_location(self, file_id: "FileId"):
+        file_type = file_id.file_type
+
+        if file_type == FileType.CHAT_PHOTO:
+            if file_id.chat_id > 0:
+                peer = raw.types.InputPeerUser(
+                    user_id=file_id.chat_id,
+                    access_hash=file_id.chat_access_hash
+                )
+            else:
+                if file_id.chat_access_hash == 0:
+                    peer = raw.types.InputPeerChat(
+                        chat_id=-file_id.chat_id
+                    )
+                else:
+                    peer = raw.types.InputPeerChannel(
+                        channel_id=utils.get_channel_id(file_id.chat_id),
+                        access_hash=file_id.chat_access_hash
+                    )
+
+            return raw.types.InputPeerPhotoFileLocation(
+                peer=peer,
+                photo_id=file_id.media_id,
+                big=file_id.thumbnail_source == ThumbnailSource.CHAT_PHOTO_BIG
+            )
+        elif file_type == FileType.PHOTO:
+            return raw.types.InputPhotoFileLocation(
+                id=file_id.media_id,
+                access_hash=file_id.access_hash,
+                file_reference=file_id.file_reference,
+                thumb_size=file_id.thumbnail_size
+            )
+        else:
+            return raw.types.InputDocumentFileLocation(
+                id=file_id.media_id,
+                access_hash=file_id.access_hash,
+                file_reference=file_id.file_reference,
+                thumb_size=file_id.thumbnail_size
+            )
+
+    async def _get_media_session(self, dc_id: int) -> Session:
+        session = self.media_sessions.get(dc_id)
+        if not session:
+            session = self.media_sessions[dc_id] = Session(
+                self, dc_id,
+                await Auth(self, dc_id, await self.storage.test_mode()).create()
+                if dc_id != await self.storage.dc_id()
+                else await self.storage.auth_key(),
+                await self.storage.test_mode(),
+                is_media=True
+            )
+            await session.start()
+
+            if dc_id != await self.storage.dc_id():
+                for _ in range(3):
+                    exported_auth = await self.invoke(
+                        raw.functions.auth.ExportAuthorization(
+                            dc_id=dc_id
+                        )
+                    )
+
+                    try:
+                        await session.invoke(
+                            raw.functions.auth.ImportAuthorization(
+                                id=exported_auth.id,
+                                bytes=exported_auth.bytes
+                            )
+                        )
+                    except AuthBytesInvalid:
+                        continue
+                    else:
+                        break
+                else:
+                    raise AuthBytesInvalid
+
+        return session
+
+    async def _report_progress(self, progress: Callable, current: int, file_size: int, progress_args: tuple):
+        func = functools.partial(
+            progress,
+            min(current, file_size) if file_size != 0 else current,
+            file_size,
+            *progress_args
+        )
+
+        if inspect.iscoroutinefunction(progress):
+            await func()
+        else:
+            await self.loop.run_in_executor(self.executor, func)
+
     async def get_file(
         self,
         file_id: "FileId",
@@ -1004,88 +1164,16 @@ class Client(Methods):
         workers: int = 32
     ) -> AsyncGenerator[bytes, None]:
         async with self.get_file_semaphore:
-            file_type = file_id.file_type
+            location = self._get_file_location(file_id)
 
-            if file_type == FileType.CHAT_PHOTO:
-                if file_id.chat_id > 0:
-                    peer = raw.types.InputPeerUser(
-                        user_id=file_id.chat_id,
-                        access_hash=file_id.chat_access_hash
-                    )
-                else:
-                    if file_id.chat_access_hash == 0:
-                        peer = raw.types.InputPeerChat(
-                            chat_id=-file_id.chat_id
-                        )
-                    else:
-                        peer = raw.types.InputPeerChannel(
-                            channel_id=utils.get_channel_id(file_id.chat_id),
-                            access_hash=file_id.chat_access_hash
-                        )
-
-                location = raw.types.InputPeerPhotoFileLocation(
-                    peer=peer,
-                    photo_id=file_id.media_id,
-                    big=file_id.thumbnail_source == ThumbnailSource.CHAT_PHOTO_BIG
-                )
-            elif file_type == FileType.PHOTO:
-                location = raw.types.InputPhotoFileLocation(
-                    id=file_id.media_id,
-                    access_hash=file_id.access_hash,
-                    file_reference=file_id.file_reference,
-                    thumb_size=file_id.thumbnail_size
-                )
-            else:
-                location = raw.types.InputDocumentFileLocation(
-                    id=file_id.media_id,
-                    access_hash=file_id.access_hash,
-                    file_reference=file_id.file_reference,
-                    thumb_size=file_id.thumbnail_size
-                )
-
-            current = 0
             total = abs(limit) or (1 << 31) - 1
             # TURBO: Maximum chunk size for downloads (1MB)
             chunk_size = 1024 * 1024
             offset_bytes = abs(offset) * chunk_size
             log.info(f"TURBO Download: workers={workers}, chunk_size={chunk_size}")
 
-            dc_id = file_id.dc_id
-
             try:
-                session = self.media_sessions.get(dc_id)
-                if not session:
-                    session = self.media_sessions[dc_id] = Session(
-                        self, dc_id,
-                        await Auth(self, dc_id, await self.storage.test_mode()).create()
-                        if dc_id != await self.storage.dc_id()
-                        else await self.storage.auth_key(),
-                        await self.storage.test_mode(),
-                        is_media=True
-                    )
-                    await session.start()
-
-                    if dc_id != await self.storage.dc_id():
-                        for _ in range(3):
-                            exported_auth = await self.invoke(
-                                raw.functions.auth.ExportAuthorization(
-                                    dc_id=dc_id
-                                )
-                            )
-
-                            try:
-                                await session.invoke(
-                                    raw.functions.auth.ImportAuthorization(
-                                        id=exported_auth.id,
-                                        bytes=exported_auth.bytes
-                                    )
-                                )
-                            except AuthBytesInvalid:
-                                continue
-                            else:
-                                break
-                        else:
-                            raise AuthBytesInvalid
+                session = await self._get_media_session(file_id.dc_id)
 
                 r = await session.invoke(
                     raw.functions.upload.GetFile(
@@ -1150,16 +1238,7 @@ class Client(Methods):
                                 next_offset += chunk_size
                             
                             if progress:
-                                func = functools.partial(
-                                    progress,
-                                    min(current_yield_offset, file_size) if file_size != 0 else current_yield_offset,
-                                    file_size,
-                                    *progress_args
-                                )
-                                if inspect.iscoroutinefunction(progress):
-                                    await func()
-                                else:
-                                    await self.loop.run_in_executor(self.executor, func)
+                                await self._report_progress(progress, current_yield_offset, file_size, progress_args)
                         else:
                             break
 
@@ -1168,93 +1247,204 @@ class Client(Methods):
                     await asyncio.gather(*worker_tasks)
 
                 elif isinstance(r, raw.types.upload.FileCdnRedirect):
-                    cdn_session = Session(
-                        self, r.dc_id, await Auth(self, r.dc_id, await self.storage.test_mode()).create(),
-                        await self.storage.test_mode(), is_media=True, is_cdn=True
+                    async for _, chunk in self._get_cdn_file(
+                        session, r, offset_bytes, chunk_size, total, file_size, progress, progress_args
+                    ):
+                        yield chunk
+            except pyrogram.StopTransmission:
+                raise
+            except (FloodWait, FloodPremiumWait):
+                raise
+            except Exception as e:
+                log.exception(e)
+
+    async def get_file_parts(
+        self,
+        file_id: "FileId",
+        file_size: int = 0,
+        progress: Callable = None,
+        progress_args: tuple = (),
+        workers: int = 32
+    ) -> AsyncGenerator[Tuple[int, bytes], None]:
+        """Download a whole file as *(offset, chunk)* pairs, yielded as soon as each chunk arrives.
+
+        Unlike :meth:`get_file` chunks are not put back in order, so nothing is held back waiting for a slow
+        request; meant for sinks that can write at any offset. At most *workers* chunks are buffered, the
+        workers wait for the consumer beyond that. Errors are raised instead of ending the file early.
+        """
+        async with self.get_file_semaphore:
+            location = self._get_file_location(file_id)
+            chunk_size = 1024 * 1024
+            log.info(f"TURBO Download: workers={workers}, chunk_size={chunk_size}, unordered")
+
+            session = await self._get_media_session(file_id.dc_id)
+
+            r = await session.invoke(
+                raw.functions.upload.GetFile(
+                    location=location,
+                    offset=0,
+                    limit=chunk_size
+                ),
+                sleep_threshold=30
+            )
+
+            if isinstance(r, raw.types.upload.FileCdnRedirect):
+                async for part in self._get_cdn_file(
+                    session, r, 0, chunk_size, (1 << 31) - 1, file_size, progress, progress_args
+                ):
+                    yield part
+                return
+
+            current = len(r.bytes)
+            yield 0, r.bytes
+
+            if progress:
+                await self._report_progress(progress, current, file_size, progress_args)
+
+            if len(r.bytes) < chunk_size:
+                return
+
+            results = asyncio.Queue(workers)
+            next_offset = chunk_size
+            # Set once a short chunk shows where the file ends, so no worker asks past it
+            end = file_size or None
+
+            async def worker():
+                nonlocal next_offset, end
+
+                try:
+                    while end is None or next_offset < end:
+                        offset = next_offset
+                        next_offset += chunk_size
+
+                        res = await session.invoke(
+                            raw.functions.upload.GetFile(
+                                location=location,
+                                offset=offset,
+                                limit=chunk_size
+                            ),
+                            sleep_threshold=30
+                        )
+
+                        if len(res.bytes) < chunk_size:
+                            eof = offset + len(res.bytes)
+                            end = eof if end is None else min(end, eof)
+
+                        if res.bytes:
+                            await results.put((offset, res.bytes))
+                except Exception as e:
+                    await results.put(e)
+                else:
+                    await results.put(None)
+
+            worker_tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+
+            try:
+                running = workers
+
+                while running:
+                    item = await results.get()
+
+                    if item is None:
+                        running -= 1
+                        continue
+
+                    if isinstance(item, Exception):
+                        raise item
+
+                    current += len(item[1])
+                    yield item
+
+                    if progress:
+                        await self._report_progress(progress, current, file_size, progress_args)
+            finally:
+                for task in worker_tasks:
+                    task.cancel()
+
+                await asyncio.gather(*worker_tasks, return_exceptions=True)
+
+    async def _get_cdn_file(
+        self,
+        session: Session,
+        r: "raw.types.upload.FileCdnRedirect",
+        offset_bytes: int,
+        chunk_size: int,
+        total: int,
+        file_size: int,
+        progress: Callable,
+        progress_args: tuple
+    ) -> AsyncGenerator[Tuple[int, bytes], None]:
+        current = 0
+
+        cdn_session = Session(
+            self, r.dc_id, await Auth(self, r.dc_id, await self.storage.test_mode()).create(),
+            await self.storage.test_mode(), is_media=True, is_cdn=True
+        )
+
+        try:
+            await cdn_session.start()
+
+            while True:
+                r2 = await cdn_session.invoke(
+                    raw.functions.upload.GetCdnFile(
+                        file_token=r.file_token,
+                        offset=offset_bytes,
+                        limit=chunk_size
                     )
+                )
 
+                if isinstance(r2, raw.types.upload.CdnFileReuploadNeeded):
                     try:
-                        await cdn_session.start()
-
-                        while True:
-                            r2 = await cdn_session.invoke(
-                                raw.functions.upload.GetCdnFile(
-                                    file_token=r.file_token,
-                                    offset=offset_bytes,
-                                    limit=chunk_size
-                                )
+                        await session.invoke(
+                            raw.functions.upload.ReuploadCdnFile(
+                                file_token=r.file_token,
+                                request_token=r2.request_token
                             )
+                        )
+                    except VolumeLocNotFound:
+                        break
+                    else:
+                        continue
 
-                            if isinstance(r2, raw.types.upload.CdnFileReuploadNeeded):
-                                try:
-                                    await session.invoke(
-                                        raw.functions.upload.ReuploadCdnFile(
-                                            file_token=r.file_token,
-                                            request_token=r2.request_token
-                                        )
-                                    )
-                                except VolumeLocNotFound:
-                                    break
-                                else:
-                                    continue
-
-                            chunk = r2.bytes
-
-                            # https://core.telegram.org/cdn#decrypting-files
-                            decrypted_chunk = aes.ctr256_decrypt(
-                                chunk,
-                                r.encryption_key,
-                                bytearray(
-                                    r.encryption_iv[:-4]
-                                    + (offset_bytes // 16).to_bytes(4, "big")
-                                )
-                            )
+                chunk = r2.bytes
 
-                            hashes = await session.invoke(
-                                raw.functions.upload.GetCdnFileHashes(
-                                    file_token=r.file_token,
-                                    offset=offset_bytes
-                                )
-                            )
+                # https://core.telegram.org/cdn#decrypting-files
+                decrypted_chunk = aes.ctr256_decrypt(
+                    chunk,
+                    r.encryption_key,
+                    bytearray(
+                        r.encryption_iv[:-4]
+                        + (offset_bytes // 16).to_bytes(4, "big")
+                    )
+                )
 
-                            # https://core.telegram.org/cdn#verifying-files
-                            for i, h in enumerate(hashes):
-                                cdn_chunk = decrypted_chunk[h.limit * i: h.limit * (i + 1)]
-                                CDNFileHashMismatch.check(
-                                    h.hash == sha256(cdn_chunk).digest(),
-                                    "h.hash == sha256(cdn_chunk).digest()"
-                                )
+                hashes = await session.invoke(
+                    raw.functions.upload.GetCdnFileHashes(
+                        file_token=r.file_token,
+                        offset=offset_bytes
+                    )
+                )
 
-                            yield decrypted_chunk
+                # https://core.telegram.org/cdn#verifying-files
+                for i, h in enumerate(hashes):
+                    cdn_chunk = decrypted_chunk[h.limit * i: h.limit * (i + 1)]
+                    CDNFileHashMismatch.check(
+                        h.hash == sha256(cdn_chunk).digest(),
+                        "h.hash == sha256(cdn_chunk).digest()"
+                    )
 
-                            current += 1
-                            offset_bytes += chunk_size
+                yield offset_bytes, decrypted_chunk
 
-                            if progress:
-                                func = functools.partial(
-                                    progress,
-                                    min(offset_bytes, file_size) if file_size != 0 else offset_bytes,
-                                    file_size,
-                                    *progress_args
-                                )
+                current += 1
+                offset_bytes += chunk_size
 
-                                if inspect.iscoroutinefunction(progress):
-                                    await func()
-                                else:
-                                    await self.loop.run_in_executor(self.executor, func)
+                if progress:
+                    await self._report_progress(progress, offset_bytes, file_size, progress_args)
 
-                            if len(chunk) < chunk_size or current >= total:
-                                break
-                    except Exception as e:
-                        raise e
-                    finally:
-                        await cdn_session.stop()
-            except pyrogram.StopTransmission:
-                raise
-            except (FloodWait, FloodPremiumWait):
-                raise
-            except Exception as e:
-                log.exception(e)
+                if len(chunk) < chunk_size or current >= total:
+                    break
+        finally:
+            await cdn_session.stop()
 
     def guess_mime_type(self, filename: str) -> Optional[str]:
         return self.mimetypes.guess_type(filename)[0]
@@ -1264,19 +1454,137 @@ class Client(Methods):
 
 
 class Cache:
-    def __init__(self, capacity: int):
+    """Least recently used cache, bounded by number of entries and optionally by approximate memory.
+
+    Reads and writes move the entry to the most recently used end; when a bound is exceeded, entries are evicted
+    one at a time from the other end. Memory is estimated only when *max_memory* is set, from the serialized size
+    of each value's ``raw`` object times :attr:`RAW_SIZE_FACTOR` (parsed objects take several times their wire size).
+    """
+
+    RAW_SIZE_FACTOR = 8
+
+    def __init__(self, capacity: int, max_memory: int = 0):
         self.capacity = capacity
-        self.store = {}
+        self.max_memory = max_memory
+        self.store = OrderedDict()
+        self.sizes = {}
+        self.memory = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __contains__(self, key) -> bool:
+        return key in self.store
 
     def __getitem__(self, key):
-        return self.store.get(key, None)
+        value = self.store.get(key, None)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.store.move_to_end(key)
+
+        return value
 
     def __setitem__(self, key, value):
         if key in self.store:
-            del self.store[key]
+            self.memory -= self.sizes.pop(key, 0)
 
         self.store[key] = value
+        self.store.move_to_end(key)
+
+        if self.max_memory:
+            self.sizes[key] = size = self.sizeof(value)
+            self.memory += size
+
+        while len(self.store) > self.capacity or (
+            self.max_memory and self.memory > self.max_memory and len(self.store) > 1
+        ):
+            old_key, _ = self.store.popitem(last=False)
+            self.memory -= self.sizes.pop(old_key, 0)
+            self.evictions += 1
+
+    def sizeof(self, value) -> int:
+        raw_value = getattr(value, "raw", None)
+
+        try:
+            return len(raw_value.write()) * self.RAW_SIZE_FACTOR
+        except Exception:
+            return sys.getsizeof(value)
+
+    def clear(self):
+        self.store.clear()
+        self.sizes.clear()
+        self.memory = 0
+
+
+class DownloadSink:
+    """File that downloaded chunks are written into at their own offset, in whatever order they arrive.
+
+    The file is preallocated to *size* up front (when known) and every write runs with ``os.pwrite`` on a single
+    I/O thread of its own, so the event loop never blocks on disk. :meth:`close` trims the file to the end of the
+    data actually written.
+    """
+
+    def __init__(self, path: str, size: int = 0):
+        self.path = path
+        self.size = size
+        self.end = 0
+        self.fd = None
+        self.loop = asyncio.get_event_loop()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="DownloadSink")
+
+    async def open(self):
+        self.fd = await self.loop.run_in_executor(self.executor, self._open)
+
+    async def write(self, offset: int, data: bytes):
+        await self.loop.run_in_executor(self.executor, self._write, offset, data)
+        self.end = max(self.end, offset + len(data))
+
+    async def close(self):
+        if self.fd is None:
+            self.executor.shutdown(wait=False)
+            return
 
-        if len(self.store) > self.capacity:
-            for _ in range(self.capacity // 2 + 1):
-                del self.store[next(iter(self.store))]
+        try:
+            await self.loop.run_in_executor(self.executor, self._close)
+        finally:
+            self.fd = None
+            self.executor.shutdown(wait=False)
+
+    def _open(self) -> int:
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+
+        if self.size:
+            try:
+                os.posix_fallocate(fd, 0, self.size)
+            except (AttributeError, OSError):
+                # Not available on this platform or filesystem, a sparse file of the right size still avoids regrowth
+                os.ftruncate(fd, self.size)
+
+        return fd
+
+    def _write(self, offset: int, data: bytes):
+        view = memoryview(data)
+
+        while view:
+            if hasattr(os, "pwrite"):
+                written = os.pwrite(self.fd, view, offset)
+            else:
+                os.lseek(self.fd, offset, os.SEEK_SET)
+                written = os.write(self.fd, view)
+
+            view = view[written:]
+            offset += written
+
+    def _close(self):
+        try:
+            if self.end != self.size:
+                os.ftruncate(self.fd, self.end)
+        finally:
+            os.close(self.fd)
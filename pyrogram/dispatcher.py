@@ -19,10 +19,13 @@
 import asyncio
 import inspect
 import logging
+import re
 from collections import OrderedDict
+from operator import itemgetter
 
 import pyrogram
-from pyrogram import utils
+from pyrogram import enums, utils
+from pyrogram.filters import AndFilter, OrFilter
 from pyrogram.handlers import (
     CallbackQueryHandler, MessageHandler, EditedMessageHandler, DeletedMessagesHandler,
     UserStatusHandler, RawUpdateHandler, InlineQueryHandler, PollHandler, PreCheckoutQueryHandler,
@@ -64,16 +67,39 @@ class Dispatcher:
     CHAT_BOOST_UPDATES = (UpdateBotChatBoost,)
     PURCHASED_PAID_MEDIA_UPDATES = (UpdateBotPurchasedPaidMedia,)
 
+    # Handler types whose updates are messages and can therefore be routed by command name
+    COMMAND_ROUTED_HANDLERS = (MessageHandler, EditedMessageHandler)
+
     def __init__(self, client: "pyrogram.Client"):
         self.client = client
         self.loop = asyncio.get_event_loop()
 
         self.handler_worker_tasks = []
-        self.locks_list = []
 
-        self.updates_queue = asyncio.Queue()
+        if self.client.ordered_updates:
+            # One queue per worker: updates from the same chat always land in the same queue and are therefore
+            # handled sequentially, while different chats are spread across the workers.
+            maxsize = -(-self.client.updates_queue_size // self.client.workers) if self.client.updates_queue_size else 0
+            self.updates_queues = [asyncio.Queue(maxsize) for _ in range(self.client.workers)]
+        else:
+            self.updates_queues = [asyncio.Queue(self.client.updates_queue_size)]
+
+        self.updates_queue = self.updates_queues[0]
+        self.dropped_updates = 0
+        # Set while stopping: no update is queued anymore, so nothing can push the shutdown sentinels out of a
+        # full queue
+        self.stopping = False
+
+        # Handler tables are copy-on-write: groups (group id -> tuple of handlers) and its routing index are never
+        # mutated in place, but replaced as a whole on every registration change. Workers take a reference to the
+        # current tables for each update and never need a lock, so registering a handler doesn't wait for running
+        # callbacks.
         self.groups = OrderedDict()
 
+        # Routing index: handler type -> list of (generic handlers, command name -> handlers) per group.
+        # Built lazily for each handler type and discarded together with the groups it was built from.
+        self.routes = {}
+
         async def message_parser(update, users, chats):
             connection_id = getattr(update, "connection_id", None)
 
@@ -213,12 +239,12 @@ class Dispatcher:
         self.update_parsers = {key: value for key_tuple, value in self.update_parsers.items() for key in key_tuple}
 
     async def start(self):
+        self.stopping = False
+
         if not self.client.no_updates:
             for i in range(self.client.workers):
-                self.locks_list.append(asyncio.Lock())
-
                 self.handler_worker_tasks.append(
-                    self.loop.create_task(self.handler_worker(self.locks_list[-1]))
+                    self.loop.create_task(self.handler_worker(self.updates_queues[i % len(self.updates_queues)]))
                 )
 
             log.info("Started %s HandlerTasks", self.client.workers)
@@ -227,54 +253,161 @@ class Dispatcher:
                 await self.client.recover_gaps()
 
     async def stop(self):
+        self.stopping = True
+
         if not self.client.no_updates:
             for i in range(self.client.workers):
-                self.updates_queue.put_nowait(None)
+                await self.updates_queues[i % len(self.updates_queues)].put(None)
 
             for i in self.handler_worker_tasks:
                 await i
 
             self.handler_worker_tasks.clear()
-            self.groups.clear()
+            self.groups, self.routes = OrderedDict(), {}
 
             log.info("Stopped %s HandlerTasks", self.client.workers)
 
-    def add_handler(self, handler, group: int):
-        async def fn():
-            for lock in self.locks_list:
-                await lock.acquire()
+    @staticmethod
+    def get_update_key(update) -> int:
+        """Get the id of the chat (or user) an update belongs to, used to shard ordered updates."""
+        peer = getattr(getattr(update, "message", None), "peer_id", None) or getattr(update, "peer", None)
 
-            try:
-                if group not in self.groups:
-                    self.groups[group] = []
-                    self.groups = OrderedDict(sorted(self.groups.items()))
+        if peer is not None:
+            return utils.get_raw_peer_id(peer) or 0
+
+        return getattr(update, "user_id", None) or getattr(update, "channel_id", None) or 0
+
+    async def put_update(self, packet):
+        if self.stopping:
+            log.debug("Dispatcher is stopping, dropping %s", type(packet[0]).__name__)
+            return
+
+        if len(self.updates_queues) > 1:
+            queue = self.updates_queues[self.get_update_key(packet[0]) % len(self.updates_queues)]
+        else:
+            queue = self.updates_queue
+
+        if not queue.full():
+            queue.put_nowait(packet)
+            return
+
+        policy = self.client.updates_overflow_policy
+
+        if policy == enums.UpdatesOverflowPolicy.DROP_NEW:
+            self.dropped_updates += 1
+            log.debug("Updates queue is full, dropping %s", type(packet[0]).__name__)
+        elif policy == enums.UpdatesOverflowPolicy.DROP_OLDEST:
+            dropped = queue.get_nowait()
+            self.dropped_updates += 1
+            log.debug("Updates queue is full, dropping %s", type(dropped[0]).__name__)
+            queue.put_nowait(packet)
+        else:
+            await queue.put(packet)
+
+    @staticmethod
+    def get_filter_command_keys(flt):
+        """Get the set of first words (prefix + command, lowercased) a message must start with for the filter to
+        pass, or None if the filter can match messages that are not one of its commands."""
+        if isinstance(flt, AndFilter):
+            base = Dispatcher.get_filter_command_keys(flt.base)
+            other = Dispatcher.get_filter_command_keys(flt.other)
+
+            if base is None or other is None:
+                return base if other is None else other
+
+            return base & other
+
+        if isinstance(flt, OrFilter):
+            base = Dispatcher.get_filter_command_keys(flt.base)
+            other = Dispatcher.get_filter_command_keys(flt.other)
+
+            return None if base is None or other is None else base | other
+
+        if type(flt).__name__ == "CommandFilter":
+            # Commands are matched as regular expressions, only plain words can be safely looked up
+            if any(re.escape(c) != c or not c.strip() or c.split()[0] != c for c in flt.commands):
+                return None
+
+            # Messages are routed by their first word, which a prefix containing whitespace spans past
+            if any(p != "".join(p.split()) for p in flt.prefixes):
+                return None
+
+            return {f"{p}{c}".lower() for p in flt.prefixes for c in flt.commands}
+
+        return None
+
+    def get_message_command_keys(self, message) -> set:
+        text = getattr(message, "text", None) or getattr(message, "caption", None)
 
-                self.groups[group].append(handler)
-            finally:
-                for lock in self.locks_list:
-                    lock.release()
+        if not text or not text.split():
+            return set()
 
-        self.loop.create_task(fn())
+        token = text.split(maxsplit=1)[0].lower()
+        keys = {token}
+
+        username = (getattr(self.client.me, "username", None) or "").lower()
+
+        if username and token.endswith(username):
+            token = token[:-len(username)]
+            keys.add(token)
+            keys.add(token[:-1] if token.endswith("@") else token)
+
+        return keys
+
+    @staticmethod
+    def get_routes(handler_type, groups, routes_cache):
+        routes = routes_cache.get(handler_type)
+
+        if routes is not None:
+            return routes
+
+        routes = []
+        route_commands = issubclass(handler_type, Dispatcher.COMMAND_ROUTED_HANDLERS)
+
+        for group in groups.values():
+            generic = []
+            commands = {}
+
+            for position, handler in enumerate(group):
+                if isinstance(handler, handler_type):
+                    keys = Dispatcher.get_filter_command_keys(handler.filters) if route_commands else None
+
+                    if keys is None:
+                        generic.append((position, handler))
+                    else:
+                        for key in keys:
+                            commands.setdefault(key, []).append((position, handler))
+                elif isinstance(handler, RawUpdateHandler):
+                    generic.append((position, handler))
+
+            if generic or commands:
+                routes.append((generic, commands))
+
+        routes_cache[handler_type] = routes
+
+        return routes
+
+    def add_handler(self, handler, group: int):
+        groups = dict(self.groups)
+        groups[group] = groups.get(group, ()) + (handler,)
+
+        self.groups, self.routes = OrderedDict(sorted(groups.items())), {}
 
     def remove_handler(self, handler, group: int):
-        async def fn():
-            for lock in self.locks_list:
-                await lock.acquire()
+        if group not in self.groups:
+            raise ValueError(f"Group {group} does not exist. Handler was not removed.")
 
-            try:
-                if group not in self.groups:
-                    raise ValueError(f"Group {group} does not exist. Handler was not removed.")
+        handlers = list(self.groups[group])
+        handlers.remove(handler)
 
-                self.groups[group].remove(handler)
-            finally:
-                for lock in self.locks_list:
-                    lock.release()
+        groups = OrderedDict(self.groups)
+        groups[group] = tuple(handlers)
 
-        self.loop.create_task(fn())
+        self.groups, self.routes = groups, {}
 
-    async def handler_worker(self, lock):
+    async def handler_worker(self, queue):
         while True:
-            packet = await self.updates_queue.get()
+            packet = await queue.get()
 
             if packet is None:
                 break
@@ -289,43 +422,59 @@ class Dispatcher:
                     else (None, type(None))
                 )
 
-                async with lock:
-                    for group in self.groups.values():
-                        for handler in group:
-                            args = None
+                # Snapshot of the handler tables: registration changes swap in new ones and don't affect this update
+                groups, routes = self.groups, self.routes
 
-                            if isinstance(handler, handler_type):
-                                try:
-                                    if await handler.check(self.client, parsed_update):
-                                        args = (parsed_update,)
-                                except Exception as e:
-                                    log.exception(e)
-                                    continue
+                keys = (
+                    self.get_message_command_keys(parsed_update)
+                    if issubclass(handler_type, Dispatcher.COMMAND_ROUTED_HANDLERS)
+                    else ()
+                )
 
-                            elif isinstance(handler, RawUpdateHandler):
-                                args = (update, users, chats)
+                for generic, commands in self.get_routes(handler_type, groups, routes):
+                    entries = generic
 
-                            if args is None:
-                                continue
+                    if commands and keys:
+                        matched = [entry for key in keys for entry in commands.get(key, ())]
+
+                        if matched:
+                            entries = sorted({*generic, *matched}, key=itemgetter(0))
+
+                    for _, handler in entries:
+                        args = None
 
+                        if isinstance(handler, handler_type):
                             try:
-                                if inspect.iscoroutinefunction(handler.callback):
-                                    await handler.callback(self.client, *args)
-                                else:
-                                    await self.loop.run_in_executor(
-                                        self.client.executor,
-                                        handler.callback,
-                                        self.client,
-                                        *args
-                                    )
-                            except pyrogram.StopPropagation:
-                                raise
-                            except pyrogram.ContinuePropagation:
-                                continue
+                                if await handler.check(self.client, parsed_update):
+                                    args = (parsed_update,)
                             except Exception as e:
                                 log.exception(e)
+                                continue
 
-                            break
+                        elif isinstance(handler, RawUpdateHandler):
+                            args = (update, users, chats)
+
+                        if args is None:
+                            continue
+
+                        try:
+                            if inspect.iscoroutinefunction(handler.callback):
+                                await handler.callback(self.client, *args)
+                            else:
+                                await self.loop.run_in_executor(
+                                    self.client.executor,
+                                    handler.callback,
+                                    self.client,
+                                    *args
+                                )
+                        except pyrogram.StopPropagation:
+                            raise
+                        except pyrogram.ContinuePropagation:
+                            continue
+                        except Exception as e:
+                            log.exception(e)
+
+                        break
             except pyrogram.StopPropagation:
                 pass
             except Exception as e:
@@ -38,6 +38,7 @@ from .profile_color import ProfileColor
 from .reply_color import ReplyColor
 from .sent_code_type import SentCodeType
 from .stories_privacy_rules import StoriesPrivacyRules
+from .updates_overflow_policy import UpdatesOverflowPolicy
 from .user_status import UserStatus
 
 __all__ = [
@@ -63,5 +64,6 @@ __all__ = [
     'ReplyColor',
     'SentCodeType',
     'StoriesPrivacyRules',
+    'UpdatesOverflowPolicy',
     'UserStatus'
 ]
@@ -0,0 +1,34 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from enum import auto
+
+from .auto_name import AutoName
+
+
+class UpdatesOverflowPolicy(AutoName):
+    """Policy applied by the dispatcher when a bounded updates queue is full. Used in :obj:`~pyrogram.Client`."""
+
+    BLOCK = auto()
+    "Wait until the handler workers free a slot in the queue. Not a memory bound: waiting updates pile up in tasks"
+
+    DROP_NEW = auto()
+    "Discard the incoming update"
+
+    DROP_OLDEST = auto()
+    "Discard the oldest pending update to make room for the incoming one"
@@ -889,6 +889,135 @@ linked_channel = create(linked_channel_filter)
 
 
 # region command_filter
+COMMAND_ARGS_RE = re.compile(r"([\"'])(.*?)(?<!\\)\1|(\S+)")
+
+
+def get_command_token(message: Message, text: str, prefix: str) -> list:
+    """Split *text* into the word following *prefix* and the text after it.
+
+    The result is cached on the message, keyed by text and prefix, so that every command filter evaluated against the
+    same update shares a single parse. The cached entry is a list of [word, without_command, arguments], where
+    arguments is filled in lazily the first time a filter matches.
+    """
+    cache = getattr(message, "_filters_cache", None)
+
+    if cache is None:
+        cache = message._filters_cache = {}
+
+    key = ("command", text, prefix)
+    entry = cache.get(key)
+
+    if entry is None:
+        without_prefix = text[len(prefix):]
+
+        if without_prefix and not without_prefix[0].isspace():
+            word = without_prefix.split(maxsplit=1)[0]
+        else:
+            word = ""
+
+        without_command = without_prefix[len(word):]
+
+        # The command is followed by at most one whitespace character that doesn't belong to the arguments
+        if without_command[:1].isspace():
+            without_command = without_command[1:]
+
+        entry = cache[key] = [word, without_command, None]
+
+    return entry
+
+
+def get_command_args(entry: list) -> List[str]:
+    if entry[2] is None:
+        # match.groups are 1-indexed, group(1) is the quote, group(2) is the text
+        # between the quotes, group(3) is unquoted, whitespace-split text
+
+        # Remove the escape character from the arguments
+        entry[2] = [
+            re.sub(r"\\([\"'])", r"\1", m.group(2) or m.group(3) or "")
+            for m in COMMAND_ARGS_RE.finditer(entry[1])
+        ]
+
+    return entry[2]
+
+
+def match_command(flt, word: str, username: str) -> Optional[str]:
+    """Return the plain word command of *flt* that *word* is made of, optionally followed by the bot username (with or
+    without "@"), or None.
+    """
+    if not flt.case_sensitive:
+        word = word.lower()
+        username = username.lower()
+
+    if word in flt.plain_commands:
+        return word
+
+    if username and word.endswith(username):
+        word = word[:-len(username)]
+
+        if word.endswith("@"):
+            word = word[:-1]
+
+        if word in flt.plain_commands:
+            return word
+
+    return None
+
+
+async def command_filter(flt, client: "pyrogram.Client", message: Message):
+    username = client.me.username or ""
+    text = message.text or message.caption
+    message.command = None
+
+    if not text:
+        return False
+
+    for prefix in flt.prefixes:
+        if not text.startswith(prefix):
+            continue
+
+        entry = get_command_token(message, text, prefix)
+        cmd = match_command(flt, entry[0], username)
+
+        if cmd is not None:
+            message.command = [cmd] + get_command_args(entry)
+
+            return True
+
+        # Commands that aren't plain words are regex patterns and can't be looked up, fall back to matching them
+        without_prefix = text[len(prefix):]
+
+        for cmd in flt.pattern_commands:
+            if not re.match(rf"^(?:{cmd}(?:@?{username})?)(?:\s|$)", without_prefix,
+                            flags=re.IGNORECASE if not flt.case_sensitive else 0):
+                continue
+
+            without_command = re.sub(rf"{cmd}(?:@?{username})?\s?", "", without_prefix, count=1,
+                                     flags=re.IGNORECASE if not flt.case_sensitive else 0)
+
+            message.command = [cmd] + get_command_args([None, without_command, None])
+
+            return True
+
+    return False
+
+
+def merge_command_filters(flt, other):
+    # Command filters that only differ in their commands are merged into a single one, so that an alternation
+    # such as command("a") | command("b") is evaluated with one lookup instead of one filter call per list.
+    if (
+        type(other).__call__ is command_filter
+        and other.prefixes == flt.prefixes
+        and other.case_sensitive == flt.case_sensitive
+    ):
+        return command(
+            list(flt.commands | other.commands),
+            list(flt.prefixes),
+            flt.case_sensitive
+        )
+
+    return OrFilter(flt, other)
+
+
 def command(commands: Union[str, List[str]], prefixes: Union[str, List[str]] = "/", case_sensitive: bool = False):
     """Filter commands, i.e.: text messages starting with "/" or any other custom prefix.
 
@@ -908,43 +1037,6 @@ def command(commands: Union[str, List[str]], prefixes: Union[str, List[str]] = "
             Pass True if you want your command(s) to be case sensitive. Defaults to False.
             Examples: when True, command="Start" would trigger /Start but not /start.
     """
-    command_re = re.compile(r"([\"'])(.*?)(?<!\\)\1|(\S+)")
-
-    async def func(flt, client: pyrogram.Client, message: Message):
-        username = client.me.username or ""
-        text = message.text or message.caption
-        message.command = None
-
-        if not text:
-            return False
-
-        for prefix in flt.prefixes:
-            if not text.startswith(prefix):
-                continue
-
-            without_prefix = text[len(prefix):]
-
-            for cmd in flt.commands:
-                if not re.match(rf"^(?:{cmd}(?:@?{username})?)(?:\s|$)", without_prefix,
-                                flags=re.IGNORECASE if not flt.case_sensitive else 0):
-                    continue
-
-                without_command = re.sub(rf"{cmd}(?:@?{username})?\s?", "", without_prefix, count=1,
-                                         flags=re.IGNORECASE if not flt.case_sensitive else 0)
-
-                # match.groups are 1-indexed, group(1) is the quote, group(2) is the text
-                # between the quotes, group(3) is unquoted, whitespace-split text
-
-                # Remove the escape character from the arguments
-                message.command = [cmd] + [
-                    re.sub(r"\\([\"'])", r"\1", m.group(2) or m.group(3) or "")
-                    for m in command_re.finditer(without_command)
-                ]
-
-                return True
-
-        return False
-
     commands = commands if isinstance(commands, list) else [commands]
     commands = {c if case_sensitive else c.lower() for c in commands}
 
@@ -953,16 +1045,18 @@ def command(commands: Union[str, List[str]], prefixes: Union[str, List[str]] = "
     prefixes = set(prefixes) if prefixes else {""}
 
     return create(
-        func,
+        command_filter,
         "CommandFilter",
         commands=commands,
+        plain_commands={c for c in commands if re.escape(c) == c},
+        pattern_commands={c for c in commands if re.escape(c) != c},
         prefixes=prefixes,
-        case_sensitive=case_sensitive
+        case_sensitive=case_sensitive,
+        __or__=merge_command_filters
     )
 
 
 # endregion
-
 def regex(pattern: Union[str, Pattern], flags: int = 0):
     """Filter updates that match a given regular expression pattern.
 
@@ -997,7 +1091,18 @@ def regex(pattern: Union[str, Pattern], flags: int = 0):
             raise ValueError(f"Regex filter doesn't work with {type(update)}")
 
         if value:
-            update.matches = list(flt.p.finditer(value)) or None
+            # Handlers sharing the same pattern reuse the matches found by the first one
+            cache = getattr(update, "_filters_cache", None)
+
+            if cache is None:
+                cache = update._filters_cache = {}
+
+            key = ("regex", flt.p, value)
+
+            if key not in cache:
+                cache[key] = list(flt.p.finditer(value)) or None
+
+            update.matches = cache[key]
 
         return bool(update.matches)
 
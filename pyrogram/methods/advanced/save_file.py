@@ -22,11 +22,12 @@ import inspect
 import io
 import logging
 import math
+import mmap
 import os
 import time
 from hashlib import md5
 from pathlib import PurePath
-from typing import Union, BinaryIO, Callable
+from typing import Union, BinaryIO, Callable, AsyncIterable
 
 import pyrogram
 from pyrogram import StopTransmission
@@ -39,12 +40,14 @@ log = logging.getLogger(__name__)
 class SaveFile:
     async def save_file(
         self: "pyrogram.Client",
-        path: Union[str, BinaryIO],
+        path: Union[str, BinaryIO, AsyncIterable[bytes]],
         file_id: int = None,
         file_part: int = 0,
         progress: Callable = None,
         progress_args: tuple = (),
-        workers: int = None # Custom library feature
+        workers: int = None, # Custom library feature
+        file_size: int = None,
+        checkpoint: "pyrogram.UploadCheckpoint" = None
     ):
         """Upload a file onto Telegram servers, without actually sending the message to anyone.
         Useful whenever an InputFile type is required.
@@ -58,9 +61,11 @@ class SaveFile:
         .. include:: /_includes/usable-by/users-bots.rst
 
         Parameters:
-            path (``str`` | ``BinaryIO``):
+            path (``str`` | ``BinaryIO`` | ``AsyncIterable[bytes]``):
                 The path of the file you want to upload that exists on your local machine or a binary file-like object
                 with its attribute ".name" set for in-memory uploads.
+                It can also be an async iterable of bytes (e.g. a download generator or an HTTP body) together with
+                *file_size*: parts are uploaded as the data arrives, without staging the whole file first.
 
             file_id (``int``, *optional*):
                 In case a file part expired, pass the file_id and the file_part to retry uploading that specific chunk.
@@ -81,6 +86,16 @@ class SaveFile:
             
             workers (``int``, *optional*):
                 Number of workers for the upload.
+
+            file_size (``int``, *optional*):
+                Total size in bytes of the data an async iterable *path* is going to produce. Required for async
+                iterables, ignored otherwise.
+
+            checkpoint (:obj:`~pyrogram.UploadCheckpoint`, *optional*):
+                Makes the upload resumable: every part is sent waiting for Telegram to confirm it and the confirmed
+                parts are recorded in the checkpoint. Passing a checkpoint of an earlier attempt at the same file sends
+                only the parts it is missing. Raises ConnectionError if some parts could not be confirmed, resume
+                with the same checkpoint to send them. Not available for async iterables.
         
         Other Parameters:
             current (``int``):
@@ -115,18 +130,35 @@ class SaveFile:
                     except Exception as e:
                         log.exception(e)
 
+            if checkpoint is not None and (file_id is not None or hasattr(path, "__aiter__")):
+                raise ValueError("Only whole uploads of files can be checkpointed")
+
+            fp = stream = None
+
             if isinstance(path, (str, PurePath)):
                 fp = open(path, "rb")
             elif isinstance(path, io.IOBase):
                 fp = path
+            elif hasattr(path, "__aiter__"):
+                if not file_size:
+                    raise ValueError("Uploading from an async iterable needs its total size passed as file_size")
+
+                if file_id is not None:
+                    raise ValueError("A single part can't be uploaded again from an async iterable")
+
+                stream = path
             else:
-                raise ValueError("Invalid file. Expected a file path as string or a binary (not text) file pointer")
+                raise ValueError(
+                    "Invalid file. Expected a file path as string, a binary (not text) file pointer "
+                    "or an async iterable of bytes"
+                )
 
-            file_name = getattr(fp, "name", "file.jpg")
+            file_name = getattr(fp or stream, "name", "file.jpg")
 
-            fp.seek(0, os.SEEK_END)
-            file_size = fp.tell()
-            fp.seek(0)
+            if fp:
+                fp.seek(0, os.SEEK_END)
+                file_size = fp.tell()
+                fp.seek(0)
             
             # TURBO: Optimized workers and chunk size for upload
             if file_size < 5 * 1024 * 1024:
@@ -161,6 +193,34 @@ class SaveFile:
             is_missing_part = file_id is not None
             file_id = file_id or self.rnd_id()
             md5_sum = md5() if not is_big and not is_missing_part else None
+            md5_task = None
+            parts = None
+
+            if checkpoint is not None:
+                if checkpoint.matches(file_total_parts):
+                    file_id = checkpoint.file_id
+                    log.info(f"Resuming upload {file_id}: {checkpoint.confirmed}/{file_total_parts} parts confirmed")
+                else:
+                    checkpoint.reset(file_id, file_total_parts)
+
+            # Files on disk are mapped and parts are sliced out of the mapping: no read() calls on the event loop
+            # and no copy of each part before it is serialized
+            mapped = None
+
+            if isinstance(path, (str, PurePath)):
+                try:
+                    mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError) as e:
+                    log.warning("Could not map %s, reading it instead: %s", file_name, e)
+                else:
+                    view = memoryview(mapped)
+
+                    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            if md5_sum and mapped is not None:
+                # Hashed in a thread while the parts are being sent, hashlib releases the GIL on large buffers
+                md5_task = self.loop.run_in_executor(None, md5_sum.update, mapped)
             dc_id = await self.storage.dc_id()
             
             # TURBO: Ensure time is available
@@ -176,7 +236,7 @@ class SaveFile:
 
             # TURBO: Large queue for maximum parallelism
             queue = asyncio.Queue(workers_count * 8)
-            uploaded_parts = 0
+            uploaded_parts = checkpoint.confirmed if checkpoint else 0
             
             async def turbo_worker(session):
                 nonlocal uploaded_parts
@@ -185,9 +245,16 @@ class SaveFile:
                     if data is None:
                         return
                     try:
-                        # NITRO: Direct invoke without waiting for individual part results
-                        # This saturated the pipe by not blocking on acks
-                        await session.send(data, wait_response=False)
+                        if checkpoint is None:
+                            # NITRO: Direct invoke without waiting for individual part results
+                            # This saturated the pipe by not blocking on acks
+                            await session.send(data, wait_response=False)
+                        else:
+                            # Only a part Telegram acknowledged can be skipped when resuming
+                            await session.invoke(data)
+                            checkpoint.confirm(data.file_part)
+                            await checkpoint.save()
+
                         uploaded_parts += 1
                         
                         # Progress callback - throttled for performance
@@ -207,23 +274,80 @@ class SaveFile:
                     finally:
                         queue.task_done()
 
+            async def read_stream():
+                # Cut whatever the stream yields into parts of exactly part_size, the last one may be shorter
+                pending = bytearray()
+
+                async for data in stream:
+                    view = memoryview(data)
+
+                    if pending:
+                        take = part_size - len(pending)
+                        pending += view[:take]
+                        view = view[take:]
+
+                        if len(pending) < part_size:
+                            continue
+
+                        yield bytes(pending)
+                        pending = bytearray()
+
+                    while len(view) >= part_size:
+                        yield view[:part_size]
+                        view = view[part_size:]
+
+                    pending += view
+
+                if pending:
+                    yield bytes(pending)
+
             workers_list = [self.loop.create_task(turbo_worker(session)) for _ in range(workers_count)]
+            # Set once every part has been queued, only then are the queued parts worth sending
+            queued_all = False
             start_time = time.time()
             log.info(f"TURBO: Uploading with {workers_count} parallel workers, queue size {workers_count * 8}")
 
             try:
-                fp.seek(part_size * file_part)
-                
-                # Pre-read and queue chunks for parallel processing
-                # Using memoryview for zero-copy efficiency
+                if stream is not None:
+                    parts = read_stream()
+                    received = 0
+                elif mapped is None:
+                    fp.seek(part_size * file_part)
+
+                # Queue chunks for parallel processing, a full queue holds the producer back
                 while True:
-                    chunk_raw = fp.read(part_size)
-                    if not chunk_raw:
+                    if stream is not None:
+                        try:
+                            chunk = await parts.__anext__()
+                        except StopAsyncIteration:
+                            chunk = b""
+
+                        received += len(chunk)
+
+                        if received > file_size:
+                            raise ValueError(f"The stream produced more than the {file_size} bytes declared")
+
+                        if not chunk and received < file_size:
+                            raise ValueError(f"The stream ended after {received} of the {file_size} bytes declared")
+                    elif mapped is None:
+                        chunk = fp.read(part_size)
+                    else:
+                        chunk = view[part_size * file_part:part_size * (file_part + 1)]
+
+                    if not chunk:
                         if not is_big and not is_missing_part:
-                            md5_sum = "".join([hex(i)[2:].zfill(2) for i in md5_sum.digest()])
+                            if md5_task:
+                                await md5_task
+                            md5_sum = md5_sum.hexdigest()
                         break
-                    
-                    chunk = memoryview(chunk_raw)
+
+                    if checkpoint is not None and checkpoint.is_confirmed(file_part):
+                        # Sent by an earlier attempt, still hashed for the md5 of small files
+                        if md5_sum and not md5_task:
+                            await self.loop.run_in_executor(None, md5_sum.update, chunk)
+
+                        file_part += 1
+                        continue
 
                     if is_big:
                         rpc = raw.functions.upload.SaveBigFilePart(
@@ -242,20 +366,32 @@ class SaveFile:
                     await queue.put(rpc)
 
                     if is_missing_part:
+                        queued_all = True
                         return
 
-                    if not is_big and not is_missing_part:
-                        md5_sum.update(chunk)
+                    if md5_sum and not md5_task:
+                        await self.loop.run_in_executor(None, md5_sum.update, chunk)
 
                     file_part += 1
-            except StopTransmission:
+            except (StopTransmission, ValueError):
                 raise
             except Exception as e:
                 log.exception(e)
             else:
+                queued_all = True
                 elapsed = time.time() - start_time
                 speed_mb_s = (file_size / (1024 * 1024)) / elapsed if elapsed > 0 else 0
                 log.info(f"TURBO: Upload Finished. Size: {file_size / (1024 * 1024):.2f} MB, Time: {elapsed:.2f}s, Speed: {speed_mb_s:.2f} MB/s")
+
+                if checkpoint is not None:
+                    await queue.join()
+                    missing = len(checkpoint.missing)
+
+                    if missing:
+                        raise ConnectionError(
+                            f"{missing} of {file_total_parts} parts were not confirmed, "
+                            f"resume the upload with the same checkpoint to send them"
+                        )
                 
                 if is_big:
                     return raw.types.InputFileBig(
@@ -272,13 +408,44 @@ class SaveFile:
                         md5_checksum=md5_sum
                     )
             finally:
-                # Wait for all parts to be sent before finishing
-                await queue.join()
-                
-                for _ in workers_list:
-                    await queue.put(None)
+                if queued_all:
+                    # Wait for all parts to be sent before finishing
+                    await queue.join()
 
-                await asyncio.gather(*workers_list)
+                    for _ in workers_list:
+                        await queue.put(None)
+
+                    await asyncio.gather(*workers_list)
+                else:
+                    # Cancelled or failed: the file won't be used, so the parts still queued are dropped unsent
+                    while not queue.empty():
+                        queue.get_nowait()
+                        queue.task_done()
+
+                    for worker in workers_list:
+                        worker.cancel()
+
+                    await asyncio.gather(*workers_list, return_exceptions=True)
+
+                if parts is not None:
+                    await parts.aclose()
+
+                if checkpoint is not None:
+                    await checkpoint.save(force=True)
+
+                if mapped is not None:
+                    chunk = rpc = None
+
+                    if md5_task:
+                        await asyncio.gather(md5_task, return_exceptions=True)
+
+                    view.release()
+
+                    try:
+                        mapped.close()
+                    except BufferError:
+                        # A part is still referenced somewhere, the mapping goes away with it
+                        pass
 
                 if isinstance(path, (str, PurePath)):
                     fp.close()
@@ -31,7 +31,7 @@ class Terminate:
         """Terminate the client by shutting down workers.
 
         This method does the opposite of :meth:`~pyrogram.Client.initialize`.
-        It will stop the dispatcher and shut down updates and download workers.
+        It will cancel background tasks, stop the dispatcher and shut down updates and download workers.
 
         Raises:
             ConnectionError: In case you try to terminate a client that is already terminated.
@@ -44,6 +44,7 @@ class Terminate:
             log.info("Takeout session %s finished", self.takeout_id)
 
         await self.storage.save()
+        await self.supervisor.stop()
         await self.dispatcher.stop()
 
         for media_session in self.media_sessions.values():
@@ -45,6 +45,7 @@ from .get_stickers import GetStickers
 from .read_chat_history import ReadChatHistory
 from .read_mentions import ReadMentions
 from .read_reactions import ReadReactions
+from .resolve_messages import ResolveMessages
 from .retract_vote import RetractVote
 from .search_global import SearchGlobal
 from .search_global_count import SearchGlobalCount
@@ -91,6 +92,7 @@ class Messages(
     GetAvailableEffects,
     GetMediaGroup,
     GetMessages,
+    ResolveMessages,
     GetScheduledMessages,
     GetStickers,
     SendAudio,
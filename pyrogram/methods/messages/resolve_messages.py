@@ -0,0 +1,105 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from typing import Union, List, Iterable
+
+import pyrogram
+from pyrogram import types
+from pyrogram.errors import ChannelPrivate, ChannelForumMissing, MessageIdsEmpty
+
+
+class ResolveMessages:
+    async def resolve_messages(
+        self: "pyrogram.Client",
+        messages: Union["types.Message", Iterable["types.Message"]],
+        *fields: str
+    ) -> Union["types.Message", List["types.Message"]]:
+        """Fill in the message fields that were left out while parsing with ``lazy_parse``.
+
+        When the client is created with ``lazy_parse=True``, parsing a message doesn't make the extra requests
+        needed for *reply_to_message*, *pinned_message*, *reply_to_story*, *story* (of a story message) and
+        *topic*: those fields stay None until resolved with this method. Lookups of the same kind in the same
+        chat are sent as a single request, no matter how many messages are passed.
+
+        .. include:: /_includes/usable-by/users-bots.rst
+
+        Parameters:
+            messages (:obj:`~pyrogram.types.Message` | Iterable of :obj:`~pyrogram.types.Message`):
+                One or more messages to resolve.
+
+            *fields (``str``, *optional*):
+                Names of the fields to resolve. Defaults to every field still pending.
+
+        Returns:
+            :obj:`~pyrogram.types.Message` | List of :obj:`~pyrogram.types.Message`: The same message, or list of
+            messages, that was passed in.
+
+        Example:
+            .. code-block:: python
+
+                messages = await app.get_messages(chat_id, [12345, 12346])
+
+                # One request for the replied-to messages of both
+                await app.resolve_messages(messages, "reply_to_message")
+        """
+        is_iterable = not isinstance(messages, types.Message)
+        items = list(messages) if is_iterable else [messages]
+
+        # (method, chat_id, replies) -> [(message, field, id)]
+        lookups = {}
+
+        for message in items:
+            if not message._deferred:
+                continue
+
+            for field in fields or list(message._deferred):
+                deferred = message._deferred.pop(field, None)
+
+                if deferred is None:
+                    continue
+
+                method, chat_id, value, replies = deferred
+                lookups.setdefault((method, chat_id, replies), []).append((message, field, value))
+
+        async def resolve(method: str, chat_id: int, replies: int, pending: list):
+            ids = list(dict.fromkeys(value for _, _, value in pending))
+            results = {}
+
+            # get_messages takes up to 200 ids per request
+            for i in range(0, len(ids), 200):
+                chunk = ids[i:i + 200]
+
+                try:
+                    if method == "get_messages":
+                        r = await self.get_messages(chat_id, chunk, replies=replies)
+                    elif method == "get_stories":
+                        r = await self.get_stories(chat_id, chunk)
+                    else:
+                        r = await self.get_forum_topics_by_id(chat_id, chunk)
+                except (ChannelPrivate, ChannelForumMissing, MessageIdsEmpty):
+                    continue
+
+                results.update((result.id, result) for result in r if result)
+
+            for message, field, value in pending:
+                setattr(message, field, results.get(value))
+
+        await asyncio.gather(*(resolve(*key, pending) for key, pending in lookups.items()))
+
+        return items if is_iterable else items[0]
@@ -62,7 +62,8 @@ class SendDocument:
         ] = None,
         progress: Callable = None,
         progress_args: tuple = (),
-        workers: int = None # Custom library feature
+        workers: int = None, # Custom library feature
+        checkpoint: "pyrogram.UploadCheckpoint" = None
     ) -> Optional["types.Message"]:
         """Send generic files.
 
@@ -166,6 +167,9 @@ class SendDocument:
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            checkpoint (:obj:`~pyrogram.UploadCheckpoint`, *optional*):
+                Upload the document resumably, see :meth:`~pyrogram.Client.save_file`. Ignored for file ids and URLs.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -202,7 +206,9 @@ class SendDocument:
             if isinstance(document, str):
                 if os.path.isfile(document):
                     thumb = await self.save_file(thumb, workers=workers)
-                    file = await self.save_file(document, progress=progress, progress_args=progress_args, workers=workers)
+                    file = await self.save_file(
+                        document, progress=progress, progress_args=progress_args, workers=workers, checkpoint=checkpoint
+                    )
                     media = raw.types.InputMediaUploadedDocument(
                         mime_type=self.guess_mime_type(document) or "application/zip",
                         file=file,
@@ -220,7 +226,9 @@ class SendDocument:
                     media = utils.get_input_media_from_file_id(document, FileType.DOCUMENT)
             else:
                 thumb = await self.save_file(thumb, workers=workers)
-                file = await self.save_file(document, progress=progress, progress_args=progress_args, workers=workers)
+                file = await self.save_file(
+                    document, progress=progress, progress_args=progress_args, workers=workers, checkpoint=checkpoint
+                )
                 media = raw.types.InputMediaUploadedDocument(
                     mime_type=self.guess_mime_type(file_name or document.name) or "application/zip",
                     file=file,
@@ -16,11 +16,14 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+import functools
+import inspect
 import logging
 import os
 import re
 from datetime import datetime
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Callable
 
 import pyrogram
 from pyrogram import raw
@@ -33,7 +36,6 @@ log = logging.getLogger(__name__)
 
 
 class SendMediaGroup:
-    # TODO: Add progress parameter
     async def send_media_group(
         self: "pyrogram.Client",
         chat_id: Union[int, str],
@@ -57,7 +59,9 @@ class SendMediaGroup:
         protect_content: bool = None,
         show_caption_above_media: bool = None,
         business_connection_id: str = None,
-        allow_paid_broadcast: bool = None
+        allow_paid_broadcast: bool = None,
+        progress: Callable = None,
+        progress_args: tuple = ()
     ) -> List["types.Message"]:
         """Send a group of photos or videos as an album.
 
@@ -124,6 +128,26 @@ class SendMediaGroup:
                 The relevant Stars will be withdrawn from the bot's balance.
                 For bots only.
 
+            progress (``Callable``, *optional*):
+                Pass a callback function to view the upload progress of the whole album.
+                The function must take *(current, total)* as positional arguments (look at Other Parameters below for a
+                detailed description) and will be called back each time a new file chunk has been successfully
+                transmitted. Items are uploaded concurrently, so both values are summed over the files whose upload
+                has started.
+
+            progress_args (``tuple``, *optional*):
+                Extra custom arguments for the progress callback function.
+
+        Other Parameters:
+            current (``int``):
+                The amount of bytes transmitted so far.
+
+            total (``int``):
+                The total size of the files being uploaded, in bytes.
+
+            *args (``tuple``, *optional*):
+                Extra custom arguments as defined in the ``progress_args`` parameter.
+
         Returns:
             List of :obj:`~pyrogram.types.Message`: On success, a list of the sent messages is returned.
 
@@ -141,9 +165,26 @@ class SendMediaGroup:
                     ]
                 )
         """
-        multi_media = []
+        # Bytes uploaded so far and total size of each item, reported to progress summed over the whole album
+        transferred = {}
+
+        async def report(current: int, total: int, index: int):
+            transferred[index] = (current, total)
+            func = functools.partial(
+                progress,
+                sum(c for c, _ in transferred.values()),
+                sum(t for _, t in transferred.values()),
+                *progress_args
+            )
+
+            if inspect.iscoroutinefunction(progress):
+                await func()
+            else:
+                await self.loop.run_in_executor(self.executor, func)
+
+        async def prepare(index: int, i) -> "raw.types.InputSingleMedia":
+            file_progress = report if progress else None
 
-        for i in media:
             if isinstance(i, types.InputMediaPhoto):
                 if isinstance(i.media, str):
                     if os.path.isfile(i.media):
@@ -151,7 +192,7 @@ class SendMediaGroup:
                             raw.functions.messages.UploadMedia(
                                 peer=await self.resolve_peer(chat_id),
                                 media=raw.types.InputMediaUploadedPhoto(
-                                    file=await self.save_file(i.media),
+                                    file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                     spoiler=i.has_spoiler
                                 ),
                                 business_connection_id=business_connection_id
@@ -193,7 +234,7 @@ class SendMediaGroup:
                         raw.functions.messages.UploadMedia(
                             peer=await self.resolve_peer(chat_id),
                             media=raw.types.InputMediaUploadedPhoto(
-                                file=await self.save_file(i.media),
+                                file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                 spoiler=i.has_spoiler
                             ),
                             business_connection_id=business_connection_id
@@ -215,7 +256,7 @@ class SendMediaGroup:
                             raw.functions.messages.UploadMedia(
                                 peer=await self.resolve_peer(chat_id),
                                 media=raw.types.InputMediaUploadedDocument(
-                                    file=await self.save_file(i.media),
+                                    file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                     thumb=await self.save_file(i.thumb),
                                     spoiler=i.has_spoiler,
                                     mime_type=self.guess_mime_type(i.media) or "video/mp4",
@@ -269,7 +310,7 @@ class SendMediaGroup:
                         raw.functions.messages.UploadMedia(
                             peer=await self.resolve_peer(chat_id),
                             media=raw.types.InputMediaUploadedDocument(
-                                file=await self.save_file(i.media),
+                                file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                 thumb=await self.save_file(i.thumb),
                                 spoiler=i.has_spoiler,
                                 mime_type=self.guess_mime_type(getattr(i.media, "name", "video.mp4")) or "video/mp4",
@@ -304,7 +345,7 @@ class SendMediaGroup:
                                 peer=await self.resolve_peer(chat_id),
                                 media=raw.types.InputMediaUploadedDocument(
                                     mime_type=self.guess_mime_type(i.media) or "audio/mpeg",
-                                    file=await self.save_file(i.media),
+                                    file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                     thumb=await self.save_file(i.thumb),
                                     attributes=[
                                         raw.types.DocumentAttributeAudio(
@@ -352,7 +393,7 @@ class SendMediaGroup:
                             peer=await self.resolve_peer(chat_id),
                             media=raw.types.InputMediaUploadedDocument(
                                 mime_type=self.guess_mime_type(getattr(i.media, "name", "audio.mp3")) or "audio/mpeg",
-                                file=await self.save_file(i.media),
+                                file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                 thumb=await self.save_file(i.thumb),
                                 attributes=[
                                     raw.types.DocumentAttributeAudio(
@@ -382,7 +423,7 @@ class SendMediaGroup:
                                 peer=await self.resolve_peer(chat_id),
                                 media=raw.types.InputMediaUploadedDocument(
                                     mime_type=self.guess_mime_type(i.media) or "application/zip",
-                                    file=await self.save_file(i.media),
+                                    file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                     thumb=await self.save_file(i.thumb),
                                     attributes=[
                                         raw.types.DocumentAttributeFilename(file_name=i.file_name or os.path.basename(i.media))
@@ -427,7 +468,7 @@ class SendMediaGroup:
                                 mime_type=self.guess_mime_type(
                                     getattr(i.media, "name", "file.zip")
                                 ) or "application/zip",
-                                file=await self.save_file(i.media),
+                                file=await self.save_file(i.media, progress=file_progress, progress_args=(index,)),
                                 thumb=await self.save_file(i.thumb),
                                 attributes=[
                                     raw.types.DocumentAttributeFilename(file_name=i.file_name or getattr(i.media, "name", "file.zip"))
@@ -447,14 +488,15 @@ class SendMediaGroup:
             else:
                 raise ValueError(f"{i.__class__.__name__} is not a supported type for send_media_group")
 
-            multi_media.append(
-                raw.types.InputSingleMedia(
-                    media=media,
-                    random_id=self.rnd_id(),
-                    **await utils.parse_text_entities(self, i.caption, i.parse_mode, i.caption_entities)
-                )
+            return raw.types.InputSingleMedia(
+                media=media,
+                random_id=self.rnd_id(),
+                **await utils.parse_text_entities(self, i.caption, i.parse_mode, i.caption_entities)
             )
 
+        # Items are uploaded concurrently, the album itself is then sent in a single request
+        multi_media = list(await asyncio.gather(*(prepare(index, i) for index, i in enumerate(media))))
+
         quote_text, quote_entities = (await utils.parse_text_entities(self, quote_text, parse_mode, quote_entities)).values()
 
         peer = await self.resolve_peer(chat_id)
@@ -68,7 +68,8 @@ class SendVideo:
         ] = None,
         progress: Callable = None,
         progress_args: tuple = (),
-        workers: int = None # Custom library feature
+        workers: int = None, # Custom library feature
+        checkpoint: "pyrogram.UploadCheckpoint" = None
     ) -> Optional["types.Message"]:
         """Send video files.
 
@@ -192,6 +193,9 @@ class SendVideo:
                 You can pass anything you need to be available in the progress callback scope; for example, a Message
                 object or a Client instance in order to edit the message with the updated progress status.
 
+            checkpoint (:obj:`~pyrogram.UploadCheckpoint`, *optional*):
+                Upload the video resumably, see :meth:`~pyrogram.Client.save_file`. Ignored for file ids and URLs.
+
         Other Parameters:
             current (``int``):
                 The amount of bytes transmitted so far.
@@ -231,7 +235,9 @@ class SendVideo:
             if isinstance(video, str):
                 if os.path.isfile(video):
                     thumb = await self.save_file(thumb, workers=workers)
-                    file = await self.save_file(video, progress=progress, progress_args=progress_args, workers=workers)
+                    file = await self.save_file(
+                        video, progress=progress, progress_args=progress_args, workers=workers, checkpoint=checkpoint
+                    )
                     media = raw.types.InputMediaUploadedDocument(
                         mime_type=self.guess_mime_type(video) or "video/mp4",
                         file=file,
@@ -259,7 +265,9 @@ class SendVideo:
                     media = utils.get_input_media_from_file_id(video, FileType.VIDEO, ttl_seconds=ttl_seconds, has_spoiler=has_spoiler)
             else:
                 thumb = await self.save_file(thumb, workers=workers)
-                file = await self.save_file(video, progress=progress, progress_args=progress_args, workers=workers)
+                file = await self.save_file(
+                    video, progress=progress, progress_args=progress_args, workers=workers, checkpoint=checkpoint
+                )
                 media = raw.types.InputMediaUploadedDocument(
                     mime_type=self.guess_mime_type(file_name or video.name) or "video/mp4",
                     file=file,
@@ -17,10 +17,12 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .add_handler import AddHandler
+from .cancel_tasks import CancelTasks
 from .export_session_string import ExportSessionString
 from .remove_handler import RemoveHandler
 from .restart import Restart
 from .run import Run
+from .spawn_task import SpawnTask
 from .start import Start
 from .stop import Stop
 from .stop_transmission import StopTransmission
@@ -28,10 +30,12 @@ from .stop_transmission import StopTransmission
 
 class Utilities(
     AddHandler,
+    CancelTasks,
     ExportSessionString,
     RemoveHandler,
     Restart,
     Run,
+    SpawnTask,
     Start,
     Stop,
     StopTransmission
@@ -0,0 +1,47 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+from typing import Optional
+
+import pyrogram
+
+
+class CancelTasks:
+    def cancel_tasks(
+        self: "pyrogram.Client",
+        name: Optional[str] = None,
+        group: Optional[str] = None
+    ) -> int:
+        """Cancel background tasks spawned with :meth:`~pyrogram.Client.spawn_task`.
+
+        Parameters:
+            name (``str``, *optional*):
+                Cancel only the tasks with this name.
+
+            group (``str``, *optional*):
+                Cancel only the tasks in this group.
+                If neither *name* nor *group* are passed, all tasks are cancelled.
+
+        Returns:
+            ``int``: The number of tasks that were cancelled.
+
+        Example:
+            .. code-block:: python
+
+                app.cancel_tasks(name=f"job_{user_id}")
+        """
+        return self.supervisor.cancel(name, group)
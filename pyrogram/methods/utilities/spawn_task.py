@@ -0,0 +1,57 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+from typing import Coroutine, Optional
+
+import pyrogram
+
+
+class SpawnTask:
+    def spawn_task(
+        self: "pyrogram.Client",
+        coro: Coroutine,
+        name: Optional[str] = None,
+        group: Optional[str] = None
+    ) -> asyncio.Task:
+        """Run a coroutine as a supervised background task.
+
+        Use this inside handlers to hand off long running jobs (e.g.: file transfers) and return immediately, so that
+        the update workers are free to handle other updates in the meantime. At most *max_concurrent_tasks* tasks
+        run at the same time, the others wait for a free slot. Running tasks are cancelled when the client stops.
+
+        Parameters:
+            coro (``Coroutine``):
+                The coroutine to run.
+
+            name (``str``, *optional*):
+                A name for the task, used to find or cancel it later. Names don't need to be unique.
+
+            group (``str``, *optional*):
+                A group for the task, used to find or cancel related tasks together.
+
+        Returns:
+            ``asyncio.Task``: The spawned task.
+
+        Example:
+            .. code-block:: python
+
+                @app.on_message(filters.command("job"))
+                async def job(client, message):
+                    client.spawn_task(long_job(message), name=f"job_{message.from_user.id}", group="jobs")
+        """
+        return self.supervisor.spawn(coro, name, group)
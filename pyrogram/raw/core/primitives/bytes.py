@@ -40,16 +40,17 @@ class Bytes(bytes, TLObject):
     def __new__(cls, value: bytes) -> bytes:  # type: ignore
         length = len(value)
 
+        # join copies the value once, whatever buffer it is (bytes, memoryview of a mapped file, ...)
         if length <= 253:
-            return (
-                bytes([length])
-                + value
-                + bytes(-(length + 1) % 4)
-            )
+            return b"".join((
+                bytes([length]),
+                value,
+                bytes(-(length + 1) % 4)
+            ))
         else:
-            return (
-                bytes([254])
-                + length.to_bytes(3, "little")
-                + value
-                + bytes(-length % 4)
-            )
+            return b"".join((
+                bytes([254]),
+                length.to_bytes(3, "little"),
+                value,
+                bytes(-length % 4)
+            ))
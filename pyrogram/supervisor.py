@@ -0,0 +1,122 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import functools
+import logging
+from typing import Coroutine, List, Optional
+
+import pyrogram
+
+log = logging.getLogger(__name__)
+
+
+class Supervisor:
+    """Run and keep track of background tasks spawned by a :obj:`~pyrogram.Client`.
+
+    Long running jobs (e.g.: file transfers) can be handed off to the supervisor so that the update handler that
+    started them returns immediately and the dispatcher workers stay free for other updates.
+    """
+
+    def __init__(self, client: "pyrogram.Client"):
+        self.client = client
+
+        self.tasks = {}  # asyncio.Task -> group
+        self.semaphore = asyncio.Semaphore(client.max_concurrent_tasks) if client.max_concurrent_tasks else None
+
+        self.running = 0
+        self.spawned = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.stopping = False
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None, group: Optional[str] = None) -> asyncio.Task:
+        task = self.client.loop.create_task(self.run(coro), name=name)
+
+        self.tasks[task] = group
+        self.spawned += 1
+
+        task.add_done_callback(functools.partial(self.on_done, coro))
+
+        return task
+
+    async def run(self, coro: Coroutine):
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+
+        self.running += 1
+
+        try:
+            return await coro
+        finally:
+            self.running -= 1
+
+            if self.semaphore is not None:
+                self.semaphore.release()
+
+    def on_done(self, coro: Coroutine, task: asyncio.Task):
+        self.tasks.pop(task, None)
+
+        # Tasks cancelled before they got to run never awaited their coroutine
+        coro.close()
+
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+            log.error("Task %s failed", task.get_name(), exc_info=task.exception())
+        else:
+            self.completed += 1
+
+    def get(self, name: Optional[str] = None, group: Optional[str] = None) -> List[asyncio.Task]:
+        return [
+            task for task, task_group in self.tasks.items()
+            if (name is None or task.get_name() == name) and (group is None or task_group == group)
+        ]
+
+    def cancel(self, name: Optional[str] = None, group: Optional[str] = None) -> int:
+        tasks = self.get(name, group)
+
+        for task in tasks:
+            task.cancel()
+
+        return len(tasks)
+
+    async def stop(self):
+        tasks = list(self.tasks)
+        # Lets a task being cancelled tell a shutdown apart from an explicit cancel()
+        self.stopping = True
+
+        for task in tasks:
+            task.cancel()
+
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.stopping = False
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending": len(self.tasks) - self.running,
+            "spawned": self.spawned,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled
+        }
@@ -457,6 +457,29 @@ class Message(Object, Update):
 
     # TODO: Add game missing field
 
+    __slots__ = (
+        "id", "from_user", "sender_chat", "sender_boost_count", "sender_business_bot", "date", "chat", "topic_message",
+        "automatic_forward", "from_offline", "show_caption_above_media", "quote", "topic", "forward_from",
+        "forward_sender_name", "forward_from_chat", "forward_from_message_id", "forward_signature", "forward_date",
+        "message_thread_id", "effect_id", "reply_to_message_id", "reply_to_story_id", "reply_to_story_user_id",
+        "reply_to_top_message_id", "reply_to_message", "reply_to_story", "mentioned", "empty", "service", "scheduled",
+        "from_scheduled", "media", "paid_media", "edit_date", "edit_hidden", "media_group_id", "author_signature",
+        "has_protected_content", "has_media_spoiler", "text", "quote_text", "entities", "caption_entities",
+        "quote_entities", "audio", "document", "photo", "sticker", "animation", "game", "giveaway", "giveaway_winners",
+        "giveaway_completed", "invoice", "story", "video", "video_processing_pending", "alternative_videos", "voice",
+        "video_note", "caption", "contact", "location", "venue", "web_page", "poll", "dice", "new_chat_members",
+        "left_chat_member", "chat_join_type", "new_chat_title", "new_chat_photo", "delete_chat_photo",
+        "group_chat_created", "supergroup_chat_created", "channel_chat_created", "migrate_to_chat_id",
+        "migrate_from_chat_id", "pinned_message", "game_high_score", "views", "forwards", "via_bot", "outgoing",
+        "matches", "command", "screenshot_taken", "business_connection_id", "reply_markup", "forum_topic_created",
+        "forum_topic_closed", "forum_topic_reopened", "forum_topic_edited", "general_topic_hidden",
+        "general_topic_unhidden", "video_chat_scheduled", "video_chat_started", "video_chat_ended",
+        "video_chat_members_invited", "phone_call_started", "phone_call_ended", "web_app_data", "gift_code",
+        "star_gift", "requested_chats", "successful_payment", "refunded_payment", "giveaway_created", "chat_ttl_period",
+        "boosts_applied", "write_access_allowed", "connected_website", "contact_registered", "reactions", "raw",
+        "_deferred", "_filters_cache"
+    )
+
     def __init__(
         self,
         *,
@@ -701,6 +724,8 @@ class Message(Object, Update):
         self.contact_registered = contact_registered
         self.reactions = reactions
         self.raw = raw
+        # Lookups skipped while parsing with Client.lazy_parse, field name -> (method, chat_id, id, replies)
+        self._deferred = None
 
     @staticmethod
     async def _parse(
@@ -978,30 +1003,47 @@ class Message(Object, Update):
             )
 
             if isinstance(action, raw.types.MessageActionPinMessage):
-                try:
-                    parsed_message.pinned_message = await client.get_messages(
-                        parsed_message.chat.id,
-                        reply_to_message_ids=message.id,
-                        replies=0
-                    )
+                if client.lazy_parse:
+                    if message.reply_to and message.reply_to.reply_to_msg_id:
+                        parsed_message._defer(
+                            "pinned_message", "get_messages", parsed_message.chat.id, message.reply_to.reply_to_msg_id
+                        )
 
                     parsed_message.service = enums.MessageServiceType.PINNED_MESSAGE
-                except (MessageIdsEmpty, ChannelPrivate):
-                    pass
-            elif isinstance(action, raw.types.MessageActionGameScore):
-                parsed_message.game_high_score = types.GameHighScore._parse_action(client, message, users)
-
-                if message.reply_to and replies:
+                else:
                     try:
-                        parsed_message.reply_to_message = await client.get_messages(
+                        parsed_message.pinned_message = await client.get_messages(
                             parsed_message.chat.id,
                             reply_to_message_ids=message.id,
                             replies=0
                         )
 
-                        parsed_message.service = enums.MessageServiceType.GAME_HIGH_SCORE
+                        parsed_message.service = enums.MessageServiceType.PINNED_MESSAGE
                     except (MessageIdsEmpty, ChannelPrivate):
                         pass
+            elif isinstance(action, raw.types.MessageActionGameScore):
+                parsed_message.game_high_score = types.GameHighScore._parse_action(client, message, users)
+
+                if message.reply_to and replies:
+                    if client.lazy_parse:
+                        if message.reply_to.reply_to_msg_id:
+                            parsed_message._defer(
+                                "reply_to_message", "get_messages", parsed_message.chat.id,
+                                message.reply_to.reply_to_msg_id
+                            )
+
+                        parsed_message.service = enums.MessageServiceType.GAME_HIGH_SCORE
+                    else:
+                        try:
+                            parsed_message.reply_to_message = await client.get_messages(
+                                parsed_message.chat.id,
+                                reply_to_message_ids=message.id,
+                                replies=0
+                            )
+
+                            parsed_message.service = enums.MessageServiceType.GAME_HIGH_SCORE
+                        except (MessageIdsEmpty, ChannelPrivate):
+                            pass
 
             client.message_cache[(parsed_message.chat.id, parsed_message.id)] = parsed_message
 
@@ -1053,6 +1095,7 @@ class Message(Object, Update):
             giveaway_winners = None
             invoice = None
             story = None
+            deferred_story = None
             audio = None
             voice = None
             animation = None
@@ -1100,10 +1143,13 @@ class Message(Object, Update):
                     if media.story:
                         story = await types.Story._parse(client, media.story, users, chats, media.peer)
                     elif client.me and not client.me.is_bot:
-                        try:
-                            story = await client.get_stories(utils.get_peer_id(media.peer), media.id)
-                        except ChannelPrivate:
-                            pass
+                        if client.lazy_parse:
+                            deferred_story = (utils.get_peer_id(media.peer), media.id)
+                        else:
+                            try:
+                                story = await client.get_stories(utils.get_peer_id(media.peer), media.id)
+                            except ChannelPrivate:
+                                pass
 
                     if not story:
                         story = await types.Story._parse(client, media, users, chats, media.peer)
@@ -1296,6 +1342,9 @@ class Message(Object, Update):
                 client=client
             )
 
+            if deferred_story:
+                parsed_message._defer("story", "get_stories", *deferred_story)
+
             if any((isinstance(entity, raw.types.MessageEntityBlockquote) for entity in message.entities)):
                 parsed_message.quote = True
 
@@ -1366,7 +1415,12 @@ class Message(Object, Update):
 
                             reply_to_message = client.message_cache[key]
 
-                            if not reply_to_message:
+                            if not reply_to_message and client.lazy_parse:
+                                if key[1]:
+                                    parsed_message._defer(
+                                        "reply_to_message", "get_messages", key[0], key[1], replies - 1
+                                    )
+                            elif not reply_to_message:
                                 try:
                                     reply_to_message = await client.get_messages(
                                         replies=replies - 1,
@@ -1377,26 +1431,67 @@ class Message(Object, Update):
 
                             parsed_message.reply_to_message = reply_to_message
                         elif isinstance(message.reply_to, raw.types.MessageReplyStoryHeader):
-                            if client.me and not client.me.is_bot:
+                            if client.me and not client.me.is_bot and client.lazy_parse:
+                                parsed_message._defer(
+                                    "reply_to_story", "get_stories",
+                                    utils.get_peer_id(message.reply_to.peer), message.reply_to.story_id
+                                )
+                            elif client.me and not client.me.is_bot:
                                 parsed_message.reply_to_story = await client.get_stories(
                                     utils.get_peer_id(message.reply_to.peer),
                                     message.reply_to.story_id
                                 )
 
             if not parsed_message.topic and parsed_message.chat.is_forum and client.me and not client.me.is_bot:
-                try:
-                    parsed_message.topic = await client.get_forum_topics_by_id(
-                        chat_id=parsed_message.chat.id,
-                        topic_ids=parsed_message.message_thread_id or 1
+                if client.lazy_parse:
+                    parsed_message._defer(
+                        "topic", "get_forum_topics_by_id", parsed_message.chat.id, parsed_message.message_thread_id or 1
                     )
-                except (ChannelPrivate, ChannelForumMissing):
-                    pass
+                else:
+                    try:
+                        parsed_message.topic = await client.get_forum_topics_by_id(
+                            chat_id=parsed_message.chat.id,
+                            topic_ids=parsed_message.message_thread_id or 1
+                        )
+                    except (ChannelPrivate, ChannelForumMissing):
+                        pass
 
             if not parsed_message.poll:  # Do not cache poll messages
                 client.message_cache[(parsed_message.chat.id, parsed_message.id)] = parsed_message
 
             return parsed_message
 
+    def _defer(self, field: str, method: str, chat_id: int, value: int, replies: int = 0):
+        # With lazy_parse, the lookup that fills this field is recorded instead of made.
+        # Client.resolve_messages() runs it later, batched with the same lookups of other messages.
+        if self._deferred is None:
+            self._deferred = {}
+
+        self._deferred[field] = (method, chat_id, value, replies)
+
+    async def resolve(self, *fields: str) -> "Message":
+        """Bound method *resolve* of :obj:`~pyrogram.types.Message`.
+
+        Use as a shortcut for:
+
+        .. code-block:: python
+
+            await client.resolve_messages(message, "reply_to_message")
+
+        Example:
+            .. code-block:: python
+
+                await message.resolve("reply_to_message")
+
+        Parameters:
+            *fields (``str``, *optional*):
+                Names of the fields to resolve. Defaults to every field still pending.
+
+        Returns:
+            :obj:`~pyrogram.types.Message`: This message, with the requested fields filled in.
+        """
+        return await self._client.resolve_messages(self, *fields)
+
     @property
     def link(self) -> str:
         if (
@@ -71,6 +71,11 @@ class Video(Object):
             Video thumbnails.
     """
 
+    __slots__ = (
+        "file_id", "file_unique_id", "width", "height", "codec", "duration", "file_name", "mime_type", "file_size",
+        "supports_streaming", "ttl_seconds", "date", "thumbs"
+    )
+
     def __init__(
         self,
         *,
@@ -25,9 +25,45 @@ import pyrogram
 
 
 class Object:
+    """Base class of all Pyrogram types.
+
+    Types store their fields in a per-instance ``__dict__`` unless they opt in to a compact representation by
+    declaring every field they set in ``__slots__``, which is worth it for objects created in large numbers, like
+    :obj:`~pyrogram.types.Message`. The generic methods below work on both.
+    """
+
+    __slots__ = ("_client",)
+
+    # Slot names per class, collected from its whole MRO
+    _slots_cache = {}
+
     def __init__(self, client: "pyrogram.Client" = None):
         self._client = client
 
+    @classmethod
+    def _slots(cls) -> typing.Tuple[str, ...]:
+        slots = Object._slots_cache.get(cls)
+
+        if slots is None:
+            names = []
+
+            for klass in reversed(cls.__mro__):
+                declared = klass.__dict__.get("__slots__", ())
+                names.extend([declared] if isinstance(declared, str) else declared)
+
+            slots = Object._slots_cache[cls] = tuple(
+                name for name in names if name not in ("__dict__", "__weakref__")
+            )
+
+        return slots
+
+    def _fields(self) -> typing.List[str]:
+        """Names of the attributes set on this object: declared slots first, then anything in ``__dict__``"""
+        fields = [name for name in self._slots() if hasattr(self, name)]
+        fields.extend(getattr(self, "__dict__", ()))
+
+        return fields
+
     def bind(self, client: "pyrogram.Client"):
         """Bind a Client instance to this and to all nested Pyrogram objects.
 
@@ -38,7 +74,7 @@ class Object:
         """
         self._client = client
 
-        for i in self.__dict__:
+        for i in self._fields():
             o = getattr(self, i)
 
             if isinstance(o, Object):
@@ -68,7 +104,7 @@ class Object:
             attr: ("*" * 9 if attr == "phone_number" else getattr(obj, attr))
             for attr in filter(
                 lambda x: not x.startswith("_") and x not in attributes_to_hide,
-                obj.__dict__,
+                obj._fields() if isinstance(obj, Object) else obj.__dict__,
             )
             if getattr(obj, attr) is not None
         }
@@ -86,13 +122,13 @@ class Object:
             self.__class__.__name__,
             ", ".join(
                 f"{attr}={repr(getattr(self, attr))}"
-                for attr in filter(lambda x: not x.startswith("_"), self.__dict__)
+                for attr in filter(lambda x: not x.startswith("_"), self._fields())
                 if getattr(self, attr) is not None
             )
         )
 
     def __eq__(self, other: "Object") -> bool:
-        for attr in self.__dict__:
+        for attr in self._fields():
             try:
                 if attr.startswith("_"):
                     continue
@@ -110,13 +146,14 @@ class Object:
 
             # Maybe a better alternative would be https://docs.python.org/3/library/inspect.html#inspect.signature
             if isinstance(obj, tuple) and len(obj) == 2 and obj[0] == "dt":
-                state[attr] = datetime.fromtimestamp(obj[1])
+                obj = datetime.fromtimestamp(obj[1])
 
-        self.__dict__ = state
+            setattr(self, attr, obj)
 
     def __getstate__(self):
-        state = self.__dict__.copy()
+        state = {attr: getattr(self, attr) for attr in self._fields()}
         state.pop("_client", None)
+        state.pop("_filters_cache", None)
 
         for attr in state:
             obj = state[attr]
@@ -20,6 +20,8 @@ import pyrogram
 
 
 class Update:
+    __slots__ = ()
+
     def stop_propagation(self):
         raise pyrogram.StopPropagation
 
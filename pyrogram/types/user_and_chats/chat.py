@@ -252,6 +252,21 @@ class Chat(Object):
             Full name of the other party in a private chat, for private chats and bots.
     """
 
+    __slots__ = (
+        "id", "type", "is_forum", "is_verified", "is_members_hidden", "is_restricted", "is_creator", "is_admin",
+        "is_scam", "is_fake", "is_deactivated", "is_support", "is_stories_hidden", "is_stories_unavailable",
+        "is_business_bot", "is_preview", "is_banned", "is_call_active", "is_call_not_empty", "is_public",
+        "is_paid_reactions_available", "title", "username", "usernames", "first_name", "last_name", "photo", "stories",
+        "wallpaper", "bio", "description", "dc_id", "folder_id", "has_protected_content", "has_visible_history",
+        "has_aggressive_anti_spam_enabled", "invite_link", "pinned_message", "sticker_set_name",
+        "custom_emoji_sticker_set_name", "can_set_sticker_set", "can_send_paid_media", "members", "members_count",
+        "restrictions", "permissions", "personal_channel", "personal_channel_message", "linked_chat", "send_as_chat",
+        "available_reactions", "level", "reply_color", "profile_color", "business_info", "business_intro", "birthday",
+        "message_auto_delete_time", "unrestrict_boost_count", "slow_mode_delay", "slowmode_next_send_date",
+        "join_by_request", "join_requests_count", "banned_until_date", "subscription_until_date", "reactions_limit",
+        "raw"
+    )
+
     def __init__(
         self,
         *,
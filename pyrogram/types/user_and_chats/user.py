@@ -204,6 +204,16 @@ class User(Object, Update):
             Full name of the other party in a private chat, for private chats and bots.
     """
 
+    __slots__ = (
+        "id", "is_self", "is_contact", "is_mutual_contact", "is_deleted", "is_bot", "is_verified", "is_restricted",
+        "is_scam", "is_fake", "is_support", "is_premium", "is_contact_require_premium", "is_close_friend",
+        "is_stories_hidden", "is_stories_unavailable", "is_business_bot", "first_name", "last_name", "status",
+        "last_online_date", "next_offline_date", "username", "usernames", "language_code", "emoji_status", "dc_id",
+        "phone_number", "photo", "restrictions", "reply_color", "profile_color", "added_to_attachment_menu",
+        "active_users_count", "inline_need_location", "inline_query_placeholder", "can_be_edited",
+        "can_be_added_to_attachment_menu", "can_join_groups", "can_read_all_group_messages", "has_main_web_app", "raw"
+    )
+
     def __init__(
         self,
         *,
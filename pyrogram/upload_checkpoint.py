@@ -0,0 +1,92 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import inspect
+from typing import Callable, List
+
+
+class UploadCheckpoint:
+    """Parts of an upload Telegram has confirmed, so an interrupted upload can be resumed instead of restarted.
+
+    Pass it as *checkpoint* to :meth:`~pyrogram.Client.save_file`, :meth:`~pyrogram.Client.send_document` or
+    :meth:`~pyrogram.Client.send_video`. Keep :attr:`file_id`, :attr:`total_parts` and :attr:`parts` somewhere
+    (*callback* is the place to do it) and build a checkpoint from them again to resume the same file later, e.g.
+    after a reconnect or a restart: only the parts that were not confirmed yet are sent. Telegram only keeps
+    uploaded parts for a limited time, a checkpoint that is too old fails with FILE_PART_X_MISSING.
+
+    Parameters:
+        file_id (``int``, *optional*):
+            Id of the upload being resumed.
+
+        total_parts (``int``, *optional*):
+            Number of parts of the upload being resumed.
+
+        parts (``bytes``, *optional*):
+            Bitmap of the confirmed parts, bit *n* set (``parts[n // 8] & (1 << n % 8)``) means part *n* is confirmed.
+
+        callback (``Callable``, *optional*):
+            Function called with the checkpoint to persist it, every :attr:`SAVE_EVERY` confirmed parts and once more
+            when the upload ends, whichever way. Can be a coroutine function.
+    """
+
+    SAVE_EVERY = 20
+
+    def __init__(self, file_id: int = None, total_parts: int = 0, parts: bytes = None, callback: Callable = None):
+        self.file_id = file_id
+        self.total_parts = total_parts
+        self.parts = bytearray(parts or b"")
+        self.callback = callback
+        self.unsaved = 0
+
+    def matches(self, total_parts: int) -> bool:
+        """Whether this checkpoint belongs to an upload of *total_parts* parts and can be resumed."""
+        return bool(self.file_id) and self.total_parts == total_parts and len(self.parts) == (total_parts + 7) // 8
+
+    def reset(self, file_id: int, total_parts: int):
+        """Start over for a new upload, with no part confirmed."""
+        self.file_id = file_id
+        self.total_parts = total_parts
+        self.parts = bytearray((total_parts + 7) // 8)
+        self.unsaved = 0
+
+    def is_confirmed(self, part: int) -> bool:
+        return bool(self.parts[part >> 3] & (1 << (part & 7)))
+
+    def confirm(self, part: int):
+        self.parts[part >> 3] |= 1 << (part & 7)
+        self.unsaved += 1
+
+    @property
+    def confirmed(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.parts)
+
+    @property
+    def missing(self) -> List[int]:
+        return [part for part in range(self.total_parts) if not self.is_confirmed(part)]
+
+    async def save(self, force: bool = False):
+        """Hand the checkpoint to *callback*, if there is one and enough parts were confirmed since the last time."""
+        if not self.callback or not (force or self.unsaved >= self.SAVE_EVERY):
+            return
+
+        self.unsaved = 0
+
+        if inspect.iscoroutinefunction(self.callback):
+            await self.callback(self)
+        else:
+            self.callback(self)
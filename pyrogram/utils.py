@@ -127,7 +127,20 @@ async def parse_messages(
                 )
             )
 
-        if replies:
+        if replies and client.lazy_parse:
+            # Left for Client.resolve_messages(), which batches them per chat the same way
+            for message, m in zip(parsed_messages, messages.messages):
+                reply_to = getattr(m, "reply_to", None)
+
+                if isinstance(reply_to, raw.types.MessageReplyHeader) and reply_to.reply_to_msg_id:
+                    message._defer(
+                        "reply_to_message",
+                        "get_messages",
+                        get_peer_id(reply_to.reply_to_peer_id) if reply_to.reply_to_peer_id else message.chat.id,
+                        reply_to.reply_to_msg_id,
+                        replies - 1
+                    )
+        elif replies:
             messages_with_replies = {}
             messages_with_story_replies = {}
 
@@ -0,0 +1,16 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# The bot reads its configuration at import time: point it at a throwaway database and dummy credentials
+_tmp = tempfile.mkdtemp(prefix="bot-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(_tmp, "test.db")
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "test")
+os.environ.setdefault("BOT_TOKEN", "1:test")
+os.chdir(_tmp)
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+import asyncio
+
+from bot.ads import RichAdsManager
+
+
+def test_prefetched_ads_are_not_served_to_other_users(monkeypatch):
+    async def fetch_ad(language_code="en", telegram_id=None):
+        return [{"telegram_id": telegram_id, "notification_url": f"https://ads/{telegram_id}/{i}"} for i in range(3)]
+
+    async def main():
+        ads = RichAdsManager()
+        monkeypatch.setattr(ads, "fetch_ad", fetch_ad)
+
+        first = await ads.get_ad("en", "1")
+        await asyncio.sleep(0)
+        second = await ads.get_ad("en", "2")
+        again = await ads.get_ad("en", "1")
+
+        assert first["telegram_id"] == again["telegram_id"] == "1"
+        assert second["telegram_id"] == "2"
+        assert again["notification_url"] != first["notification_url"]
+
+    asyncio.run(main())
+
+
+def test_only_returning_users_get_their_next_ad_prefetched(monkeypatch):
+    fetched = []
+
+    async def fetch_ad(language_code="en", telegram_id=None):
+        fetched.append(telegram_id)
+        return [{"telegram_id": telegram_id, "n": len(fetched)}]
+
+    async def main():
+        ads = RichAdsManager()
+        monkeypatch.setattr(ads, "fetch_ad", fetch_ad)
+
+        # A first ad is fetched on demand, nothing is fetched ahead for a user who may not come back
+        assert (await ads.get_ad("en", "1"))["n"] == 1
+        await asyncio.sleep(0)
+        assert fetched == ["1"]
+
+        # Asking again within AD_CACHE_TTL prefetches the one after, which the third request is served from
+        assert (await ads.get_ad("en", "1"))["n"] == 2
+        await asyncio.sleep(0)
+        assert fetched == ["1", "1", "1"]
+        assert (await ads.get_ad("en", "1"))["n"] == 3
+
+    asyncio.run(main())
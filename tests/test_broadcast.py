@@ -0,0 +1,17 @@
+import asyncio
+import time
+
+from bot.broadcast import TokenBucket
+
+
+def test_pause_does_not_refill_the_bucket():
+    async def main():
+        bucket = TokenBucket(100)
+        bucket.pause(0.1)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        # The pause earns no tokens: the 5 sends are spread at the rate once it ends, not burst
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.14
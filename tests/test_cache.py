@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from pyrogram.client import Cache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = Cache(2)
+    cache["a"], cache["b"] = 1, 2
+
+    assert cache["a"] == 1
+    cache["c"] = 3
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache["b"] is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+
+def test_overwriting_does_not_evict():
+    cache = Cache(2)
+    cache["a"], cache["b"] = 1, 2
+    cache["a"] = 10
+    cache["c"] = 3
+
+    assert len(cache) == 2 and cache.evictions == 1
+    assert "b" not in cache and cache["a"] == 10
+
+
+def test_memory_bound():
+    raw = SimpleNamespace(write=lambda: b"x" * 10)
+    cache = Cache(100, max_memory=10 * Cache.RAW_SIZE_FACTOR * 2)
+
+    for key in range(3):
+        cache[key] = SimpleNamespace(raw=raw)
+
+    assert list(cache.store) == [1, 2]
+    assert cache.memory == 10 * Cache.RAW_SIZE_FACTOR * 2
+
+    # A single entry over the bound is still kept
+    cache["big"] = SimpleNamespace(raw=SimpleNamespace(write=lambda: b"x" * 1000))
+    assert list(cache.store) == ["big"]
+
+    cache.clear()
+    assert len(cache) == 0 and cache.memory == 0
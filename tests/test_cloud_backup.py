@@ -0,0 +1,230 @@
+import asyncio
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from bot import cloud_backup
+from bot.cloud_backup import BackupService, LocalDirRemote
+
+
+class Remote(LocalDirRemote):
+    """Lists every file in the directory, like the GitHub remote lists every file in its folder"""
+
+    async def list(self):
+        return sorted(os.listdir(self.directory))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot.db")
+    monkeypatch.setattr(cloud_backup, "DB_PATH", path)
+    monkeypatch.setattr(cloud_backup, "STATE_PATH", path + ".backup_state.json")
+
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def write(path, *ids, tag="x"):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?)", [(i, tag * 500 + str(i)) for i in ids])
+    conn.close()
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def snapshot(path):
+    # What a backup captures: the database as copied by the SQLite backup API, which rewrites the header's
+    # change counter, so the live file itself can differ in those bytes
+    copy = cloud_backup._create_temp_backup()
+    try:
+        return read(copy)
+    finally:
+        os.remove(copy)
+
+
+def backup(service):
+    assert asyncio.run(service.backup())
+
+
+def restore(service, db):
+    os.remove(db)
+    assert asyncio.run(service.restore())
+    return read(db)
+
+
+def test_full_backup_then_incrementals_restore_the_same_bytes(db, tmp_path):
+    service = BackupService(Remote(str(tmp_path / "remote")))
+
+    write(db, *range(100))
+    backup(service)
+    write(db, 5, tag="y")
+    backup(service)
+    write(db, *range(100, 150))
+    backup(service)
+    # Unchanged since the last one: nothing is uploaded
+    backup(service)
+    source = snapshot(db)
+
+    names = asyncio.run(service.remote.list())
+    assert [name.rsplit("_", 1)[1] for name in names] == ["full.db.gz", "incr.db.gz", "incr.db.gz"]
+    assert os.path.getsize(tmp_path / "remote" / names[1]) < os.path.getsize(tmp_path / "remote" / names[0])
+
+    assert restore(service, db) == source
+
+
+@pytest.mark.parametrize("damage", ["truncate", "delete"])
+def test_restore_stops_at_a_broken_link(db, tmp_path, damage):
+    remote = tmp_path / "remote"
+    service = BackupService(Remote(str(remote)))
+
+    write(db, *range(50))
+    backup(service)
+    full = snapshot(db)
+    write(db, *range(50, 60))
+    backup(service)
+    write(db, *range(60, 70))
+    backup(service)
+
+    first_incremental = remote / sorted(os.listdir(remote))[1]
+    if damage == "truncate":
+        first_incremental.write_bytes(first_incremental.read_bytes()[:40])
+    else:
+        # The next incremental then names a base that isn't in the chain
+        first_incremental.unlink()
+
+    assert restore(service, db) == full
+
+
+def test_cleanup_only_deletes_old_backups(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(cloud_backup, "FULL_BACKUP_EVERY", 2)
+    remote = tmp_path / "remote"
+    service = BackupService(Remote(str(remote)))
+    remote.joinpath(".gitkeep").write_text("")
+    remote.joinpath("README.md").write_text("backups")
+    remote.joinpath("backup_notes.txt").write_text("notes")
+
+    for i in range(6):
+        write(db, i)
+        backup(service)
+
+    names = sorted(os.listdir(remote))
+    backups = [n for n in names if cloud_backup.BACKUP_NAME.fullmatch(n)]
+
+    # Three chains of a full and an incremental were made, the oldest one is gone
+    assert len(backups) == 2 * cloud_backup.KEEP_CHAINS and backups[0].endswith("_full.db.gz")
+    assert {".gitkeep", "README.md", "backup_notes.txt"} <= set(names)
+
+
+class CountingRemote(cloud_backup.BackupRemote):
+    """Keeps uploads in memory, failing the first `failures` of them"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.uploads = []
+        self.running = 0
+        self.most_running = 0
+
+    async def list(self):
+        return sorted(self.uploads)
+
+    async def upload(self, name, path):
+        self.attempts += 1
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("remote unavailable")
+            self.uploads.append(name)
+        finally:
+            self.running -= 1
+
+
+def test_burst_of_triggers_makes_one_backup(db, monkeypatch):
+    monkeypatch.setattr(cloud_backup, "TRIGGER_DELAY", 0.05)
+    monkeypatch.setattr(cloud_backup, "RETRY_DELAY", 0.01)
+    remote = CountingRemote(failures=2)
+    service = BackupService(remote)
+    monkeypatch.setattr(cloud_backup, "_service", service)
+
+    async def main():
+        service.loop = asyncio.get_running_loop()
+        write(db, 1)
+
+        # From the loop and from other threads, like the login and admin code paths
+        for i in range(10):
+            assert cloud_backup.trigger_backup_on_critical_change("set_premium", i)
+        await asyncio.gather(*(
+            asyncio.to_thread(cloud_backup.trigger_backup_on_session, i) for i in range(10)
+        ))
+        await asyncio.sleep(0.02)
+        await service.pending
+
+        # Uploaded once, after two failed attempts were retried
+        assert (len(remote.uploads), remote.attempts) == (1, 3)
+
+        write(db, 2, tag="y")
+        cloud_backup.trigger_backup_on_session(1)
+        await asyncio.sleep(0.02)
+        await service.pending
+        assert len(remote.uploads) == 2
+
+    asyncio.run(main())
+
+
+def test_concurrent_backups_run_one_at_a_time_off_the_loop(db, monkeypatch):
+    prepare = cloud_backup._prepare_backup
+    threads = []
+
+    def prepare_backup():
+        threads.append(threading.current_thread())
+        return prepare()
+
+    monkeypatch.setattr(cloud_backup, "_prepare_backup", prepare_backup)
+    remote = CountingRemote()
+    service = BackupService(remote)
+
+    async def main():
+        write(db, 1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(service.backup() for _ in range(5)))
+        task.cancel()
+
+        assert all(results) and ticks > 0
+        # The first one uploads, the others find nothing changed once it is done
+        assert len(remote.uploads) == 1 and remote.most_running == 1
+
+    asyncio.run(main())
+
+    assert threads and threading.main_thread() not in threads
+
+
+def test_remote_operations_are_bounded():
+    remote = CountingRemote()
+    service = BackupService(remote)
+
+    async def main():
+        await asyncio.gather(*(service.retry(remote.upload, f"backup_{i}", None) for i in range(10)))
+
+    asyncio.run(main())
+
+    assert len(remote.uploads) == 10 and remote.most_running == cloud_backup.MAX_REMOTE_OPERATIONS
@@ -0,0 +1,103 @@
+import asyncio
+
+from bot import database
+
+
+def test_connections_are_reused_and_readers_are_read_only():
+    database.init_db()
+
+    # One connection per executor thread, kept for its lifetime
+    first = database._writer.submit(database._get_connection).result()
+    assert database._writer.submit(database._get_connection).result() is first
+
+    async def main():
+        assert (await database._fetchone("PRAGMA query_only"))[0] == 1
+        assert await database._execute("DELETE FROM settings WHERE key = ?", ("missing",)) == 0
+
+    asyncio.run(main())
+
+
+def test_flush_keeps_counters_visible_to_a_racing_load(monkeypatch):
+    transaction = database._transaction
+    loaded = []
+
+    async def racing_transaction(func, *args):
+        # A cache miss that reads the row before the flush has committed
+        database._invalidate_user(7)
+        loaded.append(await database._load_user(7))
+        return await transaction(func, *args)
+
+    async def main():
+        database.init_db()
+        await database.create_user(7)
+        await database.increment_ad_count(7)
+
+        monkeypatch.setattr(database, "_transaction", racing_transaction)
+        await database.flush_users()
+
+        assert loaded[0]["ads_today"] == 1
+        assert "7" not in database._dirty
+        monkeypatch.setattr(database, "_transaction", transaction)
+
+        database._invalidate_user(7)
+        assert await database.get_ad_count_today(7) == 1
+
+    asyncio.run(main())
+
+
+def test_flush_keeps_changes_made_while_writing(monkeypatch):
+    transaction = database._transaction
+
+    async def racing_transaction(func, *args):
+        await database.increment_ad_count(8)
+        return await transaction(func, *args)
+
+    async def main():
+        database.init_db()
+        await database.create_user(8)
+        await database.increment_ad_count(8)
+
+        monkeypatch.setattr(database, "_transaction", racing_transaction)
+        await database.flush_users()
+        monkeypatch.setattr(database, "_transaction", transaction)
+
+        assert database._dirty["8"]["ads_today"] == 2
+        await database.flush_users()
+        assert "8" not in database._dirty
+
+    asyncio.run(main())
+
+
+def test_concurrent_reservations_never_exceed_the_daily_limit():
+    async def main():
+        database.init_db()
+        await database.create_user(9)
+        results = await asyncio.gather(*(database.reserve_quota(9, 2) for _ in range(5)))
+        assert sum(reserved for reserved, _ in results) == database.FREE_DAILY_LIMIT
+
+        await database.refund_quota(9, 2)
+        assert await database.reserve_quota(9, 5) == (2, False)
+
+    asyncio.run(main())
+
+
+def test_concurrent_misses_share_one_record():
+    async def main():
+        database.init_db()
+        await database.create_user(10)
+        database._invalidate_user(10)
+
+        first, second = await asyncio.gather(database._load_user(10), database._load_user(10))
+        assert first is second
+
+        # A change made through either reference is flushed, neither overwrites the other
+        first["last_download_time"] = 123.0
+        database._mark_dirty(first)
+        await database.increment_ad_count(10)
+        await database.flush_users()
+
+        database._invalidate_user(10)
+        user = await database.get_user(10)
+        assert user["last_download_time"] == 123.0 and user["ads_today"] == 1
+
+    asyncio.run(main())
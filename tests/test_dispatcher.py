@@ -0,0 +1,233 @@
+import asyncio
+from types import SimpleNamespace
+
+from pyrogram import enums, filters
+from pyrogram.dispatcher import Dispatcher
+from pyrogram.handlers import MessageHandler
+from pyrogram.types import Message
+
+
+class Update:
+    pass
+
+
+def make_dispatcher(workers=1, queue_size=0, policy=enums.UpdatesOverflowPolicy.BLOCK, ordered=False):
+    client = SimpleNamespace(
+        ordered_updates=ordered, updates_queue_size=queue_size, updates_overflow_policy=policy, workers=workers,
+        no_updates=False, skip_updates=True, me=SimpleNamespace(username="bot"), executor=None
+    )
+    dispatcher = Dispatcher(client)
+    dispatcher.update_parsers[Update] = lambda update, users, chats: _parse(update)
+    return dispatcher
+
+
+async def _parse(update):
+    return update.message, MessageHandler
+
+
+def make_update(message_id, chat_id=0):
+    update = Update()
+    update.message = Message(id=message_id, text=str(message_id))
+    update.user_id = chat_id
+    return update
+
+
+async def dispatch(dispatcher, *messages):
+    await dispatcher.start()
+    for message in messages:
+        update = Update()
+        update.message = message
+        await dispatcher.put_update((update, {}, {}))
+    await dispatcher.stop()
+
+
+def test_commands_are_routed_without_checking_other_command_handlers():
+    checked, handled = [], []
+
+    def track(name):
+        async def func(flt, client, message):
+            checked.append(name)
+            return True
+
+        return filters.create(func)
+
+    def callback(name):
+        async def func(client, message):
+            handled.append((name, message.id))
+
+        return func
+
+    async def main():
+        dispatcher = make_dispatcher()
+        dispatcher.add_handler(MessageHandler(callback("start"), track("start") & filters.command("start")), 0)
+        dispatcher.add_handler(MessageHandler(callback("help"), track("help") & filters.command("help")), 0)
+        dispatcher.add_handler(MessageHandler(callback("text"), filters.text & track("text")), 1)
+
+        await dispatch(dispatcher, Message(id=1, text="/help me"), Message(id=2, text="/HELP@bot"),
+                       Message(id=3, text="hello"))
+
+    asyncio.run(main())
+
+    # Filters run in order, so without the index the tracking filter would see every message first
+    assert checked == ["help", "text", "help", "text", "text"]
+    assert handled == [("help", 1), ("text", 1), ("help", 2), ("text", 2), ("text", 3)]
+
+
+def test_handlers_change_without_waiting_for_running_callbacks():
+    handled = []
+    release = None
+
+    async def slow(client, message):
+        handled.append(("slow", message.id))
+        await release.wait()
+
+    async def late(client, message):
+        handled.append(("late", message.id))
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        dispatcher = make_dispatcher()
+        dispatcher.add_handler(MessageHandler(slow), 0)
+        await dispatcher.start()
+
+        update = Update()
+        update.message = Message(id=1, text="first")
+        await dispatcher.put_update((update, {}, {}))
+        await asyncio.sleep(0.01)
+
+        # Applied right away while the callback is running, but the update in flight keeps its own tables
+        handler = MessageHandler(late)
+        dispatcher.add_handler(handler, 1)
+        assert dispatcher.groups[1] == (handler,)
+        release.set()
+
+        update = Update()
+        update.message = Message(id=2, text="second")
+        await dispatcher.put_update((update, {}, {}))
+        await asyncio.sleep(0.01)
+
+        dispatcher.remove_handler(handler, 1)
+        assert dispatcher.groups[1] == ()
+        await dispatcher.stop()
+
+    asyncio.run(main())
+
+    assert handled == [("slow", 1), ("slow", 2), ("late", 2)]
+
+
+def run_blocked(policy, queue_size=2):
+    """Fill a dispatcher whose only worker is stuck in a callback with updates 2..5, return the ids handled"""
+    handled = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def callback(client, message):
+            handled.append(message.id)
+            await release.wait()
+
+        dispatcher = make_dispatcher(queue_size=queue_size, policy=policy)
+        dispatcher.add_handler(MessageHandler(callback), 0)
+        await dispatcher.start()
+
+        await dispatcher.put_update((make_update(1), {}, {}))
+        await asyncio.sleep(0.01)
+
+        puts = [asyncio.create_task(dispatcher.put_update((make_update(i), {}, {}))) for i in range(2, 6)]
+        await asyncio.sleep(0.01)
+        blocked = sum(not put.done() for put in puts)
+
+        release.set()
+        await asyncio.gather(*puts)
+        await asyncio.sleep(0.01)
+        await dispatcher.stop()
+
+        return blocked, dispatcher.dropped_updates
+
+    blocked, dropped = asyncio.run(main())
+    return handled, blocked, dropped
+
+
+def test_drop_new_keeps_the_queued_updates():
+    assert run_blocked(enums.UpdatesOverflowPolicy.DROP_NEW) == ([1, 2, 3], 0, 2)
+
+
+def test_drop_oldest_keeps_the_latest_updates():
+    assert run_blocked(enums.UpdatesOverflowPolicy.DROP_OLDEST) == ([1, 4, 5], 0, 2)
+
+
+def test_block_waits_for_a_free_slot():
+    assert run_blocked(enums.UpdatesOverflowPolicy.BLOCK) == ([1, 2, 3, 4, 5], 2, 0)
+
+
+def test_updates_of_a_chat_are_handled_in_order():
+    handled = {}
+
+    async def callback(client, message):
+        # Earlier updates take longer, they would finish last if a chat's updates ran concurrently
+        await asyncio.sleep(0.02 / message.id)
+        handled.setdefault(message.text[0], []).append(message.id)
+
+    async def main():
+        dispatcher = make_dispatcher(workers=4, ordered=True)
+        dispatcher.add_handler(MessageHandler(callback), 0)
+        await dispatcher.start()
+
+        for i in range(1, 6):
+            for chat_id in (1, 2, 3):
+                update = make_update(i, chat_id)
+                update.message.text = f"{chat_id}"
+                await dispatcher.put_update((update, {}, {}))
+
+        await asyncio.sleep(0.2)
+        await dispatcher.stop()
+
+    asyncio.run(main())
+
+    assert handled == {chat: [1, 2, 3, 4, 5] for chat in "123"}
+
+
+def test_stop_under_drop_oldest_with_a_full_queue():
+    async def main():
+        release = asyncio.Event()
+
+        async def callback(client, message):
+            await release.wait()
+
+        dispatcher = make_dispatcher(queue_size=2, policy=enums.UpdatesOverflowPolicy.DROP_OLDEST)
+        dispatcher.add_handler(MessageHandler(callback), 0)
+        await dispatcher.start()
+
+        await dispatcher.put_update((make_update(1), {}, {}))
+        await asyncio.sleep(0.01)
+        await dispatcher.put_update((make_update(2), {}, {}))
+
+        stop = asyncio.create_task(dispatcher.stop())
+        await asyncio.sleep(0.01)
+
+        # Updates keep arriving while stopping, they must not push the shutdown sentinel out of the queue
+        for i in range(3, 6):
+            await dispatcher.put_update((make_update(i), {}, {}))
+
+        release.set()
+        await asyncio.wait_for(stop, 1)
+
+    asyncio.run(main())
+
+
+def test_prefixes_with_whitespace_are_not_routed_by_first_word():
+    handled = []
+
+    async def callback(client, message):
+        handled.append(message.command)
+
+    async def main():
+        dispatcher = make_dispatcher()
+        dispatcher.add_handler(MessageHandler(callback, filters.command("start", prefixes="! ")), 0)
+
+        await dispatch(dispatcher, Message(id=1, text="! start now"), Message(id=2, text="!start"))
+
+    asyncio.run(main())
+
+    assert handled == [["start", "now"]]
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import os
+import random
+from types import SimpleNamespace
+
+import pyrogram
+from pyrogram.client import Client, DownloadSink
+
+DATA = bytes(random.Random(0).randrange(256) for _ in range(10 * 1000 + 123))
+PARTS = [(offset, DATA[offset:offset + 1000]) for offset in range(0, len(DATA), 1000)]
+
+
+def shuffled_parts(seed=1):
+    parts = list(PARTS)
+    random.Random(seed).shuffle(parts)
+    return parts
+
+
+def test_sink_writes_parts_in_any_order(tmp_path):
+    path = str(tmp_path / "file")
+
+    async def main():
+        sink = DownloadSink(path, len(DATA))
+        await sink.open()
+        for offset, chunk in shuffled_parts():
+            await sink.write(offset, chunk)
+        await sink.close()
+
+    asyncio.run(main())
+
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_sink_trims_to_the_data_written(tmp_path):
+    path = str(tmp_path / "file")
+
+    async def main():
+        # The declared size was an overestimate, the preallocated tail is cut off
+        sink = DownloadSink(path, len(DATA) + 4096)
+        await sink.open()
+        for offset, chunk in shuffled_parts(2):
+            await sink.write(offset, chunk)
+        await sink.close()
+
+    asyncio.run(main())
+
+    assert os.path.getsize(path) == len(DATA)
+
+
+def download(tmp_path, parts):
+    client = SimpleNamespace(get_file_parts=parts)
+    packet = (None, str(tmp_path), "file", False, len(DATA), None, (), 1)
+    return asyncio.run(Client.handle_download(client, packet))
+
+
+def test_download_writes_shuffled_parts(tmp_path):
+    async def parts(*args):
+        for part in shuffled_parts(3):
+            await asyncio.sleep(0)
+            yield part
+
+    path = download(tmp_path, parts)
+
+    assert path == str(tmp_path / "file")
+    assert os.listdir(tmp_path) == ["file"]
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_stopped_download_is_removed_quietly(tmp_path, caplog):
+    async def parts(*args):
+        yield PARTS[3]
+        raise pyrogram.StopTransmission()
+
+    with caplog.at_level(logging.DEBUG, logger="pyrogram.client"):
+        assert download(tmp_path, parts) is None
+
+    assert os.listdir(tmp_path) == []
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
+    assert any("stopped" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,59 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+client = SimpleNamespace(me=SimpleNamespace(username="bot"))
+
+
+def check(flt, message):
+    return asyncio.run(flt(client, message))
+
+
+def test_command_arguments():
+    message = Message(id=1, text='/Start@bot one "two three" \'fo\\\'ur\'')
+
+    assert check(filters.command("start"), message)
+    assert message.command == ["start", "one", "two three", "fo'ur"]
+    assert not check(filters.command("start", case_sensitive=True), message)
+    assert message.command is None
+
+
+def test_command_filters_share_one_parse():
+    message = Message(id=1, text="!help me")
+
+    assert not check(filters.command("start", prefixes="!"), message)
+    entry = message._filters_cache[("command", "!help me", "!")]
+
+    assert check(filters.command("help", prefixes="!"), message)
+    assert message._filters_cache[("command", "!help me", "!")] is entry
+    assert message.command == ["help", "me"]
+
+
+def test_pattern_commands_still_match():
+    message = Message(id=1, text="/get_42 now")
+
+    assert check(filters.command(r"get_\d+"), message)
+    assert message.command == [r"get_\d+", "now"]
+
+
+def test_or_of_command_filters_is_merged():
+    flt = filters.command("a") | filters.command("b")
+
+    assert type(flt).__name__ == "CommandFilter"
+    assert flt.commands == {"a", "b"}
+    assert check(flt, Message(id=1, text="/b"))
+    assert type(filters.command("a") | filters.command("b", prefixes="!")).__name__ == "OrFilter"
+
+
+def test_regex_matches_are_shared():
+    message = Message(id=1, text="order 12 and 34")
+    first, second = filters.regex(r"\d+"), filters.regex(re.compile(r"\d+"))
+
+    assert check(first, message)
+    matches = message.matches
+    assert check(second, message)
+    assert message.matches is matches
+    assert [m.group() for m in matches] == ["12", "34"]
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot import handlers
+from bot.config import active_downloads
+
+
+class FakeStatus:
+    text = ""
+
+    async def edit_text(self, text, **kwargs):
+        self.text = text
+
+
+def make_message(user_id):
+    async def reply(text, **kwargs):
+        return FakeStatus()
+
+    return SimpleNamespace(from_user=SimpleNamespace(id=user_id), text="https://t.me/channel/1", reply=reply)
+
+
+def test_cancel_while_queued_releases_user(monkeypatch):
+    async def get_user(user_id):
+        return {"role": "premium"}
+
+    async def verify_force_sub(client, user_id):
+        return True, None
+
+    async def check_and_update_quota(user_id):
+        return True, ""
+
+    monkeypatch.setattr(handlers, "get_user", get_user)
+    monkeypatch.setattr(handlers, "verify_force_sub", verify_force_sub)
+    monkeypatch.setattr(handlers, "check_and_update_quota", check_and_update_quota)
+
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(handlers, "global_download_semaphore", semaphore)
+        # Another download holds the only slot, so this one waits in the queue
+        await semaphore.acquire()
+
+        task = asyncio.create_task(handlers.download_handler(object(), make_message(42)))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert 42 in active_downloads
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert 42 not in active_downloads
+        # The queued download never got a slot, so it must not have released one
+        semaphore.release()
+        assert not semaphore.locked()
+        assert semaphore._value == 1
+
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+import asyncio
+
+from pyrogram import raw, types
+from pyrogram.client import Cache
+from pyrogram.methods.messages.resolve_messages import ResolveMessages
+
+
+class Client(ResolveMessages):
+    lazy_parse = True
+    me = types.User(id=1, is_bot=True)
+
+    def __init__(self):
+        self.message_cache = Cache(100)
+        self.requests = []
+
+    async def get_messages(self, chat_id, message_ids, replies=1):
+        self.requests.append((chat_id, message_ids))
+        return [types.Message(id=i, text=f"reply {i}") for i in message_ids]
+
+
+CHATS = {100: raw.types.Chat(id=100, title="chat", photo=raw.types.ChatPhotoEmpty(), participants_count=2, date=0,
+                             version=1)}
+
+
+async def parse(client, message_id, reply_to):
+    message = raw.types.Message(
+        id=message_id, peer_id=raw.types.PeerChat(chat_id=100), date=0, message="text", entities=[],
+        reply_to=raw.types.MessageReplyHeader(reply_to_msg_id=reply_to)
+    )
+    return await types.Message._parse(client, message, {}, CHATS)
+
+
+def test_replies_are_fetched_on_resolve_in_one_request():
+    async def main():
+        client = Client()
+        messages = [await parse(client, 5, 3), await parse(client, 6, 4), await parse(client, 7, 3)]
+
+        assert not client.requests
+        assert all(m.reply_to_message is None for m in messages)
+
+        await client.resolve_messages(messages)
+
+        assert client.requests == [(-100, [3, 4])]
+        assert [m.reply_to_message.id for m in messages] == [3, 4, 3]
+
+        # Nothing left to resolve, a second call makes no request
+        await messages[0].resolve()
+        assert len(client.requests) == 1
+
+    asyncio.run(main())
+
+
+def test_cached_replies_are_filled_in_while_parsing():
+    async def main():
+        client = Client()
+        reply = types.Message(id=3, text="cached")
+        client.message_cache[(-100, 3)] = reply
+
+        message = await parse(client, 5, 3)
+
+        assert message.reply_to_message is reply
+        assert not message._deferred
+
+    asyncio.run(main())
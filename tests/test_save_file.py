@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.methods.advanced.save_file import SaveFile
+
+PART_SIZE = 512 * 1024
+
+
+class Session:
+    """Records the parts sent to it instead of uploading them"""
+
+    def __init__(self):
+        self.parts = {}
+
+    async def send(self, data, wait_response=False):
+        await self.invoke(data)
+
+    async def invoke(self, data):
+        await asyncio.sleep(0)
+        self.parts[data.file_part] = (type(data), bytes(data.bytes))
+
+
+class Storage:
+    async def dc_id(self):
+        return 2
+
+
+def make_client(session):
+    return SimpleNamespace(
+        save_file_semaphore=asyncio.Semaphore(1), me=None, rnd_id=lambda: 1, storage=Storage(),
+        media_sessions={2: session}, loop=asyncio.get_running_loop(), executor=None
+    )
+
+
+def save_file(path, session=None, **kwargs):
+    session = session or Session()
+
+    async def main():
+        return await SaveFile.save_file(make_client(session), path, workers=4, **kwargs)
+
+    return asyncio.run(main()), session
+
+
+def random_bytes(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+def test_mapped_file_sends_the_same_parts_as_reading_it(tmp_path):
+    for size in (3 * PART_SIZE + 1234, 21 * PART_SIZE):
+        data = random_bytes(size)
+        path = tmp_path / f"{size}.bin"
+        path.write_bytes(data)
+
+        mapped, mapped_session = save_file(str(path))
+        read, read_session = save_file(io.BytesIO(data))
+
+        expected = [data[i:i + PART_SIZE] for i in range(0, size, PART_SIZE)]
+        assert [mapped_session.parts[i][1] for i in range(len(expected))] == expected
+        assert mapped_session.parts == read_session.parts
+        assert mapped.parts == read.parts == len(expected)
+
+        if size > 10 * 1024 * 1024:
+            assert isinstance(mapped, raw.types.InputFileBig)
+            assert mapped_session.parts[0][0] is raw.functions.upload.SaveBigFilePart
+        else:
+            # Hashed in a thread from the mapping, must match hashing each part on the loop
+            assert mapped.md5_checksum == read.md5_checksum == hashlib.md5(data).hexdigest()
+
+
+async def uneven_chunks(data, seed=0):
+    rnd = random.Random(seed)
+    offset = 0
+
+    while offset < len(data):
+        size = rnd.choice((1, 1000, PART_SIZE - 1, PART_SIZE, PART_SIZE + 1, 700 * 1024))
+        yield data[offset:offset + size]
+        offset += size
+
+
+def test_stream_is_cut_into_whole_parts():
+    data = random_bytes(4 * PART_SIZE + 4321, 1)
+
+    uploaded, session = save_file(uneven_chunks(data), file_size=len(data))
+    read, _ = save_file(io.BytesIO(data))
+
+    assert [session.parts[i][1] for i in range(len(session.parts))] == [
+        data[i:i + PART_SIZE] for i in range(0, len(data), PART_SIZE)
+    ]
+    assert uploaded.md5_checksum == read.md5_checksum
+
+
+def test_stream_of_another_size_than_declared():
+    data = random_bytes(2 * PART_SIZE + 10, 2)
+
+    for declared, message in ((len(data) + 1, "ended after"), (len(data) - 1, "more than")):
+        with pytest.raises(ValueError, match=message):
+            save_file(uneven_chunks(data), file_size=declared)
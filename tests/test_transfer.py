@@ -0,0 +1,104 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from bot import database, transfer
+from pyrogram.methods.advanced.save_file import SaveFile
+
+
+def make_item(message_id):
+    return SimpleNamespace(
+        id=message_id, caption=None, caption_entities=None, photo=None, video=None, audio=None,
+        document=SimpleNamespace(file_size=1)
+    )
+
+
+def test_album_item_that_fails_to_download(monkeypatch, tmp_path):
+    fetched = []
+
+    async def download_media_fast(client, m, file_name, progress_callback=None, progress_args=()):
+        if m.id == 2:
+            await asyncio.sleep(0.01)
+            return None
+
+        folder = tmp_path / f"{m.id}"
+        folder.mkdir()
+        path = folder / "file.bin"
+        path.write_bytes(b"x")
+        fetched.append(path)
+        return str(path)
+
+    monkeypatch.setattr(transfer, "download_media_fast", download_media_fast)
+
+    with pytest.raises(RuntimeError, match=r"Album item 2 of 2 \(message 2\)"):
+        asyncio.run(transfer.relay_media_group(None, None, 1, [make_item(1), make_item(2)]))
+
+    assert fetched and not any(os.path.exists(path.parent) for path in fetched)
+
+
+class UploadSession:
+    """Confirms the parts below `stall_at` and leaves the others hanging, like a connection that died mid-upload"""
+
+    def __init__(self, stall_at=None):
+        self.stall_at = stall_at
+        self.sent = []
+
+    async def invoke(self, data):
+        if self.stall_at is not None and data.file_part >= self.stall_at:
+            await asyncio.Event().wait()
+        self.sent.append(data.file_part)
+
+
+class UploadClient:
+    def __init__(self, session, stopping):
+        self.save_file_semaphore = asyncio.Semaphore(1)
+        self.me = None
+        self.storage = SimpleNamespace(dc_id=self.dc_id)
+        self.media_sessions = {2: session}
+        self.loop = asyncio.get_running_loop()
+        self.executor = None
+        self.supervisor = SimpleNamespace(stopping=stopping)
+
+    async def dc_id(self):
+        return 2
+
+    def rnd_id(self):
+        return int.from_bytes(os.urandom(4), "little")
+
+    async def send_document(self, chat_id, path, checkpoint=None, workers=None, **kwargs):
+        return await SaveFile.save_file(self, path, workers=4, checkpoint=checkpoint)
+
+
+def test_interrupted_upload_resumes_with_the_missing_parts(tmp_path):
+    path = str(tmp_path / "file.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(6 * 512 * 1024))
+
+    async def main():
+        database.init_db()
+        job = await database.create_upload_job(5, path, {}, 1, 2)
+
+        # Stopped by a shutdown after parts 0-2 were confirmed: the job and its checkpoint are kept
+        first = UploadSession(stall_at=3)
+        upload = asyncio.create_task(transfer.upload_resumable(UploadClient(first, stopping=True), job))
+        while len(first.sent) < 3:
+            await asyncio.sleep(0.01)
+        upload.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await upload
+
+        job = await database.get_upload_job(path)
+        assert job["file_id"] and job["total_parts"] == 6
+
+        # After the restart only the parts Telegram never confirmed are sent again
+        second = UploadSession()
+        uploaded = await transfer.upload_resumable(UploadClient(second, stopping=False), job)
+
+        # Same upload as before, a new file id would make Telegram forget the parts already sent
+        assert uploaded.id == job["file_id"] and uploaded.parts == 6
+        assert sorted(second.sent) == [3, 4, 5]
+        assert await database.get_upload_job(path) is None
+
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import pickle
+from datetime import datetime
+
+from pyrogram.types import Message, User, Video, Photo
+
+
+def make_message():
+    return Message(
+        id=1, text="hello", date=datetime(2024, 1, 2, 3, 4, 5), from_user=User(id=2, first_name="A"),
+        video=Video(file_id="f", file_unique_id="u", width=1, height=1, codec="h264", duration=1)
+    )
+
+
+def test_slotted_types_have_no_instance_dict():
+    message = make_message()
+
+    assert not hasattr(message, "__dict__")
+    assert not hasattr(message.from_user, "__dict__")
+    # Types that didn't opt in keep theirs
+    assert hasattr(Photo(file_id="f", file_unique_id="u", width=1, height=1, file_size=1, date=None), "__dict__")
+
+
+def test_slotted_types_round_trip():
+    message = make_message()
+    message._filters_cache = {"key": "value"}
+    client = object()
+    message.bind(client)
+
+    assert message.from_user._client is client and message.video._client is client
+
+    copy = pickle.loads(pickle.dumps(message))
+    assert copy == message
+    assert copy.date == message.date and copy.from_user.first_name == "A"
+    assert getattr(copy, "_filters_cache", None) is None
+
+    assert "video=pyrogram.types.Video(" in repr(message)
+    assert '"text": "hello"' in str(message) and "_filters_cache" not in str(message)